@@ -5,11 +5,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer, UserCreateSerializer, ChangePasswordSerializer
+from core.mixins import DeltaSyncMixin
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     """ViewSet for User CRUD operations"""
     
     queryset = User.objects.all()
@@ -0,0 +1,58 @@
+"""
+Async analytics views for ASGI deployments.
+
+Same responses as the DRF views in ``views.py``, but each report's
+independent queries run concurrently. Enabled on the regular analytics URLs
+with ``ANALYTICS_ASYNC_VIEWS``.
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.authentication import async_jwt_required
+from core.replicas import areplica_reads
+from .views import REPORT_MAX_LAG_SECONDS, DashboardAnalyticsView, FleetPerformanceView, FinancialReportView
+from .reports import DashboardReport, FleetPerformanceReport, FinancialReport
+
+
+def _period_days(request, default):
+    try:
+        return int(request.GET.get('days', default)), None
+    except ValueError:
+        return None, JsonResponse({'error': 'days must be an integer'}, status=400)
+
+
+@require_GET
+@async_jwt_required()
+async def dashboard_analytics(request):
+    """Get dashboard KPIs and summary statistics"""
+    async with areplica_reads(REPORT_MAX_LAG_SECONDS):
+        return JsonResponse(await DashboardReport().arun(), encoder=JSONEncoder)
+
+
+@require_GET
+@async_jwt_required()
+async def fleet_performance(request):
+    """Get fleet performance metrics"""
+    period_days, error = _period_days(request, 30)
+    if error:
+        return error
+    async with areplica_reads(REPORT_MAX_LAG_SECONDS):
+        return JsonResponse(await FleetPerformanceReport(period_days).arun(), encoder=JSONEncoder)
+
+
+@require_GET
+@async_jwt_required()
+async def financial_report(request):
+    """Get financial reports"""
+    period_days, error = _period_days(request, 90)
+    if error:
+        return error
+    async with areplica_reads(REPORT_MAX_LAG_SECONDS):
+        return JsonResponse(await FinancialReport(period_days).arun(), encoder=JSONEncoder)
+
+
+# Same queries as the DRF views, so the same budgets
+dashboard_analytics.query_budget = DashboardAnalyticsView.query_budget
+fleet_performance.query_budget = FleetPerformanceView.query_budget
+financial_report.query_budget = FinancialReportView.query_budget
@@ -0,0 +1,16 @@
+from jobs.registry import job
+from .reports import FleetPerformanceReport, FinancialReport
+
+
+@job('analytics.fleet_performance')
+def fleet_performance(ctx, period_days=30):
+    """Fleet performance report over a long window"""
+    ctx.progress(0, 1, f'Building {period_days} day fleet performance report')
+    return FleetPerformanceReport(int(period_days)).run()
+
+
+@job('analytics.financial')
+def financial_report(ctx, period_days=90):
+    """Financial report over a long window"""
+    ctx.progress(0, 1, f'Building {period_days} day financial report')
+    return FinancialReport(int(period_days)).run()
@@ -0,0 +1,339 @@
+"""
+Analytics reports as sets of independent queries.
+
+A report declares its queries as zero-argument callables and a ``build``
+step that combines their results. ``run`` executes the queries one after
+another for the regular DRF views; ``arun`` fires them concurrently on a
+bounded thread pool for the async views, so latency approaches that of the
+slowest query instead of the sum of all of them.
+
+Django's async ORM methods still funnel through a single thread per
+request, which is why the concurrent path uses its own executor. Each
+worker thread holds its own database connection, so
+``ANALYTICS_QUERY_WORKERS`` also bounds the connections used.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Sum, Count, F, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from datetime import timedelta
+
+from vehicles.models import Vehicle
+from trips.models import Trip
+from maintenance.models import MaintenanceRecord
+from expenses.models import FuelExpense, OtherExpense
+from archive.query import aggregate_with_archive, grouped_with_archive
+from .summaries import (
+    vehicle_summary,
+    driver_summary,
+    trip_summary,
+    maintenance_summary,
+    fuel_cost_since,
+    other_cost_since
+)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ANALYTICS_QUERY_WORKERS,
+            thread_name_prefix='analytics-query'
+        )
+    return _executor
+
+
+def _run_query(query):
+    # Worker threads live outside the request cycle, so recycle their
+    # connections the way Django does between requests
+    close_old_connections()
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+class Report:
+    """Base class for reports made of independent queries"""
+    
+    def queries(self):
+        """Map of result name to zero-argument query callable"""
+        raise NotImplementedError
+    
+    def build(self, results):
+        """Combine query results into the response body"""
+        raise NotImplementedError
+    
+    def execute(self):
+        return {name: query() for name, query in self.queries().items()}
+    
+    async def aexecute(self):
+        loop = asyncio.get_running_loop()
+        queries = self.queries()
+        # Each query runs in a copy of the caller's context so it follows
+        # the request's database routing
+        values = await asyncio.gather(*(
+            loop.run_in_executor(_get_executor(), copy_context().run, _run_query, query)
+            for query in queries.values()
+        ))
+        return dict(zip(queries, values))
+    
+    def run(self):
+        return self.build(self.execute())
+    
+    async def arun(self):
+        return self.build(await self.aexecute())
+
+
+class DashboardReport(Report):
+    """Dashboard KPIs and 30 day financial summary"""
+    
+    def __init__(self):
+        self.thirty_days_ago = timezone.now().date() - timedelta(days=30)
+    
+    def queries(self):
+        return {
+            'vehicles': vehicle_summary,
+            'drivers': driver_summary,
+            'trips': trip_summary,
+            'maintenance': lambda: maintenance_summary(self.thirty_days_ago),
+            'fuel_cost': lambda: fuel_cost_since(self.thirty_days_ago),
+            'other_cost': lambda: other_cost_since(self.thirty_days_ago),
+        }
+    
+    def build(self, results):
+        vehicles = results['vehicles']
+        drivers = results['drivers']
+        trips = results['trips']
+        maintenance = results['maintenance']
+        
+        utilization_rate = 0
+        if vehicles['total'] > 0:
+            utilization_rate = round((vehicles['on_trip'] / vehicles['total']) * 100, 2)
+        
+        pending_cargo_tons = 0
+        if trips['pending_cargo_kg']:
+            pending_cargo_tons = round(float(trips['pending_cargo_kg']) / 1000, 2)
+        
+        fuel_costs = float(results['fuel_cost'])
+        maintenance_costs = float(maintenance['cost'] or 0)
+        other_costs = float(results['other_cost'])
+        
+        return {
+            'vehicles': {
+                'total': vehicles['total'],
+                'available': vehicles['available'],
+                'on_trip': vehicles['on_trip'],
+                'in_shop': vehicles['in_shop'],
+                'utilization_rate': utilization_rate
+            },
+            'drivers': {
+                'total': drivers['total'],
+                'on_duty': drivers['on_duty'],
+                'on_trip': drivers['on_trip'],
+                'avg_safety_score': drivers['avg_safety_score'],
+                'expired_licenses': drivers['expired_licenses']
+            },
+            'trips': {
+                'total': trips['total'],
+                'active': trips['active'],
+                'completed_today': trips['completed_today'],
+                'pending_cargo_tons': pending_cargo_tons
+            },
+            'maintenance': {
+                'in_progress': maintenance['in_progress'],
+                'scheduled_this_week': maintenance['scheduled_this_week'],
+                'overdue': maintenance['overdue']
+            },
+            'financial': {
+                'fuel_cost_30d': fuel_costs,
+                'maintenance_cost_30d': maintenance_costs,
+                'other_cost_30d': other_costs,
+                'total_operational_cost_30d': fuel_costs + maintenance_costs + other_costs
+            },
+            'last_updated': timezone.now()
+        }
+
+
+class FleetPerformanceReport(Report):
+    """Fuel efficiency, distance and per-vehicle utilization over a period"""
+    
+    def __init__(self, period_days=30):
+        self.period_days = period_days
+        self.start_date = timezone.now().date() - timedelta(days=period_days)
+    
+    def _completed_in_period(self):
+        return Q(status=Trip.Status.COMPLETED, actual_delivery_time__date__gte=self.start_date)
+    
+    def _fuel_data(self):
+        # The average price is derived from a sum so archived fills can be added
+        totals = aggregate_with_archive(
+            FuelExpense, self.start_date, Q(date__gte=self.start_date),
+            total_liters=Sum('liters'),
+            total_cost=Sum('total_cost'),
+            price_sum=Sum('price_per_liter'),
+            fills=Count('id')
+        )
+        price_sum = totals.pop('price_sum')
+        fills = totals.pop('fills')
+        totals['avg_price'] = price_sum / fills if fills else None
+        return totals
+    
+    def _distance_data(self):
+        return aggregate_with_archive(
+            Trip, self.start_date, self._completed_in_period(),
+            total_distance=Sum('actual_distance_km'),
+            total_trips=Count('id')
+        )
+    
+    def _vehicle_utilization(self):
+        per_vehicle = grouped_with_archive(
+            Trip, self.start_date, self._completed_in_period(), 'vehicle',
+            trips_completed=Count('id'),
+            total_distance=Sum('actual_distance_km')
+        )
+        empty = {'trips_completed': 0, 'total_distance': None}
+        rows = [
+            {**vehicle, **per_vehicle.get(vehicle['id'], empty)}
+            for vehicle in Vehicle.objects.exclude(status=Vehicle.Status.RETIRED).values('id', 'vehicle_id', 'name')
+        ]
+        # Top 10 for performance
+        rows.sort(key=lambda row: row['trips_completed'], reverse=True)
+        return rows[:10]
+    
+    def queries(self):
+        return {
+            'fuel_data': self._fuel_data,
+            'distance_data': self._distance_data,
+            'vehicle_utilization': self._vehicle_utilization,
+        }
+    
+    def build(self, results):
+        fuel_data = results['fuel_data']
+        distance_data = results['distance_data']
+        
+        # Calculate fuel efficiency (km per liter)
+        fuel_efficiency = 0
+        if fuel_data['total_liters'] and distance_data['total_distance']:
+            fuel_efficiency = round(
+                float(distance_data['total_distance']) / float(fuel_data['total_liters']), 2
+            )
+        
+        vehicle_utilization = []
+        for row in results['vehicle_utilization']:
+            trips_count = row['trips_completed']
+            total_distance = row['total_distance'] or 0
+            vehicle_utilization.append({
+                'vehicle_id': row['vehicle_id'],
+                'vehicle_name': row['name'],
+                'trips_completed': trips_count,
+                'total_distance_km': float(total_distance),
+                'avg_distance_per_trip': float(total_distance / trips_count) if trips_count > 0 else 0
+            })
+        
+        # Sort by trips completed
+        vehicle_utilization.sort(key=lambda x: x['trips_completed'], reverse=True)
+        
+        return {
+            'period_days': self.period_days,
+            'fuel_efficiency_km_per_liter': fuel_efficiency,
+            'fuel_data': fuel_data,
+            'distance_data': distance_data,
+            'vehicle_utilization': vehicle_utilization
+        }
+
+
+class FinancialReport(Report):
+    """Per-vehicle cost breakdown and monthly fuel trend over a period"""
+    
+    def __init__(self, period_days=90):
+        self.period_days = period_days
+        self.start_date = timezone.now().date() - timedelta(days=period_days)
+    
+    def _per_vehicle(self, model, filters, total):
+        return {
+            vehicle: row['total']
+            for vehicle, row in grouped_with_archive(model, self.start_date, filters, 'vehicle', total=total).items()
+        }
+    
+    def queries(self):
+        return {
+            'vehicles': lambda: list(
+                Vehicle.objects.values('id', 'vehicle_id', 'name', 'acquisition_cost')
+            ),
+            'fuel': lambda: self._per_vehicle(
+                FuelExpense, Q(date__gte=self.start_date), Sum('total_cost')
+            ),
+            'maintenance': lambda: dict(
+                MaintenanceRecord.objects.filter(
+                    status=MaintenanceRecord.Status.COMPLETED,
+                    completed_date__gte=self.start_date
+                ).order_by().values('vehicle').annotate(
+                    total=Sum(F('labor_cost') + F('parts_cost'))
+                ).values_list('vehicle', 'total')
+            ),
+            'other': lambda: self._per_vehicle(
+                OtherExpense, Q(date__gte=self.start_date), Sum('amount')
+            ),
+            'distance': lambda: self._per_vehicle(
+                Trip,
+                Q(status=Trip.Status.COMPLETED, actual_delivery_time__date__gte=self.start_date),
+                Sum('actual_distance_km')
+            ),
+            'monthly_trend': lambda: [
+                {'month': month, **row}
+                for month, row in sorted(grouped_with_archive(
+                    FuelExpense, self.start_date, Q(date__gte=self.start_date),
+                    {'month': TruncMonth('date')},
+                    fuel_total=Sum('total_cost')
+                ).items())
+            ],
+        }
+    
+    def build(self, results):
+        vehicle_costs = []
+        
+        for vehicle in results['vehicles']:
+            fuel_cost = float(results['fuel'].get(vehicle['id']) or 0)
+            maintenance_cost = float(results['maintenance'].get(vehicle['id']) or 0)
+            other_cost = float(results['other'].get(vehicle['id']) or 0)
+            total_cost = fuel_cost + maintenance_cost + other_cost
+            
+            # Calculate ROI if acquisition cost is available
+            roi = None
+            if vehicle['acquisition_cost'] and vehicle['acquisition_cost'] > 0:
+                roi = {
+                    'acquisition_cost': float(vehicle['acquisition_cost']),
+                    'operational_cost': total_cost,
+                    'cost_per_km': 0
+                }
+                
+                total_distance = results['distance'].get(vehicle['id']) or 0
+                if total_distance > 0:
+                    roi['cost_per_km'] = round(total_cost / float(total_distance), 2)
+            
+            vehicle_costs.append({
+                'vehicle_id': vehicle['vehicle_id'],
+                'vehicle_name': vehicle['name'],
+                'fuel_cost': fuel_cost,
+                'maintenance_cost': maintenance_cost,
+                'other_cost': other_cost,
+                'total_cost': total_cost,
+                'roi': roi
+            })
+        
+        # Sort by total cost
+        vehicle_costs.sort(key=lambda x: x['total_cost'], reverse=True)
+        
+        return {
+            'period_days': self.period_days,
+            'vehicle_costs': vehicle_costs[:20],  # Top 20 by cost
+            'monthly_trend': results['monthly_trend']
+        }
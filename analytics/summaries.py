@@ -0,0 +1,112 @@
+"""
+Fleet summaries built from one conditional aggregate query per model.
+
+Each function is an independent query, so reports can run them one after
+another or concurrently.
+"""
+from django.db.models import Sum, Avg, Count, F, Q
+from django.utils import timezone
+from datetime import timedelta
+
+from vehicles.models import Vehicle
+from drivers.models import Driver
+from trips.models import Trip
+from maintenance.models import MaintenanceRecord
+from expenses.models import FuelExpense, OtherExpense
+from archive.query import aggregate_with_archive, archived_aggregate
+
+
+def vehicle_summary():
+    """Vehicle counts by status"""
+    return Vehicle.objects.aggregate(
+        total=Count('id'),
+        available=Count('id', filter=Q(status=Vehicle.Status.AVAILABLE)),
+        on_trip=Count('id', filter=Q(status=Vehicle.Status.ON_TRIP)),
+        in_shop=Count('id', filter=Q(status=Vehicle.Status.IN_SHOP)),
+        retired=Count('id', filter=Q(status=Vehicle.Status.RETIRED)),
+    )
+
+
+def driver_summary():
+    """Driver counts by status plus license and safety figures"""
+    today = timezone.now().date()
+    summary = Driver.objects.aggregate(
+        total=Count('id'),
+        on_duty=Count('id', filter=Q(status=Driver.Status.ON_DUTY)),
+        off_duty=Count('id', filter=Q(status=Driver.Status.OFF_DUTY)),
+        on_trip=Count('id', filter=Q(status=Driver.Status.ON_TRIP)),
+        suspended=Count('id', filter=Q(status=Driver.Status.SUSPENDED)),
+        expired_licenses=Count('id', filter=Q(license_expiry_date__lt=today)),
+        avg_safety_score=Avg('safety_score'),
+    )
+    summary['avg_safety_score'] = summary['avg_safety_score'] or 0
+    return summary
+
+
+def trip_summary():
+    """Trip counts by status plus active, delayed and pending cargo figures"""
+    now = timezone.now()
+    summary = Trip.objects.aggregate(
+        total=Count('id'),
+        draft=Count('id', filter=Q(status=Trip.Status.DRAFT)),
+        dispatched=Count('id', filter=Q(status=Trip.Status.DISPATCHED)),
+        in_progress=Count('id', filter=Q(status=Trip.Status.IN_PROGRESS)),
+        completed=Count('id', filter=Q(status=Trip.Status.COMPLETED)),
+        cancelled=Count('id', filter=Q(status=Trip.Status.CANCELLED)),
+        delayed=Count('id', filter=Q(
+            status__in=[Trip.Status.DISPATCHED, Trip.Status.IN_PROGRESS],
+            is_delayed=True
+        )),
+        completed_today=Count('id', filter=Q(
+            status=Trip.Status.COMPLETED,
+            actual_delivery_time__date=now.date()
+        )),
+        pending_cargo_kg=Sum('cargo_weight_kg', filter=Q(status=Trip.Status.DRAFT)),
+    )
+    summary['active'] = summary['dispatched'] + summary['in_progress']
+    
+    # Closed trips may have moved to the archive
+    archived = archived_aggregate(
+        Trip, None,
+        total=Count('id'),
+        completed=Count('id', filter=Q(status=Trip.Status.COMPLETED)),
+        cancelled=Count('id', filter=Q(status=Trip.Status.CANCELLED)),
+    )
+    for name, count in (archived or {}).items():
+        summary[name] += count
+    return summary
+
+
+def maintenance_summary(cost_since):
+    """Maintenance workload counts and completed cost since a date"""
+    today = timezone.now().date()
+    return MaintenanceRecord.objects.aggregate(
+        in_progress=Count('id', filter=Q(status=MaintenanceRecord.Status.IN_PROGRESS)),
+        scheduled_this_week=Count('id', filter=Q(
+            status=MaintenanceRecord.Status.SCHEDULED,
+            scheduled_date__gte=today,
+            scheduled_date__lte=today + timedelta(days=7)
+        )),
+        overdue=Count('id', filter=Q(
+            status=MaintenanceRecord.Status.SCHEDULED,
+            scheduled_date__lt=today
+        )),
+        cost=Sum(F('labor_cost') + F('parts_cost'), filter=Q(
+            status=MaintenanceRecord.Status.COMPLETED,
+            completed_date__gte=cost_since
+        )),
+    )
+
+
+def fuel_cost_since(since):
+    """Total fuel spend since a date"""
+    return aggregate_with_archive(
+        FuelExpense, since, Q(date__gte=since), total=Sum('total_cost')
+    )['total'] or 0
+
+
+def other_cost_since(since):
+    """Total other expense spend since a date"""
+    return aggregate_with_archive(
+        OtherExpense, since, Q(date__gte=since), total=Sum('amount')
+    )['total'] or 0
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.factories import api_client, make_driver, make_fill, make_trip, make_vehicle
+from drivers.hours import record_driving
+from drivers.models import Driver
+from trips.models import Trip
+from .reports import DashboardReport, FinancialReport, FleetPerformanceReport
+
+
+class DispatchBoardTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+    
+    def test_available_drivers_match_the_drivers_endpoint(self):
+        rested, tired = make_driver(1), make_driver(2)
+        make_driver(3, status=Driver.Status.SUSPENDED)
+        now = timezone.now()
+        record_driving(rested.pk, now - timedelta(hours=3), now - timedelta(hours=1))
+        record_driving(tired.pk, now - timedelta(hours=12), now - timedelta(hours=1))
+        
+        board = self.client.get('/api/dispatch-board/').json()['available_drivers']
+        
+        self.assertEqual(board, self.client.get('/api/drivers/available/').json())
+        self.assertEqual([row['driver_id'] for row in board], [rested.driver_id])
+        self.assertEqual(board[0]['driving_hours']['24h'], 2.0)
+    
+    def add_fleet(self, size, offset=0):
+        """``size`` vehicles and drivers, each with a trip under way"""
+        for number in range(offset, offset + size):
+            make_trip(make_vehicle(number), make_driver(number), status=Trip.Status.DISPATCHED)
+            make_vehicle(f'spare-{number}')
+            make_driver(f'spare-{number}')
+    
+    def test_query_count_does_not_grow_with_the_fleet(self):
+        for size, offset in [(2, 0), (10, 2)]:
+            self.add_fleet(size, offset)
+            with self.assertNumQueries(14):
+                response = self.client.get('/api/dispatch-board/')
+            self.assertEqual(len(response.json()['active_trips']), offset + size)
+
+
+class ConcurrentReportTests(TransactionTestCase):
+    """``aexecute`` queries from worker threads, which only see committed rows"""
+    
+    def test_concurrent_queries_return_the_sequential_results(self):
+        for number in range(3):
+            vehicle, driver = make_vehicle(number), make_driver(number)
+            start = timezone.now() - timedelta(days=number + 1)
+            make_trip(
+                vehicle, driver, start=start, status=Trip.Status.COMPLETED, actual_pickup_time=start,
+                actual_delivery_time=start + timedelta(hours=3), actual_distance_km=100 * (number + 1)
+            )
+            make_fill(vehicle, cost=50 * (number + 1))
+        
+        for report in [DashboardReport(), FleetPerformanceReport(30), FinancialReport(90)]:
+            with self.subTest(report=type(report).__name__):
+                self.assertEqual(async_to_sync(report.aexecute)(), report.execute())
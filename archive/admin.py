@@ -0,0 +1,37 @@
+from django.contrib import admin
+from .models import ArchiveBoundary, ArchivedTrip, ArchivedFuelExpense, ArchivedOtherExpense
+
+
+class ArchivedAdmin(admin.ModelAdmin):
+    """Archived rows are read-only"""
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedTrip)
+class ArchivedTripAdmin(ArchivedAdmin):
+    list_display = ['trip_id', 'status', 'vehicle_id', 'driver_id', 'actual_delivery_time', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['trip_id']
+
+
+@admin.register(ArchivedFuelExpense)
+class ArchivedFuelExpenseAdmin(ArchivedAdmin):
+    list_display = ['expense_id', 'vehicle_id', 'date', 'liters', 'total_cost', 'archived_at']
+    search_fields = ['expense_id']
+
+
+@admin.register(ArchivedOtherExpense)
+class ArchivedOtherExpenseAdmin(ArchivedAdmin):
+    list_display = ['expense_id', 'vehicle_id', 'expense_type', 'date', 'amount', 'archived_at']
+    list_filter = ['expense_type']
+    search_fields = ['expense_id']
+
+
+@admin.register(ArchiveBoundary)
+class ArchiveBoundaryAdmin(ArchivedAdmin):
+    list_display = ['table', 'archived_before', 'updated_at']
@@ -0,0 +1,194 @@
+"""
+Hot/cold archival of closed trips and old expenses.
+
+Completed and cancelled trips closed more than ``ARCHIVE_AFTER_MONTHS`` ago
+move to ``archived_trips`` together with their fuel and other expenses;
+expenses not tied to a trip move once their date is past the same cutoff.
+A trip with an expense dated after the cutoff waits, so every archived row
+stays older than its table's ``ArchiveBoundary``.
+
+Rows move ``ARCHIVE_BATCH_SIZE`` trips (or expenses) at a time, each batch
+in its own short transaction: copy to the archive table, detach telemetry,
+drop fuel anomalies, delete the hot rows and write tombstones so delta sync
+clients evict them. The boundary is raised before anything moves, so a
+reader never skips archived rows it needs.
+"""
+import calendar
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Tombstone
+from core.stats import bump_data_version
+from expenses.models import FuelAnomaly, FuelExpense, OtherExpense
+from telemetry.models import TelemetryChunk
+from trips.models import Trip
+from .models import ArchiveBoundary, ArchivedTrip, ArchivedFuelExpense, ArchivedOtherExpense
+
+def months_ago(today, months):
+    """``today`` moved back ``months`` calendar months, clamped to month end"""
+    month_index = today.year * 12 + today.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return date(year, month, min(today.day, calendar.monthrange(year, month)[1]))
+
+
+def _raise_boundary(models, cutoff):
+    for model in models:
+        boundary, created = ArchiveBoundary.objects.get_or_create(
+            table=model._meta.db_table, defaults={'archived_before': cutoff}
+        )
+        if not created and boundary.archived_before < cutoff:
+            boundary.archived_before = cutoff
+            boundary.save(update_fields=['archived_before', 'updated_at'])
+
+
+def _archived_trip(row):
+    return ArchivedTrip(
+        id=row['id'],
+        trip_id=row['trip_id'],
+        vehicle_id=row['vehicle_id'],
+        driver_id=row['driver_id'],
+        status=row['status'],
+        scheduled_delivery_time=row['scheduled_delivery_time'],
+        actual_delivery_time=row['actual_delivery_time'],
+        actual_distance_km=row['actual_distance_km'],
+        cargo_weight_kg=row['cargo_weight_kg'],
+        data=row
+    )
+
+
+def _archived_fuel_expense(row):
+    return ArchivedFuelExpense(
+        id=row['id'],
+        expense_id=row['expense_id'],
+        vehicle_id=row['vehicle_id'],
+        trip_id=row['trip_id'],
+        date=row['date'],
+        fuel_type=row['fuel_type'],
+        liters=row['liters'],
+        price_per_liter=row['price_per_liter'],
+        total_cost=row['total_cost'],
+        data=row
+    )
+
+
+def _archived_other_expense(row):
+    return ArchivedOtherExpense(
+        id=row['id'],
+        expense_id=row['expense_id'],
+        vehicle_id=row['vehicle_id'],
+        trip_id=row['trip_id'],
+        expense_type=row['expense_type'],
+        date=row['date'],
+        amount=row['amount'],
+        data=row
+    )
+
+
+# Hot model: (archive model, archive row from a hot ``values()`` row, natural ID field)
+ARCHIVE_ROWS = {
+    Trip: (ArchivedTrip, _archived_trip, 'trip_id'),
+    FuelExpense: (ArchivedFuelExpense, _archived_fuel_expense, 'expense_id'),
+    OtherExpense: (ArchivedOtherExpense, _archived_other_expense, 'expense_id'),
+}
+
+
+def _move(queryset):
+    """Copy the rows of ``queryset`` to their archive table and delete them"""
+    model = queryset.model
+    archive_model, to_archive, natural_id_field = ARCHIVE_ROWS[model]
+    rows = list(queryset.values())
+    if not rows:
+        return 0
+    archive_model.objects.bulk_create([to_archive(row) for row in rows], batch_size=settings.ARCHIVE_BATCH_SIZE)
+    # A raw delete skips per-row signals, so write the tombstones in bulk
+    model.objects.filter(pk__in=[row['id'] for row in rows])._raw_delete(model.objects.db)
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(model_label=model._meta.label_lower, object_id=row['id'], natural_id=row[natural_id_field])
+            for row in rows
+        ],
+        batch_size=settings.ARCHIVE_BATCH_SIZE
+    )
+    return len(rows)
+
+
+def _archive_trip_batch(cutoff_at, cutoff):
+    with transaction.atomic():
+        pks = list(
+            Trip.objects.select_for_update().filter(
+                Q(status=Trip.Status.COMPLETED, actual_delivery_time__lt=cutoff_at)
+                | Q(status=Trip.Status.CANCELLED, updated_at__lt=cutoff_at)
+            ).exclude(
+                fuel_expenses__date__gte=cutoff
+            ).exclude(
+                other_expenses__date__gte=cutoff
+            ).order_by('pk').values_list('pk', flat=True)[:settings.ARCHIVE_BATCH_SIZE]
+        )
+        if not pks:
+            return 0, 0
+        
+        fuel_expenses = FuelExpense.objects.filter(trip_id__in=pks)
+        other_expenses = OtherExpense.objects.filter(trip_id__in=pks)
+        FuelAnomaly.objects.filter(fuel_expense__in=fuel_expenses)._raw_delete(FuelAnomaly.objects.db)
+        expenses = _move(fuel_expenses) + _move(other_expenses)
+        TelemetryChunk.objects.filter(trip_id__in=pks).update(trip=None)
+        trips = _move(Trip.objects.filter(pk__in=pks))
+    return trips, expenses
+
+
+def _archive_expense_batch(model, cutoff):
+    with transaction.atomic():
+        pks = list(
+            model.objects.select_for_update().filter(
+                trip__isnull=True, date__lt=cutoff
+            ).order_by('pk').values_list('pk', flat=True)[:settings.ARCHIVE_BATCH_SIZE]
+        )
+        if not pks:
+            return 0
+        if model is FuelExpense:
+            FuelAnomaly.objects.filter(fuel_expense__in=pks)._raw_delete(FuelAnomaly.objects.db)
+        return _move(model.objects.filter(pk__in=pks))
+
+
+def archive_closed_records(months=None, today=None, progress=None):
+    """Archive closed trips and expenses older than ``months`` months.
+    
+    Returns ``{'trips': n, 'expenses': n}``. ``progress(moved, message)``
+    is called after each batch.
+    """
+    months = settings.ARCHIVE_AFTER_MONTHS if months is None else months
+    cutoff = months_ago(today or timezone.localdate(), months)
+    cutoff_at = timezone.make_aware(datetime.combine(cutoff, time.min))
+    _raise_boundary([Trip, FuelExpense, OtherExpense], cutoff)
+    
+    moved = {'trips': 0, 'expenses': 0}
+    
+    def report(message):
+        for model, (archive_model, _, _) in ARCHIVE_ROWS.items():
+            bump_data_version(model)
+            bump_data_version(archive_model)
+        if progress:
+            progress(moved['trips'] + moved['expenses'], message)
+    
+    while True:
+        trips, expenses = _archive_trip_batch(cutoff_at, cutoff)
+        if not trips:
+            break
+        moved['trips'] += trips
+        moved['expenses'] += expenses
+        report(f"Archived {moved['trips']} trips")
+    
+    for model in [FuelExpense, OtherExpense]:
+        while True:
+            expenses = _archive_expense_batch(model, cutoff)
+            if not expenses:
+                break
+            moved['expenses'] += expenses
+            report(f"Archived {moved['expenses']} expenses")
+    
+    return moved
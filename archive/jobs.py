@@ -0,0 +1,13 @@
+from jobs.registry import job
+from .archiver import archive_closed_records
+
+
+@job('archive.records')
+def archive_records(ctx, months=None):
+    """Move closed trips and old expenses to the archive tables"""
+    result = archive_closed_records(
+        months=months,
+        progress=lambda moved, message: ctx.progress(moved, message=message)
+    )
+    ctx.progress(message='Done')
+    return result
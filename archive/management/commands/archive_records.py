@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from archive.archiver import archive_closed_records
+
+
+class Command(BaseCommand):
+    help = 'Move closed trips and old expenses to the archive tables'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, help='Archive records older than this many months (default ARCHIVE_AFTER_MONTHS)')
+    
+    def handle(self, *args, **options):
+        moved = archive_closed_records(months=options['months'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved['trips']} trips and {moved['expenses']} expenses"))
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:50
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('drivers', '0005_driver_hours'),
+        ('vehicles', '0004_vehicle_maintenance_overdue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveBoundary',
+            fields=[
+                ('table', models.CharField(help_text='Hot table name, e.g. trips', max_length=50, primary_key=True, serialize=False)),
+                ('archived_before', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'archive boundaries',
+                'db_table': 'archive_boundaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedFuelExpense',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('expense_id', models.CharField(db_index=True, max_length=20)),
+                ('trip_id', models.BigIntegerField(null=True)),
+                ('date', models.DateField()),
+                ('fuel_type', models.CharField(max_length=20)),
+                ('liters', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('price_per_liter', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('total_cost', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('vehicle', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='vehicles.vehicle')),
+            ],
+            options={
+                'db_table': 'archived_fuel_expenses',
+                'indexes': [models.Index(fields=['date'], name='archived_fu_date_987e60_idx'), models.Index(fields=['vehicle', 'date'], name='archived_fu_vehicle_3b8a87_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOtherExpense',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('expense_id', models.CharField(db_index=True, max_length=20)),
+                ('trip_id', models.BigIntegerField(null=True)),
+                ('expense_type', models.CharField(max_length=20)),
+                ('date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('vehicle', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='vehicles.vehicle')),
+            ],
+            options={
+                'db_table': 'archived_other_expenses',
+                'indexes': [models.Index(fields=['date'], name='archived_ot_date_c084c6_idx'), models.Index(fields=['vehicle', 'date'], name='archived_ot_vehicle_074896_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTrip',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('trip_id', models.CharField(db_index=True, max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('scheduled_delivery_time', models.DateTimeField()),
+                ('actual_delivery_time', models.DateTimeField(null=True)),
+                ('actual_distance_km', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('cargo_weight_kg', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('driver', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='drivers.driver')),
+                ('vehicle', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='vehicles.vehicle')),
+            ],
+            options={
+                'db_table': 'archived_trips',
+                'indexes': [models.Index(fields=['status', 'actual_delivery_time'], name='archived_tr_status_6cd8a8_idx'), models.Index(fields=['vehicle', 'actual_delivery_time'], name='archived_tr_vehicle_81a5b2_idx'), models.Index(fields=['driver', 'actual_delivery_time'], name='archived_tr_driver__78c717_idx')],
+            },
+        ),
+    ]
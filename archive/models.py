@@ -0,0 +1,113 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+def _archived_reference(to):
+    # No database constraint: an archived row outlives deletes on the hot side
+    return models.ForeignKey(
+        to,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+
+
+class ArchiveBoundary(models.Model):
+    """Upper bound on the dates held in an archive table.
+    
+    Every archived row is dated before ``archived_before``, so a query whose
+    range starts on or after it never needs the archive.
+    """
+    
+    table = models.CharField(max_length=50, primary_key=True, help_text="Hot table name, e.g. trips")
+    archived_before = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'archive_boundaries'
+        verbose_name_plural = 'archive boundaries'
+    
+    def __str__(self):
+        return f"{self.table} archived before {self.archived_before}"
+
+
+class ArchivedTrip(models.Model):
+    """A completed or cancelled trip moved out of ``trips``.
+    
+    Columns that reports filter or aggregate on keep their ``Trip`` names so
+    the same lookups run on both tables; ``data`` holds the full original row.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    trip_id = models.CharField(max_length=20, db_index=True)
+    vehicle = _archived_reference('vehicles.Vehicle')
+    driver = _archived_reference('drivers.Driver')
+    status = models.CharField(max_length=20)
+    scheduled_delivery_time = models.DateTimeField()
+    actual_delivery_time = models.DateTimeField(null=True)
+    actual_distance_km = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    cargo_weight_kg = models.DecimalField(max_digits=10, decimal_places=2)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'archived_trips'
+        indexes = [
+            models.Index(fields=['status', 'actual_delivery_time']),
+            models.Index(fields=['vehicle', 'actual_delivery_time']),
+            models.Index(fields=['driver', 'actual_delivery_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.trip_id} ({self.status}, archived)"
+
+
+class ArchivedFuelExpense(models.Model):
+    """A fuel expense moved out of ``fuel_expenses``"""
+    
+    id = models.BigIntegerField(primary_key=True)
+    expense_id = models.CharField(max_length=20, db_index=True)
+    vehicle = _archived_reference('vehicles.Vehicle')
+    trip_id = models.BigIntegerField(null=True)
+    date = models.DateField()
+    fuel_type = models.CharField(max_length=20)
+    liters = models.DecimalField(max_digits=8, decimal_places=2)
+    price_per_liter = models.DecimalField(max_digits=8, decimal_places=2)
+    total_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'archived_fuel_expenses'
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['vehicle', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.expense_id} ({self.date}, archived)"
+
+
+class ArchivedOtherExpense(models.Model):
+    """An other expense moved out of ``other_expenses``"""
+    
+    id = models.BigIntegerField(primary_key=True)
+    expense_id = models.CharField(max_length=20, db_index=True)
+    vehicle = _archived_reference('vehicles.Vehicle')
+    trip_id = models.BigIntegerField(null=True)
+    expense_type = models.CharField(max_length=20)
+    date = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'archived_other_expenses'
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['vehicle', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.expense_id} ({self.date}, archived)"
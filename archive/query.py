@@ -0,0 +1,151 @@
+"""
+Archive-aware aggregates.
+
+Reports aggregate the hot table as before and add the archived rows only
+when the range they ask for starts before the table's ``ArchiveBoundary``
+(``since=None`` means all time). Archived rows never change between archive
+runs, so their share is cached against the archive model's data version.
+
+Only additive aggregates (``Count``, ``Sum``) can be combined; derive
+averages from a sum and a count.
+"""
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.stats import data_version
+from expenses.models import FuelExpense, OtherExpense
+from trips.models import Trip
+from .models import ArchiveBoundary, ArchivedTrip, ArchivedFuelExpense, ArchivedOtherExpense
+
+ARCHIVES = {
+    Trip: ArchivedTrip,
+    FuelExpense: ArchivedFuelExpense,
+    OtherExpense: ArchivedOtherExpense,
+}
+
+
+def archive_boundary(model):
+    """Date every archived row of ``model`` is older than, or None"""
+    return ArchiveBoundary.objects.filter(table=model._meta.db_table).values_list(
+        'archived_before', flat=True
+    ).first()
+
+
+def needs_archive(model, since):
+    """Whether rows of ``model`` dated on or after ``since`` may be archived"""
+    boundary = archive_boundary(model)
+    if boundary is None:
+        return False
+    if since is None:
+        return True
+    if isinstance(since, datetime):
+        since = timezone.localdate(since)
+    return since < boundary
+
+
+def _cached(archived, description, compute):
+    timeout = settings.ARCHIVE_CACHE_TIMEOUT
+    if not timeout:
+        return compute()
+    digest = hashlib.md5(description.encode()).hexdigest()
+    key = f'archive:{archived._meta.label_lower}:{data_version(archived)}:{digest}'
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, timeout)
+    return result
+
+
+def _add(hot, cold):
+    if cold is None:
+        return hot
+    if hot is None:
+        return cold
+    return hot + cold
+
+
+def archived_aggregate(model, since, filters=Q(), **aggregates):
+    """``aggregate(**aggregates)`` over archived rows of ``model`` matching
+    ``filters``, or None when ``since`` is within hot data.
+    """
+    if not needs_archive(model, since):
+        return None
+    archived = ARCHIVES[model]
+    return _cached(
+        archived, f'aggregate:{filters!r}:{sorted(aggregates.items())!r}',
+        lambda: archived.objects.filter(filters).aggregate(**aggregates)
+    )
+
+
+def aggregate_with_archive(model, since, filters=Q(), **aggregates):
+    """``aggregate(**aggregates)`` over hot and, when needed, archived rows"""
+    result = model.objects.filter(filters).aggregate(**aggregates)
+    cold = archived_aggregate(model, since, filters, **aggregates)
+    if cold:
+        result = {name: _add(value, cold[name]) for name, value in result.items()}
+    return result
+
+
+def _grouped(queryset, group_by, aggregates):
+    queryset = queryset.order_by()
+    if isinstance(group_by, dict):
+        queryset = queryset.annotate(**group_by)
+        keys = list(group_by)
+    else:
+        keys = [group_by]
+    if len(keys) == 1:
+        group = lambda row: row.pop(keys[0])
+    else:
+        group = lambda row: tuple(row.pop(key) for key in keys)
+    return {
+        group(row): row
+        for row in queryset.values(*keys).annotate(**aggregates)
+    }
+
+
+def _archived_grouped(model, filters, group_by, aggregates):
+    archived = ARCHIVES[model]
+    return _cached(
+        archived, f'grouped:{filters!r}:{group_by!r}:{sorted(aggregates.items())!r}',
+        lambda: _grouped(archived.objects.filter(filters), group_by, aggregates)
+    )
+
+
+def grouped_with_archive(model, since, filters, group_by, **aggregates):
+    """``{group: {name: value}}`` over hot and, when needed, archived rows.
+    
+    ``group_by`` is a field name or ``{name: expression}``, e.g.
+    ``{'month': TruncMonth('date')}``; with several expressions each group
+    is a tuple of their values.
+    """
+    result = _grouped(model.objects.filter(filters), group_by, aggregates)
+    if not needs_archive(model, since):
+        return result
+    
+    for group, row in _archived_grouped(model, filters, group_by, aggregates).items():
+        if group in result:
+            result[group] = {name: _add(value, row[name]) for name, value in result[group].items()}
+        else:
+            result[group] = row
+    return result
+
+
+def add_archived_breakdown(rows, model, field, **aggregates):
+    """Add all-time archived rows to a ``core.stats.breakdown`` result.
+    
+    ``aggregates`` are the breakdown's aggregates that the archive can
+    answer; the rest stay as counted on the hot table.
+    """
+    if not needs_archive(model, None):
+        return rows
+    aggregates = {'count': Count('pk'), **aggregates}
+    for group, cold in _archived_grouped(model, Q(), field, aggregates).items():
+        if group in rows:
+            for name, value in cold.items():
+                rows[group][name] = _add(rows[group][name], value or 0)
+    return rows
@@ -0,0 +1,8 @@
+from celery import shared_task
+from .archiver import archive_closed_records as archive
+
+
+@shared_task(name='archive.archive_closed_records', ignore_result=True)
+def archive_closed_records():
+    """Weekly move of closed trips and old expenses to the archive tables"""
+    return archive()
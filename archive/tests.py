@@ -0,0 +1,81 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.factories import api_client, make_driver, make_fill, make_trip, make_vehicle
+from drivers.jobs import reconcile_counters
+from drivers.models import Driver
+from jobs.models import Job
+from jobs.registry import JobContext
+from trips.models import Trip
+from vehicles.models import Vehicle
+from .archiver import archive_closed_records
+from .models import ArchivedFuelExpense, ArchivedTrip
+
+
+def make_closed_trip(vehicle, driver, days_ago, status=Trip.Status.COMPLETED, distance=100):
+    start = timezone.now() - timedelta(days=days_ago)
+    fields = {}
+    if status == Trip.Status.COMPLETED:
+        fields = {
+            'actual_pickup_time': start, 'actual_delivery_time': start + timedelta(hours=4),
+            'actual_distance_km': Decimal(distance)
+        }
+    trip = make_trip(vehicle, driver, start=start, status=status, **fields)
+    # Cancelled trips are archived by when they were last touched
+    Trip.objects.filter(pk=trip.pk).update(updated_at=start)
+    return trip
+
+
+def past_date(days):
+    return timezone.localdate() - timedelta(days=days)
+
+
+class ArchiveThenReconcileTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        self.vehicle, self.driver = make_vehicle(1), make_driver(1)
+        
+        old = make_closed_trip(self.vehicle, self.driver, days_ago=450, distance=120)
+        make_closed_trip(self.vehicle, self.driver, days_ago=440, distance=80)
+        make_closed_trip(self.vehicle, self.driver, days_ago=430, status=Trip.Status.CANCELLED)
+        make_closed_trip(self.vehicle, self.driver, days_ago=10, distance=50)
+        make_closed_trip(self.vehicle, self.driver, days_ago=5, status=Trip.Status.CANCELLED)
+        make_fill(self.vehicle, past_date(450), 300, trip=old)
+        make_fill(self.vehicle, past_date(420), 200, fuel_type='PETROL')
+        make_fill(self.vehicle, past_date(10), 100)
+        self.reconcile()
+    
+    def reconcile(self):
+        return reconcile_counters(JobContext(Job.objects.create(kind='drivers.reconcile_counters')))
+    
+    def snapshot(self):
+        driver = Driver.objects.get(pk=self.driver.pk)
+        vehicle = Vehicle.objects.get(pk=self.vehicle.pk)
+        return {
+            'counters': (driver.total_trips_completed, driver.total_distance_km),
+            'completion_rate': driver.completion_rate,
+            'total_fuel_cost': vehicle.total_fuel_cost,
+            'driver_api': self.client.get(f'/api/drivers/{driver.pk}/').json()['completion_rate'],
+            'vehicle_api': self.client.get(f'/api/vehicles/{vehicle.pk}/').json()['total_fuel_cost'],
+            'trend': self.client.get('/api/fuel-expenses/monthly_trend/?months=18').json(),
+            'trend_by_fuel_type': self.client.get(
+                '/api/fuel-expenses/monthly_trend/?months=18&group_by=fuel_type'
+            ).json(),
+        }
+    
+    def test_archiving_leaves_counters_and_rollups_unchanged(self):
+        before = self.snapshot()
+        self.assertEqual(before['counters'], (3, Decimal(250)))
+        self.assertEqual(before['completion_rate'], 60.0)
+        
+        moved = archive_closed_records(months=12)
+        self.assertEqual(moved, {'trips': 3, 'expenses': 2})
+        self.assertEqual(ArchivedTrip.objects.count(), 3)
+        self.assertEqual(ArchivedFuelExpense.objects.count(), 2)
+        
+        self.assertEqual(self.reconcile(), {'checked': 1, 'corrected': 0})
+        self.assertEqual(self.snapshot(), before)
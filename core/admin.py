@@ -0,0 +1,21 @@
+from django.contrib import admin
+from .models import Tombstone, LaneDistance
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    """Admin configuration for Tombstone model"""
+    
+    list_display = ['model_label', 'object_id', 'natural_id', 'deleted_at']
+    list_filter = ['model_label']
+    search_fields = ['natural_id']
+    readonly_fields = ['model_label', 'object_id', 'natural_id', 'deleted_at']
+
+
+@admin.register(LaneDistance)
+class LaneDistanceAdmin(admin.ModelAdmin):
+    """Admin configuration for LaneDistance model"""
+    
+    list_display = ['key', 'distance_km', 'created_at']
+    search_fields = ['key']
+    readonly_fields = ['key', 'distance_km', 'created_at']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .instrumentation import install
+        connection_created.connect(install, dispatch_uid='core.instrumentation.install')
@@ -0,0 +1,45 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+
+def authenticate_jwt(request, allow_query_token=False):
+    """Resolve the user for a plain Django request from its JWT.
+    
+    ``allow_query_token`` also accepts ``?token=`` for clients such as
+    EventSource that cannot set an Authorization header.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None and allow_query_token:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def async_jwt_required(allow_query_token=False):
+    """Protect an async view with the same JWTs the DRF API accepts"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await sync_to_async(authenticate_jwt)(request, allow_query_token)
+            if user is None:
+                return JsonResponse(
+                    {'detail': 'Authentication credentials were not provided or are invalid.'},
+                    status=401
+                )
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,175 @@
+"""
+Compliance sweep over driver licenses and scheduled maintenance.
+
+Runs daily from Celery beat (or ``manage.py sweep_compliance``). Each step
+walks one existing index and applies changes with bulk updates in batches
+of ``COMPLIANCE_BATCH_SIZE``:
+
+* drivers whose license has expired are suspended, so availability checks
+  can rely on ``status`` alone;
+* drivers whose license expires within ``COMPLIANCE_LICENSE_WARNING_DAYS``
+  get one ``driver.license_expiring`` notification per expiry date;
+* vehicles with scheduled maintenance past its date are flagged
+  ``maintenance_overdue``, and unflagged once it is started, completed or
+  rescheduled.
+
+Notifications are outbox events, so consumers of the event bus deliver them.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q, F
+from django.utils import timezone
+
+from drivers.models import Driver
+from events.bus import record_events
+from events.domain import DriverStatusChanged, DriverLicenseExpiring, VehicleMaintenanceOverdue
+from maintenance.models import MaintenanceRecord
+from vehicles.models import Vehicle
+from .stats import bump_data_version
+
+AVAILABLE_DRIVER_STATUSES = [Driver.Status.ON_DUTY, Driver.Status.OFF_DUTY]
+
+
+def _in_batches(queryset, fields, batch_size):
+    """Yield batches of ``values_list`` rows until ``queryset`` is empty.
+    
+    Every batch must be updated so it no longer matches the queryset.
+    """
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.values_list(*fields)[:batch_size])
+            if not rows:
+                return
+            yield rows
+
+
+def suspend_expired_licenses(today, batch_size):
+    """Suspend available drivers whose license expired before ``today``"""
+    expired = Driver.objects.filter(
+        status__in=AVAILABLE_DRIVER_STATUSES,
+        license_expiry_date__lt=today
+    ).order_by()
+    
+    suspended = 0
+    for rows in _in_batches(expired, ['pk', 'driver_id', 'status'], batch_size):
+        Driver.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            status=Driver.Status.SUSPENDED,
+            updated_at=timezone.now()
+        )
+        record_license_suspensions(rows)
+        suspended += len(rows)
+    return suspended
+
+
+def record_license_suspensions(rows):
+    """Record ``driver.status_changed`` events for drivers suspended over an
+    expired license, from ``(pk, driver_id, old_status)`` rows.
+    """
+    record_events(
+        DriverStatusChanged(
+            id=pk,
+            natural_id=driver_id,
+            old_status=old_status,
+            status=Driver.Status.SUSPENDED,
+            reason='License expired'
+        )
+        for pk, driver_id, old_status in rows
+    )
+
+
+def warn_expiring_licenses(today, batch_size):
+    """Queue one warning per driver and expiry date inside the warning window"""
+    expiring = Driver.objects.filter(
+        license_expiry_date__gte=today,
+        license_expiry_date__lte=today + timedelta(days=settings.COMPLIANCE_LICENSE_WARNING_DAYS)
+    ).exclude(
+        status=Driver.Status.SUSPENDED
+    ).filter(
+        Q(license_warning_sent_for__isnull=True) | ~Q(license_warning_sent_for=F('license_expiry_date'))
+    ).order_by()
+    
+    warned = 0
+    for rows in _in_batches(expiring, ['pk', 'driver_id', 'license_expiry_date'], batch_size):
+        Driver.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            license_warning_sent_for=F('license_expiry_date')
+        )
+        record_events(
+            DriverLicenseExpiring(
+                id=pk,
+                natural_id=driver_id,
+                license_expiry_date=expiry.isoformat(),
+                days_left=(expiry - today).days
+            )
+            for pk, driver_id, expiry in rows
+        )
+        warned += len(rows)
+    return warned
+
+
+def refresh_maintenance_flags(today=None, vehicle_ids=None, batch_size=None):
+    """Sync ``Vehicle.maintenance_overdue`` with overdue scheduled maintenance.
+    
+    Limited to ``vehicle_ids`` when given. Returns ``(flagged, cleared)``.
+    """
+    today = today or timezone.now().date()
+    batch_size = batch_size or settings.COMPLIANCE_BATCH_SIZE
+    
+    overdue = MaintenanceRecord.objects.filter(
+        status=MaintenanceRecord.Status.SCHEDULED,
+        scheduled_date__lt=today
+    )
+    vehicles = Vehicle.objects.order_by()
+    if vehicle_ids is not None:
+        overdue = overdue.filter(vehicle_id__in=vehicle_ids)
+        vehicles = vehicles.filter(pk__in=vehicle_ids)
+    overdue_vehicles = overdue.values('vehicle_id')
+    
+    newly_overdue = vehicles.filter(maintenance_overdue=False, pk__in=overdue_vehicles)
+    flagged = 0
+    for rows in _in_batches(newly_overdue, ['pk', 'vehicle_id'], batch_size):
+        pks = [pk for pk, _ in rows]
+        Vehicle.objects.filter(pk__in=pks).update(maintenance_overdue=True, updated_at=timezone.now())
+        oldest = dict(
+            overdue.filter(vehicle_id__in=pks).values('vehicle_id').annotate(
+                scheduled_date=Min('scheduled_date')
+            ).values_list('vehicle_id', 'scheduled_date')
+        )
+        record_events(
+            VehicleMaintenanceOverdue(
+                id=pk,
+                natural_id=vehicle_id,
+                scheduled_date=oldest[pk].isoformat()
+            )
+            for pk, vehicle_id in rows
+        )
+        flagged += len(rows)
+    
+    cleared = vehicles.filter(maintenance_overdue=True).exclude(pk__in=overdue_vehicles).update(
+        maintenance_overdue=False,
+        updated_at=timezone.now()
+    )
+    
+    if flagged or cleared:
+        bump_data_version(Vehicle)
+    return flagged, cleared
+
+
+def sweep(today=None, batch_size=None):
+    """Run every compliance check and return what changed"""
+    today = today or timezone.now().date()
+    batch_size = batch_size or settings.COMPLIANCE_BATCH_SIZE
+    
+    suspended = suspend_expired_licenses(today, batch_size)
+    warned = warn_expiring_licenses(today, batch_size)
+    if suspended:
+        bump_data_version(Driver)
+    flagged, cleared = refresh_maintenance_flags(today, batch_size=batch_size)
+    
+    return {
+        'drivers_suspended': suspended,
+        'license_warnings': warned,
+        'vehicles_flagged': flagged,
+        'vehicles_cleared': cleared,
+    }
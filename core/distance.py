@@ -0,0 +1,57 @@
+"""
+Distance service.
+
+Origin x destination matrices are computed in one vectorised haversine pass.
+Single lanes (a trip's pickup to dropoff) go through the ``lane_distances``
+table, keyed by both points rounded to ``DISTANCE_CACHE_PRECISION`` decimal
+places, so repeated lanes cost one indexed lookup and new ones are computed
+in a batch and stored.
+"""
+import numpy as np
+from django.conf import settings
+
+from .geo import haversine_array, haversine_matrix
+from .models import LaneDistance
+
+LOOKUP_BATCH_SIZE = 500
+
+
+def distance_matrix(origins, destinations):
+    """Kilometres from every ``(lat, lon)`` origin (rows) to every destination (columns)"""
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=float).reshape(-1, 2)
+    return haversine_matrix(origins[:, 0], origins[:, 1], destinations[:, 0], destinations[:, 1])
+
+
+def lane_key(origin, destination):
+    precision = settings.DISTANCE_CACHE_PRECISION
+    return ','.join(f'{value:.{precision}f}' for value in (*origin, *destination))
+
+
+def lane_distances(lanes):
+    """Kilometres for each ``(origin, destination)`` pair, read from and added to the cache"""
+    keys = [lane_key(origin, destination) for origin, destination in lanes]
+    unique = list(dict.fromkeys(keys))
+    
+    distances = {}
+    for start in range(0, len(unique), LOOKUP_BATCH_SIZE):
+        distances.update(
+            LaneDistance.objects.filter(key__in=unique[start:start + LOOKUP_BATCH_SIZE]).values_list('key', 'distance_km')
+        )
+    
+    missing = [key for key in unique if key not in distances]
+    if missing:
+        points = np.array([[float(value) for value in key.split(',')] for key in missing])
+        computed = haversine_array(points[:, 0], points[:, 1], points[:, 2], points[:, 3])
+        distances.update(zip(missing, computed.tolist()))
+        LaneDistance.objects.bulk_create(
+            [LaneDistance(key=key, distance_km=distances[key]) for key in missing],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+    
+    return [distances[key] for key in keys]
+
+
+def lane_distance(origin, destination):
+    return lane_distances([(origin, destination)])[0]
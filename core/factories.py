@@ -0,0 +1,74 @@
+"""
+Model factories shared by the app test suites.
+
+Each factory fills in the required fields with plain defaults; pass any
+model field as a keyword argument to override one.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from drivers.models import Driver
+from expenses.models import FuelExpense
+from trips.models import Trip
+from vehicles.models import Vehicle
+
+
+def make_user(email='ops@example.com', **fields):
+    return User.objects.create_user(
+        email=email, password=fields.pop('password', 'x'), first_name='O', last_name='P', **fields
+    )
+
+
+def api_client(user=None):
+    """``APIClient`` authenticated as ``user`` (a new ops user by default)"""
+    client = APIClient()
+    client.force_authenticate(user or make_user())
+    return client
+
+
+def make_vehicle(number, capacity=10000, **fields):
+    fields.setdefault('vehicle_type', 'TRUCK')
+    return Vehicle.objects.create(
+        name=f'Truck {number}', make='M', model='X', year=2020,
+        license_plate=f'KA-{number}', max_capacity_kg=Decimal(capacity), **fields
+    )
+
+
+def make_driver(number, **fields):
+    fields.setdefault('license_expiry_date', date.today() + timedelta(days=365))
+    return Driver.objects.create(
+        first_name='Driver', last_name=str(number), email=f'driver{number}@example.com', phone_number='1',
+        date_of_birth=date(1990, 1, 1), license_number=f'DL-{number}', license_type='CDL-A',
+        license_state='KA', hire_date=date(2020, 1, 1), **fields
+    )
+
+
+def make_trip(vehicle, driver, start=None, hours=5, weight=1000, **fields):
+    """Trip picked up at ``start`` (tomorrow by default), due ``hours`` later"""
+    start = start or timezone.now() + timedelta(days=1)
+    if 'created_by' not in fields:
+        fields['created_by'], _ = User.objects.get_or_create(
+            email='dispatcher@example.com', defaults={'first_name': 'D', 'last_name': 'S'}
+        )
+    fields = {
+        'pickup_location': 'A', 'pickup_address': 'a', 'dropoff_location': 'B', 'dropoff_address': 'b',
+        'cargo_description': 'Parcels', **fields
+    }
+    return Trip.objects.create(
+        vehicle=vehicle, driver=driver, cargo_weight_kg=Decimal(weight),
+        scheduled_pickup_time=start, scheduled_delivery_time=start + timedelta(hours=hours), **fields
+    )
+
+
+def make_fill(vehicle, day=None, cost=100, **fields):
+    """50 liter fill on ``day`` (today by default) costing ``cost``"""
+    fields.setdefault('fuel_type', 'DIESEL')
+    return FuelExpense.objects.create(
+        vehicle=vehicle, date=day or timezone.localdate(), liters=Decimal(50),
+        price_per_liter=Decimal(cost) / 50, total_cost=Decimal(cost),
+        fuel_station='Station', odometer_reading_km=Decimal(1000), **fields
+    )
@@ -0,0 +1,60 @@
+"""
+Small geographic helpers shared by the apps.
+"""
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def parse_coordinates(value):
+    """Parse ``"lat, lon"`` in decimal degrees into a ``(lat, lon)`` tuple.
+    
+    Returns ``None`` for blank or malformed values and out of range
+    coordinates.
+    """
+    if not value:
+        return None
+    
+    parts = value.replace(';', ',').split(',')
+    if len(parts) != 2:
+        parts = value.split()
+    if len(parts) != 2:
+        return None
+    
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_array(lats1, lons1, lats2, lons2):
+    """Element-wise great-circle distances in kilometres (arrays broadcast)"""
+    phi1 = np.radians(lats1)
+    phi2 = np.radians(lats2)
+    dlambda = np.radians(np.subtract(lons2, lons1))
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def haversine_matrix(lats1, lons1, lats2, lons2):
+    """Great-circle distances in kilometres between every point of the first
+    set (rows) and every point of the second set (columns)
+    """
+    return haversine_array(
+        np.asarray(lats1, dtype=float)[:, None], np.asarray(lons1, dtype=float)[:, None],
+        np.asarray(lats2, dtype=float)[None, :], np.asarray(lons2, dtype=float)[None, :]
+    )
@@ -0,0 +1,191 @@
+"""
+Per-request SQL instrumentation.
+
+``QueryInstrumentationMiddleware`` counts the queries a request runs and the
+time spent in the database, on every connection (primary and replica), and
+reports them in the ``X-Query-Count`` and ``Server-Timing`` headers and the
+``core.instrumentation`` log. Queries that repeat with the same shape
+(the SQL with its parameters and ``IN`` lists collapsed) at least
+``QUERY_REPEAT_THRESHOLD`` times are logged as a likely N+1.
+
+Views declare ``query_budget``, either a number or a ``{action: number}``
+dict for viewsets; ``QUERY_BUDGET`` is the default and ``None`` turns the
+check off. A request over budget is logged, or raises
+``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is on (the default
+under ``manage.py test``).
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_stats = ContextVar('query_stats', default=None)
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_VALUES = re.compile(r'(VALUES\s*\(%s(?:,\s*%s)*\))(?:\s*,\s*\(%s(?:,\s*%s)*\))+', re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries than its view's ``query_budget``"""
+
+
+def query_shape(sql):
+    """``sql`` with literals and the length of ``IN``/``VALUES`` lists removed"""
+    sql = _VALUES.sub(r'\1...', sql)
+    sql = _IN_LIST.sub('(%s...)', sql)
+    sql = _STRING.sub('?', sql)
+    return _NUMBER.sub('?', sql)
+
+
+class QueryStats:
+    """Queries run in one request (or ``collect_queries`` block)"""
+    
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+    
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[query_shape(sql)] += 1
+    
+    def repeated(self, threshold=None):
+        """``[(shape, times)]`` for shapes run at least ``threshold`` times"""
+        threshold = settings.QUERY_REPEAT_THRESHOLD if threshold is None else threshold
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+    
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection by ``install``"""
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, perf_counter() - started)
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver that adds ``record_query`` once per connection"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def collect_queries():
+    """Collect the queries run in this context (including ``sync_to_async``
+    threads it starts) into the yielded ``QueryStats``.
+    """
+    stats = QueryStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+def view_query_budget(view_func, method):
+    """The ``query_budget`` for a resolved view, or ``QUERY_BUDGET``"""
+    view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+    budget = getattr(view, 'query_budget', settings.QUERY_BUDGET)
+    if isinstance(budget, dict):
+        action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+        budget = budget.get(action, settings.QUERY_BUDGET)
+    return budget
+
+
+def _view_name(view_func):
+    view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+    return f'{view.__module__}.{view.__qualname__}'
+
+
+class QueryInstrumentationMiddleware:
+    """Report per-request query counts and DB time; see the module docstring"""
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_INSTRUMENTATION:
+            return self.get_response(request)
+        started = perf_counter()
+        with collect_queries() as stats:
+            response = self.get_response(request)
+        return self._report(request, response, stats, perf_counter() - started)
+    
+    async def __acall__(self, request):
+        if not settings.QUERY_INSTRUMENTATION:
+            return await self.get_response(request)
+        started = perf_counter()
+        with collect_queries() as stats:
+            response = await self.get_response(request)
+        return self._report(request, response, stats, perf_counter() - started)
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = view_query_budget(view_func, request.method)
+        request.query_view = _view_name(view_func)
+    
+    def _report(self, request, response, stats, elapsed):
+        if settings.QUERY_TIMING_HEADERS:
+            response['X-Query-Count'] = str(stats.count)
+            timing = f'db;dur={stats.duration_ms};desc="{stats.count} queries", app;dur={round(elapsed * 1000, 2)}'
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+        
+        view = getattr(request, 'query_view', None)
+        budget = getattr(request, 'query_budget', None)
+        repeated = stats.repeated()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': stats.duration_ms,
+            'total_ms': round(elapsed * 1000, 2),
+            'budget': budget,
+            'repeated': [{'shape': shape, 'times': times} for shape, times in repeated],
+        }
+        logger.debug(
+            'request view=%s path=%s queries=%d db_ms=%.2f',
+            view, request.path, stats.count, stats.duration_ms, extra={'query_stats': record}
+        )
+        for shape, times in repeated:
+            logger.warning(
+                'repeated query view=%s path=%s times=%d shape=%s',
+                view, request.path, times, shape, extra={'query_stats': record}
+            )
+        
+        if budget is not None and stats.count > budget:
+            message = f'{view} ran {stats.count} queries for {request.method} {request.path}, budget is {budget}'
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(
+                'query budget exceeded view=%s path=%s queries=%d budget=%d',
+                view, request.path, stats.count, budget, extra={'query_stats': record}
+            )
+        return response
@@ -0,0 +1,46 @@
+import csv
+import tempfile
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from jobs.registry import job
+
+EXPORTS = {
+    'vehicles': 'vehicles.Vehicle',
+    'drivers': 'drivers.Driver',
+    'trips': 'trips.Trip',
+    'maintenance': 'maintenance.MaintenanceRecord',
+    'fuel-expenses': 'expenses.FuelExpense',
+    'other-expenses': 'expenses.OtherExpense',
+}
+
+
+@job('export.csv')
+def export_csv(ctx, resource, filters=None, chunk_size=2000):
+    """Write every row of ``resource`` (optionally filtered by exact field
+    values) to a CSV file in media storage.
+    """
+    if resource not in EXPORTS:
+        raise ValueError(f"Unknown resource {resource!r}. Available: {', '.join(EXPORTS)}")
+    
+    model = apps.get_model(EXPORTS[resource])
+    columns = [field.attname for field in model._meta.concrete_fields]
+    filters = filters or {}
+    unknown = set(filters) - set(columns)
+    if unknown:
+        raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))}")
+    
+    rows = 0
+    with tempfile.TemporaryFile('w+', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for chunk in ctx.chunks(model.objects.filter(**filters), chunk_size):
+            writer.writerows([getattr(obj, column) for column in columns] for obj in chunk)
+            rows += len(chunk)
+        
+        handle.seek(0)
+        name = default_storage.save(f'exports/{resource}-{ctx.job.pk}.csv', File(handle))
+    
+    return {'file': default_storage.url(name), 'rows': rows}
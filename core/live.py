@@ -0,0 +1,96 @@
+"""
+Live fleet status push channel.
+
+A consumer of the domain event bus: status transitions relayed from the
+outbox to Redis pub/sub are forwarded to Server-Sent Events clients. Each
+ASGI worker holds a single Redis subscription and fans messages out to
+per-connection asyncio queues, so an idle client costs one suspended
+coroutine rather than a thread or a Redis connection.
+"""
+import asyncio
+import json
+import logging
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def status_message(envelope):
+    """SSE payload for a relayed event, or None if it is not a status transition"""
+    payload = envelope['payload']
+    if 'status' not in payload or 'old_status' not in payload:
+        return None
+    
+    return json.dumps({
+        'type': envelope['aggregate_type'],
+        'event': envelope['event_type'],
+        'id': payload['id'],
+        'natural_id': payload['natural_id'],
+        'old_status': payload['old_status'],
+        'status': payload['status'],
+        'at': envelope['occurred_at']
+    })
+
+
+class StatusBroadcaster:
+    """Fans one Redis subscription out to every connected stream client"""
+    
+    def __init__(self):
+        self._queues = set()
+        self._listener = None
+    
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=settings.LIVE_STREAM_QUEUE_SIZE)
+        self._queues.add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        return queue
+    
+    def unsubscribe(self, queue):
+        self._queues.discard(queue)
+    
+    async def _listen(self):
+        while True:
+            try:
+                client = aioredis.from_url(settings.EVENT_BUS_REDIS_URL, decode_responses=True)
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.EVENT_BUS_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message['type'] != 'message':
+                            continue
+                        data = status_message(json.loads(message['data']))
+                        if data is not None:
+                            self._fan_out(data)
+            except (redis.RedisError, OSError):
+                logger.warning('Live stream subscription lost, reconnecting')
+                await asyncio.sleep(1)
+    
+    def _fan_out(self, data):
+        for queue in list(self._queues):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # A stalled client misses events rather than holding memory
+                pass
+
+
+broadcaster = StatusBroadcaster()
+
+
+async def status_event_stream():
+    """Server-Sent Events body: status messages plus periodic keepalives"""
+    queue = broadcaster.subscribe()
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f'event: status\ndata: {data}\n\n'
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,88 @@
+import statistics
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_started, request_finished
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request database connection overhead with and without persistent or pooled connections'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode')
+    
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        
+        default = settings.DATABASES[DEFAULT_DB_ALIAS]
+        modes = {
+            'per-request': {'CONN_MAX_AGE': 0},
+            'persistent': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+        }
+        if default['ENGINE'] == 'django.db.backends.postgresql':
+            pool = default.get('OPTIONS', {}).get('pool') or {'min_size': 1, 'max_size': 4}
+            modes['pooled'] = {'CONN_MAX_AGE': 0, 'pool': pool}
+        else:
+            self.stdout.write('Connection pooling needs PostgreSQL (DB_ENGINE=postgresql); skipping the pooled mode')
+        
+        results = {}
+        for name, overrides in modes.items():
+            results[name] = self._run(name, default, overrides, options['requests'])
+            mean, p95, opened = results[name]
+            self.stdout.write(
+                f'{name:<12} mean {mean:7.3f} ms  p95 {p95:7.3f} ms  '
+                f'{opened} connections opened for {options["requests"]} requests'
+            )
+        
+        baseline = results['per-request'][0]
+        best = min(results, key=lambda name: results[name][0])
+        self.stdout.write(self.style.SUCCESS(
+            f'{best} connections save {baseline - results[best][0]:.3f} ms per request over per-request connections'
+        ))
+    
+    def _run(self, name, default, overrides, requests):
+        """Replay ``requests`` request cycles of one query on a temporary alias"""
+        alias = f'benchmark_{name}'
+        options = {key: value for key, value in default.get('OPTIONS', {}).items() if key != 'pool'}
+        if 'pool' in overrides:
+            options['pool'] = overrides['pool']
+        config = {
+            **default,
+            'CONN_MAX_AGE': overrides['CONN_MAX_AGE'],
+            'CONN_HEALTH_CHECKS': overrides.get('CONN_HEALTH_CHECKS', False),
+            'OPTIONS': options,
+        }
+        connections.settings[alias] = connections.configure_settings({DEFAULT_DB_ALIAS: dict(default), alias: config})[alias]
+        
+        opened = []
+        
+        def count(sender, connection, **kwargs):
+            if connection.alias == alias:
+                opened.append(connection)
+        
+        connection_created.connect(count)
+        timings = []
+        try:
+            for _ in range(requests):
+                started = perf_counter()
+                # The request signals run close_old_connections, as a real request does
+                request_started.send(sender=self.__class__)
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                timings.append((perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count)
+            connections[alias].close()
+            if hasattr(connections[alias], 'close_pool'):
+                connections[alias].close_pool()
+            del connections[alias]
+            del connections.settings[alias]
+        
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        return statistics.mean(timings), p95, len(opened)
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete tombstones older than the delta sync retention window'
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.DELTA_SYNC_TOMBSTONE_RETENTION
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.compliance import sweep
+
+
+class Command(BaseCommand):
+    help = 'Suspend drivers with expired licenses, warn about expiring ones and flag overdue maintenance'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+    
+    def handle(self, *args, **options):
+        result = sweep(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Suspended {drivers_suspended} drivers, sent {license_warnings} license warnings, '
+            'flagged {vehicles_flagged} and cleared {vehicles_cleared} vehicles'.format(**result)
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='App label and model name, e.g. vehicles.vehicle', max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('natural_id', models.CharField(blank=True, max_length=255)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'tombstones',
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['model_label', 'deleted_at'], name='tombstones_model_l_0f7947_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,191 @@
+from datetime import datetime
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from .models import Tombstone
+from .replicas import use_replica, release_replica
+
+
+def parse_since(value):
+    """Parse an ISO date or datetime query parameter into an aware datetime.
+    
+    Returns None for a missing or malformed value and raises
+    ``ValidationError`` for an impossible one.
+    """
+    if not value:
+        return None
+    
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, datetime.min.time())
+    except ValueError:
+        # Well formed but impossible, e.g. 2026-02-30
+        raise ValidationError({'error': f'{value} is not a valid date or datetime'})
+    
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class DeltaSyncPagination(CursorPagination):
+    """Pages of ``DELTA_SYNC_PAGE_SIZE`` changed rows in ``updated_at`` order"""
+    
+    ordering = ('updated_at', 'pk')
+    
+    def get_page_size(self, request):
+        return settings.DELTA_SYNC_PAGE_SIZE
+
+
+class DeltaSyncMixin:
+    """Adds a ``changes`` action that returns rows updated since a timestamp
+    along with tombstones for rows deleted since then.
+    
+    Updated rows come in pages; clients follow ``next`` until it is null,
+    then pass the ``server_time`` of the first page back as
+    ``updated_since`` on the next sync. Tombstones come with the first page.
+    """
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Get rows changed and deleted since ``updated_since``"""
+        raw_since = request.query_params.get('updated_since')
+        if not raw_since:
+            return Response(
+                {'error': 'updated_since parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        since = parse_since(raw_since)
+        if since is None:
+            return Response(
+                {'error': 'updated_since must be an ISO 8601 date or datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Captured before querying so writes racing this request are re-sent next time
+        server_time = timezone.now()
+        
+        if since < server_time - settings.DELTA_SYNC_TOMBSTONE_RETENTION:
+            return Response(
+                {'error': 'updated_since is older than the tombstone retention window, reload the full list'},
+                status=status.HTTP_410_GONE
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset()).filter(updated_at__gte=since)
+        paginator = DeltaSyncPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        
+        deleted = []
+        if paginator.cursor_query_param not in request.query_params:
+            deleted = Tombstone.objects.filter(
+                model_label=queryset.model._meta.label_lower,
+                deleted_at__gte=since
+            ).values('object_id', 'natural_id', 'deleted_at')
+        
+        return Response({
+            'server_time': server_time,
+            'next': paginator.get_next_link(),
+            'updated': serializer.data,
+            'deleted': [
+                {
+                    'id': tombstone['object_id'],
+                    'natural_id': tombstone['natural_id'],
+                    'deleted_at': tombstone['deleted_at']
+                }
+                for tombstone in deleted
+            ]
+        })
+
+
+class BatchLookupMixin:
+    """Adds a ``batch`` action that resolves up to ``BATCH_LOOKUP_MAX_IDS``
+    natural IDs with a single ``IN`` query.
+    
+    ViewSets set ``natural_id_field`` to the unique business identifier,
+    e.g. ``vehicle_id``. Results come back in request order and IDs that do
+    not exist are returned with ``found: false``.
+    """
+    
+    natural_id_field = None
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Look up many records by natural ID"""
+        ids = request.data.get('ids')
+        max_ids = settings.BATCH_LOOKUP_MAX_IDS
+        
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {'error': 'ids must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(ids) > max_ids:
+            return Response(
+                {'error': f'At most {max_ids} ids can be looked up per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not all(isinstance(natural_id, str) for natural_id in ids):
+            return Response(
+                {'error': 'ids must be strings'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        records = self.get_queryset().filter(**{f'{self.natural_id_field}__in': set(ids)})
+        found = {getattr(record, self.natural_id_field): record for record in records}
+        serialized = {
+            natural_id: data
+            for natural_id, data in zip(found, self.get_serializer(list(found.values()), many=True).data)
+        }
+        
+        return Response({
+            'results': [
+                {
+                    'natural_id': natural_id,
+                    'found': natural_id in serialized,
+                    'data': serialized.get(natural_id)
+                }
+                for natural_id in ids
+            ],
+            'not_found': [natural_id for natural_id in dict.fromkeys(ids) if natural_id not in serialized]
+        })
+
+
+class ReplicaReadMixin:
+    """Serves safe requests for ``replica_actions`` from the read replica.
+    
+    Plain API views (no ``action``) read from the replica on every safe
+    request. ``replica_max_lag`` is the replication lag in seconds the view
+    tolerates before falling back to the primary; ``None`` uses
+    ``REPLICA_MAX_LAG_SECONDS``. Writes pin the rest of the request to the
+    primary.
+    """
+    
+    replica_actions = ('list', 'retrieve')
+    replica_max_lag = None
+    
+    def initial(self, request, *args, **kwargs):
+        action_name = getattr(self, 'action', None)
+        if request.method in SAFE_METHODS and (action_name is None or action_name in self.replica_actions):
+            self._replica_token = use_replica(self.replica_max_lag)
+        super().initial(request, *args, **kwargs)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            release_replica(token)
+            self._replica_token = None
+        return response
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row so delta sync clients can evict it"""
+    
+    model_label = models.CharField(max_length=100, help_text="App label and model name, e.g. vehicles.vehicle")
+    object_id = models.BigIntegerField()
+    natural_id = models.CharField(max_length=255, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'tombstones'
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_label}:{self.object_id} deleted at {self.deleted_at}"
+
+
+class LaneDistance(models.Model):
+    """Cached distance between two coordinate points rounded to the cache precision"""
+    
+    key = models.CharField(max_length=80, unique=True, help_text="Rounded 'lat,lon,lat,lon' of origin and destination")
+    distance_km = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'lane_distances'
+    
+    def __str__(self):
+        return f"{self.key}: {self.distance_km:.2f} km"
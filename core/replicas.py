@@ -0,0 +1,136 @@
+"""
+Read replica routing.
+
+Reads go to the primary unless a view opts in with ``ReplicaReadMixin`` (or
+code runs inside ``replica_reads()``). Inside such a request, reads are
+routed to the ``REPLICA_DB_ALIAS`` database as long as its replication lag
+is within the view's tolerance. The first write, or any read inside a
+transaction on the primary, pins the rest of the request to the primary so
+it reads its own writes.
+
+Without a replica configured the router always answers the primary.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_reads = ContextVar('replica_reads', default=None)
+_lag = {'seconds': None, 'checked_at': None}
+
+
+class _ReadState:
+    def __init__(self, alias):
+        self.alias = alias
+        self.pinned = False
+
+
+def replica_configured():
+    return settings.REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def replica_lag():
+    """Seconds the replica is behind the primary, checked at most every
+    ``REPLICA_LAG_CHECK_SECONDS``; infinite when the replica is unreachable.
+    """
+    checked_at = _lag['checked_at']
+    if checked_at is not None and monotonic() - checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+        return _lag['seconds']
+    
+    connection = connections[settings.REPLICA_DB_ALIAS]
+    try:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+                )
+                seconds = float(cursor.fetchone()[0] or 0)
+        else:
+            # No replication to measure (e.g. two local SQLite files in tests)
+            connection.ensure_connection()
+            seconds = 0.0
+    except DatabaseError:
+        seconds = float('inf')
+    
+    _lag.update(seconds=seconds, checked_at=monotonic())
+    return seconds
+
+
+def replica_alias(max_lag=None):
+    """The replica's alias when it lags at most ``max_lag`` seconds (default
+    ``REPLICA_MAX_LAG_SECONDS``) and no transaction is open on the primary,
+    otherwise None.
+    """
+    if not replica_configured():
+        return None
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        # Reads would be pinned to the primary anyway; skip the lag check
+        return None
+    max_lag = settings.REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+    return settings.REPLICA_DB_ALIAS if replica_lag() <= max_lag else None
+
+
+def use_replica(max_lag=None):
+    """Route reads in the current context to the replica; returns a token
+    for ``release_replica``.
+    """
+    return _reads.set(_ReadState(replica_alias(max_lag)))
+
+
+def release_replica(token):
+    _reads.reset(token)
+
+
+@contextmanager
+def replica_reads(max_lag=None):
+    token = use_replica(max_lag)
+    try:
+        yield
+    finally:
+        release_replica(token)
+
+
+@asynccontextmanager
+async def areplica_reads(max_lag=None):
+    """``replica_reads`` for async views; the lag check runs off the event loop"""
+    token = _reads.set(_ReadState(await sync_to_async(replica_alias)(max_lag)))
+    try:
+        yield
+    finally:
+        release_replica(token)
+
+
+def pin_primary():
+    """Keep the rest of the current context's reads on the primary"""
+    state = _reads.get()
+    if state is not None:
+        state.pinned = True
+
+
+class ReplicaRouter:
+    """Database router for ``DATABASE_ROUTERS``"""
+    
+    def db_for_read(self, model, **hints):
+        state = _reads.get()
+        if state is None or state.alias is None or state.pinned:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            state.pinned = True
+            return DEFAULT_DB_ALIAS
+        return state.alias
+    
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db != settings.REPLICA_DB_ALIAS
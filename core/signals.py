@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Tombstone
+from .stats import bump_data_version
+
+# Models exposed through delta sync endpoints, mapped to their natural ID field
+SYNCED_MODELS = {
+    'accounts.user': 'email',
+    'vehicles.vehicle': 'vehicle_id',
+    'drivers.driver': 'driver_id',
+    'trips.trip': 'trip_id',
+    'maintenance.maintenancerecord': 'record_id',
+    'expenses.fuelexpense': 'expense_id',
+    'expenses.otherexpense': 'expense_id',
+}
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """Log deletions of synced models, including cascaded ones"""
+    natural_id_field = SYNCED_MODELS[sender._meta.label_lower]
+    Tombstone.objects.create(
+        model_label=sender._meta.label_lower,
+        object_id=instance.pk,
+        natural_id=getattr(instance, natural_id_field, '') or ''
+    )
+
+
+def invalidate_cached_stats(sender, **kwargs):
+    """Bump the data version of synced models when stats caching is on"""
+    if settings.STATS_CACHE_TIMEOUT:
+        bump_data_version(sender)
+
+
+# Connected per synced model so deletes of other models keep Django's fast
+# delete path and never write tombstones
+for label in SYNCED_MODELS:
+    post_delete.connect(record_tombstone, sender=label, dispatch_uid=f'record_tombstone:{label}')
+    post_save.connect(invalidate_cached_stats, sender=label, dispatch_uid=f'invalidate_cached_stats:save:{label}')
+    post_delete.connect(invalidate_cached_stats, sender=label, dispatch_uid=f'invalidate_cached_stats:delete:{label}')
+
+
+@receiver(post_save, sender='maintenance.MaintenanceRecord')
+@receiver(post_delete, sender='maintenance.MaintenanceRecord')
+def refresh_vehicle_maintenance_flag(sender, instance, **kwargs):
+    """Keep ``Vehicle.maintenance_overdue`` current between compliance sweeps.
+    
+    Deferred to commit so a vehicle saved later in the same transaction does
+    not overwrite the flag with a stale value.
+    """
+    from .compliance import refresh_maintenance_flags
+    vehicle_id = instance.vehicle_id
+    transaction.on_commit(lambda: refresh_maintenance_flags(vehicle_ids=[vehicle_id]))
@@ -0,0 +1,78 @@
+"""
+Helpers for ``stats`` actions.
+
+Each breakdown is a single ``values(field).annotate(...)`` GROUP BY query
+instead of one COUNT per choice. Results can optionally be cached against
+per-model data versions that are bumped whenever a synced model is saved
+or deleted.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+
+def breakdown(queryset, field, choices, **aggregates):
+    """Group ``queryset`` by ``field`` in one query.
+    
+    Returns a dict keyed by every choice value holding ``count`` plus each
+    named aggregate. Choices without rows are filled with zeros.
+    """
+    empty = {'count': 0, **{name: 0 for name in aggregates}}
+    result = {value: dict(empty) for value, _ in choices}
+    
+    rows = queryset.order_by().values(field).annotate(count=Count('pk'), **aggregates)
+    for row in rows:
+        key = row.pop(field)
+        result[key] = {name: value or 0 for name, value in row.items()}
+    return result
+
+
+def counts(rows):
+    """Flatten a breakdown to ``{choice: count}``"""
+    return {key: row['count'] for key, row in rows.items()}
+
+
+def total(rows, name='count'):
+    """Sum one column of a breakdown across all choices"""
+    return sum(row[name] for row in rows.values())
+
+
+def _version_key(model):
+    return f'data_version:{model._meta.label_lower}'
+
+
+def data_version(model):
+    """Current data version for a model, seeded from the clock when missing"""
+    return cache.get_or_set(_version_key(model), time.time_ns(), None)
+
+
+def bump_data_version(model):
+    """Invalidate cached stats that depend on ``model``"""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def cached_stats(name, models, builder):
+    """Return ``builder()``, cached by the data versions of ``models``.
+    
+    Caching is disabled unless ``STATS_CACHE_TIMEOUT`` is positive. The key
+    also includes today's date because some figures (expired licenses,
+    completed today) depend on the clock rather than on writes.
+    """
+    timeout = settings.STATS_CACHE_TIMEOUT
+    if not timeout:
+        return builder()
+    
+    versions = '.'.join(str(data_version(model)) for model in models)
+    key = f'stats:{name}:{versions}:{timezone.now().date()}'
+    
+    stats = cache.get(key)
+    if stats is None:
+        stats = builder()
+        cache.set(key, stats, timeout)
+    return stats
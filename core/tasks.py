@@ -0,0 +1,8 @@
+from celery import shared_task
+from .compliance import sweep
+
+
+@shared_task(name='core.sweep_compliance', ignore_result=True)
+def sweep_compliance():
+    """Daily license and maintenance compliance sweep"""
+    return sweep()
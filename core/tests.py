@@ -0,0 +1,312 @@
+import asyncio
+import json
+from datetime import timedelta
+from time import monotonic
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from vehicles.models import Vehicle
+from vehicles.views import VehicleViewSet
+from .distance import lane_distances, lane_key
+from .factories import api_client, make_vehicle
+from .live import StatusBroadcaster, status_message
+from .instrumentation import QueryBudgetExceeded, collect_queries, query_shape
+from .mixins import parse_since
+from .stats import breakdown
+from .models import LaneDistance, Tombstone
+from .replicas import _lag, replica_reads
+
+
+class ParseSinceTests(SimpleTestCase):
+    
+    def test_parses_dates_and_datetimes(self):
+        self.assertEqual(parse_since('2026-03-01').date().isoformat(), '2026-03-01')
+        self.assertEqual(parse_since('2026-03-01T14:30').hour, 14)
+    
+    def test_missing_or_malformed_is_none(self):
+        self.assertIsNone(parse_since(None))
+        self.assertIsNone(parse_since('yesterday'))
+    
+    def test_impossible_date_is_a_validation_error(self):
+        for value in ['2026-02-30', '2026-13-20T14:00']:
+            with self.assertRaises(ValidationError):
+                parse_since(value)
+
+
+class StatsBreakdownTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        for number, (status, vehicle_type, capacity) in enumerate([
+            (Vehicle.Status.AVAILABLE, 'TRUCK', 1000), (Vehicle.Status.AVAILABLE, 'VAN', 500),
+            (Vehicle.Status.ON_TRIP, 'TRUCK', 2000), (Vehicle.Status.RETIRED, 'VAN', 700),
+        ]):
+            make_vehicle(number, capacity=capacity, status=status, vehicle_type=vehicle_type)
+    
+    def test_one_query_matches_a_count_per_choice(self):
+        with self.assertNumQueries(1):
+            rows = breakdown(Vehicle.objects.all(), 'status', Vehicle.Status.choices, capacity=Sum('max_capacity_kg'))
+        
+        for value, _ in Vehicle.Status.choices:
+            vehicles = Vehicle.objects.filter(status=value)
+            self.assertEqual(rows[value]['count'], vehicles.count())
+            self.assertEqual(rows[value]['capacity'], vehicles.aggregate(total=Sum('max_capacity_kg'))['total'] or 0)
+    
+    @override_settings(STATS_CACHE_TIMEOUT=60)
+    def test_stats_endpoint_matches_counts_and_sees_writes(self):
+        def expected():
+            return {
+                'total': Vehicle.objects.count(),
+                'available': Vehicle.objects.filter(status=Vehicle.Status.AVAILABLE).count(),
+                'on_trip': Vehicle.objects.filter(status=Vehicle.Status.ON_TRIP).count(),
+                'in_shop': Vehicle.objects.filter(status=Vehicle.Status.IN_SHOP).count(),
+                'retired': Vehicle.objects.filter(status=Vehicle.Status.RETIRED).count(),
+                'by_type': {
+                    value: Vehicle.objects.filter(vehicle_type=value).count()
+                    for value, _ in Vehicle.VehicleType.choices
+                },
+            }
+        
+        self.assertEqual(self.client.get('/api/vehicles/stats/').json(), expected())
+        make_vehicle(9, status=Vehicle.Status.IN_SHOP)
+        self.assertEqual(self.client.get('/api/vehicles/stats/').json(), expected())
+
+
+class BatchLookupTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        self.vehicles = [make_vehicle(i) for i in range(3)]
+    
+    def test_results_keep_request_order_and_report_missing_ids(self):
+        first, second, third = [vehicle.vehicle_id for vehicle in self.vehicles]
+        ids = [third, 'VEH-MISSING', first, third, second]
+        
+        response = self.client.post('/api/vehicles/batch/', {'ids': ids}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([row['natural_id'] for row in results], ids)
+        self.assertEqual([row['found'] for row in results], [True, False, True, True, True])
+        self.assertEqual([row['data'] and row['data']['vehicle_id'] for row in results], [third, None, first, third, second])
+        self.assertEqual(response.json()['not_found'], ['VEH-MISSING'])
+    
+    def test_malformed_ids_are_rejected(self):
+        for ids in [[], 'VEH-0001', [1, 2]]:
+            response = self.client.post('/api/vehicles/batch/', {'ids': ids}, format='json')
+            self.assertEqual(response.status_code, 400, ids)
+
+
+class DeltaSyncTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        self.vehicles = [make_vehicle(i) for i in range(5)]
+    
+    @override_settings(DELTA_SYNC_PAGE_SIZE=2)
+    def test_changes_are_paginated_with_tombstones_on_first_page(self):
+        self.vehicles.pop().delete()
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        url = f'/api/vehicles/changes/?updated_since={since}'
+        pages = []
+        while url:
+            pages.append(self.client.get(url).json())
+            url = pages[-1]['next']
+        
+        self.assertEqual([len(page['updated']) for page in pages], [2, 2])
+        self.assertEqual([len(page['deleted']) for page in pages], [1, 0])
+        self.assertEqual(
+            [row['vehicle_id'] for page in pages for row in page['updated']],
+            [vehicle.vehicle_id for vehicle in self.vehicles]
+        )
+    
+    def test_impossible_updated_since_is_bad_request(self):
+        response = self.client.get('/api/vehicles/changes/?updated_since=2026-02-30')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_tombstones_only_for_synced_models(self):
+        Tombstone.objects.all().delete()
+        Vehicle.objects.first().delete()
+        Group.objects.create(name='dispatch').delete()
+        self.assertEqual(list(Tombstone.objects.values_list('model_label', flat=True)), ['vehicles.vehicle'])
+
+
+class LaneDistanceCacheTests(TestCase):
+    
+    depot, port, airport = (12.9716, 77.5946), (12.9141, 74.8560), (13.1986, 77.7066)
+    
+    def test_new_lanes_are_stored_once_and_read_back(self):
+        with self.assertNumQueries(2):
+            first = lane_distances([(self.depot, self.port), (self.depot, self.airport), (self.depot, self.port)])
+        
+        self.assertEqual(LaneDistance.objects.count(), 2)
+        self.assertEqual(first[0], first[2])
+        self.assertAlmostEqual(first[0], 297.3, places=0)
+        
+        # A point within the cache precision of a stored lane reuses its row
+        LaneDistance.objects.filter(key=lane_key(self.depot, self.port)).update(distance_km=300)
+        nearby = (self.depot[0] + 0.0001, self.depot[1])
+        with self.assertNumQueries(1):
+            second = lane_distances([(nearby, self.port), (self.depot, self.airport)])
+        
+        self.assertEqual(second, [300, first[1]])
+        self.assertEqual(LaneDistance.objects.count(), 2)
+
+
+class QueryInstrumentationTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        make_vehicle(1)
+    
+    @override_settings(QUERY_TIMING_HEADERS=True)
+    def test_query_count_and_timing_headers(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/vehicles/')
+        
+        count = len(queries)
+        self.assertGreater(count, 0)
+        self.assertEqual(response['X-Query-Count'], str(count))
+        self.assertRegex(response['Server-Timing'], rf'^db;dur=[\d.]+;desc="{count} queries", app;dur=[\d.]+$')
+    
+    def test_query_shape_ignores_literals_and_list_lengths(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"),
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'y' LIMIT 5")
+        )
+    
+    @override_settings(QUERY_REPEAT_THRESHOLD=3)
+    def test_repeated_shapes_are_reported(self):
+        with collect_queries() as stats:
+            for pk in range(3):
+                Vehicle.objects.filter(pk=pk).exists()
+            Vehicle.objects.count()
+        
+        [(shape, times)] = stats.repeated()
+        self.assertEqual(times, 3)
+        self.assertIn('LIMIT', shape)
+    
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_over_budget_raises_in_strict_mode(self):
+        with mock.patch.object(VehicleViewSet, 'query_budget', {'list': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/vehicles/')
+    
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_is_logged_otherwise(self):
+        with mock.patch.object(VehicleViewSet, 'query_budget', {'list': 1}):
+            with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+                response = self.client.get('/api/vehicles/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('query budget exceeded', logs.output[0])
+
+
+class StatusBroadcasterTests(SimpleTestCase):
+    
+    envelope = {
+        'aggregate_type': 'vehicle', 'event_type': 'vehicle.status_changed', 'occurred_at': '2026-03-01T10:00:00Z',
+        'payload': {'id': 1, 'natural_id': 'VEH-0001', 'old_status': 'AVAILABLE', 'status': 'ON_TRIP'},
+    }
+    
+    async def idle_listener(self):
+        await asyncio.Event().wait()
+    
+    @override_settings(LIVE_STREAM_QUEUE_SIZE=1)
+    async def test_one_message_reaches_every_subscriber(self):
+        with mock.patch.object(StatusBroadcaster, '_listen', self.idle_listener):
+            broadcaster = StatusBroadcaster()
+            first, second = broadcaster.subscribe(), broadcaster.subscribe()
+            data = status_message(self.envelope)
+            
+            broadcaster._fan_out(data)
+            self.assertEqual([first.get_nowait(), second.get_nowait()], [data, data])
+            
+            # A client that stops reading misses messages without holding up the others
+            broadcaster._fan_out(data)
+            second.get_nowait()
+            broadcaster._fan_out(data)
+            self.assertEqual(second.get_nowait(), data)
+            
+            broadcaster.unsubscribe(second)
+            broadcaster._fan_out(data)
+            self.assertTrue(second.empty())
+            self.assertEqual(json.loads(first.get_nowait())['status'], 'ON_TRIP')
+            broadcaster._listener.cancel()
+    
+    def test_events_without_a_status_change_are_not_sent(self):
+        self.assertIsNone(status_message({**self.envelope, 'payload': {'id': 1, 'natural_id': 'VEH-0001'}}))
+
+
+class BenchmarkConnectionsCommandTests(TestCase):
+    
+    def test_needs_at_least_one_request(self):
+        with self.assertRaisesMessage(CommandError, '--requests must be at least 1'):
+            call_command('benchmark_db_connections', requests=0)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """The test replica mirrors the test database; which connection runs a
+    query shows where it was routed
+    """
+    
+    databases = {'default', 'replica'}
+    
+    def setUp(self):
+        _lag.update(seconds=None, checked_at=None)
+        self.client = api_client()
+        self.vehicle = make_vehicle(1)
+    
+    def routed(self, run):
+        """``(primary, replica)`` query counts while ``run()`` executes"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            run()
+        return len(primary), len(replica)
+    
+    def test_list_and_retrieve_read_from_the_replica(self):
+        for url in ['/api/vehicles/', f'/api/vehicles/{self.vehicle.pk}/']:
+            with self.subTest(url=url):
+                primary, replica = self.routed(lambda: self.assertEqual(self.client.get(url).status_code, 200))
+                self.assertEqual(primary, 0)
+                self.assertGreater(replica, 0)
+        
+        primary, replica = self.routed(lambda: self.client.get('/api/vehicles/stats/'))
+        self.assertEqual(replica, 0)
+    
+    def test_a_write_pins_later_reads_to_the_primary(self):
+        with replica_reads():
+            self.assertEqual(self.routed(lambda: Vehicle.objects.count()), (0, 1))
+            Vehicle.objects.filter(pk=self.vehicle.pk).update(name='Renamed')
+            self.assertEqual(self.routed(lambda: Vehicle.objects.get(pk=self.vehicle.pk)), (1, 0))
+    
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        with replica_reads():
+            with transaction.atomic():
+                self.assertEqual(self.routed(lambda: Vehicle.objects.count()), (1, 0))
+            # Still pinned once the transaction is over
+            self.assertEqual(self.routed(lambda: Vehicle.objects.count()), (1, 0))
+        
+        with transaction.atomic(), replica_reads():
+            self.assertEqual(self.routed(lambda: Vehicle.objects.count()), (1, 0))
+    
+    @override_settings(REPLICA_LAG_CHECK_SECONDS=3600)
+    def test_lagging_replica_falls_back_to_the_primary(self):
+        _lag.update(seconds=30.0, checked_at=monotonic())
+        
+        primary, replica = self.routed(lambda: self.client.get('/api/vehicles/'))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        
+        # A view that tolerates the lag still reads the replica
+        with mock.patch.object(VehicleViewSet, 'replica_max_lag', 60):
+            primary, replica = self.routed(lambda: self.client.get('/api/vehicles/'))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .authentication import async_jwt_required
+from .distance import distance_matrix
+from .geo import parse_coordinates
+from .live import status_event_stream
+
+
+@require_GET
+@async_jwt_required(allow_query_token=True)
+async def fleet_status_stream(request):
+    """Stream trip, vehicle, driver and maintenance status changes as SSE"""
+    response = StreamingHttpResponse(status_event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _parse_points(values):
+    """Parse ``"lat, lon"`` strings or ``[lat, lon]`` pairs; ``None`` if any is invalid"""
+    if not isinstance(values, list) or not values:
+        return None
+    
+    points = []
+    for value in values:
+        if isinstance(value, str):
+            point = parse_coordinates(value)
+        elif isinstance(value, (list, tuple)) and len(value) == 2:
+            point = parse_coordinates(f'{value[0]}, {value[1]}')
+        else:
+            point = None
+        if point is None:
+            return None
+        points.append(point)
+    return points
+
+
+class DistanceMatrixView(APIView):
+    """Great-circle distances between many origins and destinations"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """Get the origins x destinations distance matrix in kilometres"""
+        origins = _parse_points(request.data.get('origins'))
+        destinations = _parse_points(request.data.get('destinations'))
+        if origins is None or destinations is None:
+            return Response(
+                {'error': "origins and destinations must be non-empty lists of 'lat, lon' or [lat, lon]"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(origins) * len(destinations) > settings.DISTANCE_MATRIX_MAX_CELLS:
+            return Response(
+                {'error': f'At most {settings.DISTANCE_MATRIX_MAX_CELLS} origin/destination pairs per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        matrix = distance_matrix(origins, destinations)
+        return Response({'distances_km': matrix.round(2).tolist()})
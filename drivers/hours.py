@@ -0,0 +1,178 @@
+"""
+Driver hours of service.
+
+Driving time is kept per driver in a ``DriverHours`` ring buffer of 336
+hourly slots (14 days) holding the minutes driven in each hour. A trip's
+``actual_pickup_time``-``actual_delivery_time`` span is added when it is
+completed (or cancelled after dispatch), so reading a driver's rolling
+24-hour, 7-day and 14-day totals costs one row instead of a scan of their
+trip history. Time still running on a dispatched trip is added on read.
+
+Windows have hour resolution: the 24-hour window is the current hour plus
+the 23 before it.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from trips.models import Trip
+from .models import Driver, DriverHours
+
+SLOTS = 14 * 24
+WINDOWS = {'24h': 24, '7d': 7 * 24, '14d': 14 * 24}
+DTYPE = '<u2'
+
+
+def _hour(moment):
+    return int(moment.timestamp()) // 3600
+
+
+def _empty_ring():
+    return np.zeros(SLOTS, dtype=DTYPE)
+
+
+def _advance(ring, last_hour, new_last):
+    """Clear the slots of hours after ``last_hour`` up to ``new_last``"""
+    if new_last - last_hour >= SLOTS:
+        ring[:] = 0
+    elif new_last > last_hour:
+        ring[np.arange(last_hour + 1, new_last + 1) % SLOTS] = 0
+
+
+def _add_driving(ring, last_hour, start, end):
+    """Add the minutes of ``start``-``end`` to ``ring``; returns the new last hour"""
+    if start is None or end is None or end <= start:
+        return last_hour
+    end_hour = _hour(end)
+    new_last = max(last_hour, end_hour)
+    _advance(ring, last_hour, new_last)
+    
+    hours = np.arange(max(_hour(start), new_last - SLOTS + 1), end_hour + 1)
+    if not len(hours):
+        return new_last
+    overlap = (
+        np.minimum(end.timestamp(), (hours + 1) * 3600.0)
+        - np.maximum(start.timestamp(), hours * 3600.0)
+    )
+    slots = hours % SLOTS
+    ring[slots] = np.minimum(ring[slots] + np.rint(overlap / 60), 60)
+    return new_last
+
+
+def record_driving(driver_pk, start, end):
+    """Add a driving span to a driver's hours of service"""
+    with transaction.atomic():
+        row, _ = DriverHours.objects.select_for_update().get_or_create(
+            driver_id=driver_pk,
+            defaults={'minutes': _empty_ring().tobytes()}
+        )
+        ring = np.frombuffer(bytes(row.minutes), dtype=DTYPE).copy()
+        row.last_hour = _add_driving(ring, row.last_hour, start, end)
+        row.minutes = ring.tobytes()
+        row.save(update_fields=['last_hour', 'minutes', 'updated_at'])
+
+
+def driving_hours(driver_pks, now=None):
+    """Rolling driving hours per window for each driver pk.
+    
+    Returns ``{pk: {'24h': hours, '7d': hours, '14d': hours}}`` from two
+    queries however many drivers are asked for.
+    """
+    now = now or timezone.now()
+    driver_pks = list(driver_pks)
+    index = {pk: position for position, pk in enumerate(driver_pks)}
+    rings = np.zeros((len(driver_pks), SLOTS), dtype=DTYPE)
+    last_hours = np.zeros(len(driver_pks), dtype=np.int64)
+    
+    for driver_pk, last_hour, minutes in DriverHours.objects.filter(
+        driver_id__in=driver_pks
+    ).values_list('driver_id', 'last_hour', 'minutes'):
+        rings[index[driver_pk]] = np.frombuffer(bytes(minutes), dtype=DTYPE)
+        last_hours[index[driver_pk]] = last_hour
+    
+    # Absolute hour held by every slot, then its age relative to now
+    slot_hours = last_hours[:, None] - ((last_hours[:, None] - np.arange(SLOTS)) % SLOTS)
+    ages = _hour(now) - slot_hours
+    
+    running = np.zeros(len(driver_pks))
+    for driver_pk, pickup in Trip.objects.filter(
+        driver_id__in=driver_pks,
+        status__in=[Trip.Status.DISPATCHED, Trip.Status.IN_PROGRESS],
+        actual_pickup_time__isnull=False
+    ).values_list('driver_id', 'actual_pickup_time'):
+        running[index[driver_pk]] += max((now - pickup).total_seconds(), 0) / 3600
+    
+    totals = {
+        window: (rings * ((ages >= 0) & (ages < length))).sum(axis=1) / 60
+        + np.minimum(running, length)
+        for window, length in WINDOWS.items()
+    }
+    return {
+        driver_pk: {window: round(float(totals[window][position]), 2) for window in WINDOWS}
+        for driver_pk, position in index.items()
+    }
+
+
+def remaining_hours(hours):
+    """Hours left in each window before its limit"""
+    limits = settings.HOURS_OF_SERVICE_LIMITS
+    return {
+        window: round(max(limits[window] - hours[window], 0), 2)
+        for window in WINDOWS if window in limits
+    }
+
+
+def limits_reached(hours):
+    """Windows whose limit the driver has reached"""
+    limits = settings.HOURS_OF_SERVICE_LIMITS
+    return [window for window in WINDOWS if window in limits and hours[window] >= limits[window]]
+
+
+def available_drivers(queryset, now=None):
+    """Drivers in ``queryset`` that can take a trip, with their hours.
+    
+    Returns ``(drivers, hours)``: the drivers on or off duty and under every
+    hours-of-service limit, and ``driving_hours`` keyed by their pk.
+    """
+    drivers = list(queryset.filter(status__in=[Driver.Status.ON_DUTY, Driver.Status.OFF_DUTY]))
+    hours = driving_hours((driver.pk for driver in drivers), now)
+    return [driver for driver in drivers if not limits_reached(hours[driver.pk])], hours
+
+
+def limit_error(driver, hours):
+    """Error message for a driver at an hours-of-service limit, or None"""
+    reached = limits_reached(hours)
+    if not reached:
+        return None
+    window = reached[0]
+    return (
+        f'Driver {driver.driver_id} has driven {hours[window]}h in the last {window} '
+        f'(limit {settings.HOURS_OF_SERVICE_LIMITS[window]}h)'
+    )
+
+
+@transaction.atomic
+def rebuild_driver_hours(now=None):
+    """Rebuild every driver's hours from completed trips of the last 14 days"""
+    now = now or timezone.now()
+    rings = {}
+    for driver_pk, start, end in Trip.objects.filter(
+        status=Trip.Status.COMPLETED,
+        actual_pickup_time__isnull=False,
+        actual_delivery_time__gt=now - timedelta(hours=SLOTS)
+    ).values_list('driver_id', 'actual_pickup_time', 'actual_delivery_time').iterator(chunk_size=5000):
+        ring, last_hour = rings.get(driver_pk) or (_empty_ring(), 0)
+        rings[driver_pk] = (ring, _add_driving(ring, last_hour, start, end))
+    
+    DriverHours.objects.all().delete()
+    DriverHours.objects.bulk_create(
+        [
+            DriverHours(driver_id=driver_pk, last_hour=last_hour, minutes=ring.tobytes())
+            for driver_pk, (ring, last_hour) in rings.items()
+        ],
+        batch_size=settings.COMPLIANCE_BATCH_SIZE
+    )
+    return len(rings)
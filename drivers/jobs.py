@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from archive.query import grouped_with_archive
+from core.stats import bump_data_version
+from jobs.registry import job
+from trips.models import Trip
+from .models import Driver
+
+
+@job('drivers.reconcile_counters')
+def reconcile_counters(ctx, chunk_size=500):
+    """Recompute completed trip and distance counters from hot and archived trips"""
+    checked = corrected = 0
+    
+    for drivers in ctx.chunks(Driver.objects.only('total_trips_completed', 'total_distance_km'), chunk_size):
+        actual = grouped_with_archive(
+            Trip, None,
+            Q(driver_id__in=[driver.pk for driver in drivers], status=Trip.Status.COMPLETED),
+            'driver',
+            completed=Count('id'),
+            distance=Sum('actual_distance_km')
+        )
+        
+        now = timezone.now()
+        stale = []
+        for driver in drivers:
+            row = actual.get(driver.pk, {})
+            completed = row.get('completed', 0)
+            distance = row.get('distance') or Decimal('0')
+            if driver.total_trips_completed != completed or driver.total_distance_km != distance:
+                driver.total_trips_completed = completed
+                driver.total_distance_km = distance
+                driver.updated_at = now
+                stale.append(driver)
+        
+        Driver.objects.bulk_update(stale, ['total_trips_completed', 'total_distance_km', 'updated_at'])
+        checked += len(drivers)
+        corrected += len(stale)
+    
+    if corrected:
+        bump_data_version(Driver)
+    return {'checked': checked, 'corrected': corrected}
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from drivers.hours import rebuild_driver_hours
+
+
+class Command(BaseCommand):
+    help = 'Rebuild driver hours of service from the last 14 days of completed trips'
+    
+    def handle(self, *args, **options):
+        drivers = rebuild_driver_hours()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt hours of service for {drivers} drivers'))
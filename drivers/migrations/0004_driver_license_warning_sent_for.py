@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0003_driver_drivers_updated_05c11f_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driver',
+            name='license_warning_sent_for',
+            field=models.DateField(blank=True, editable=False, help_text='Expiry date the last license expiry warning was sent for', null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0004_driver_license_warning_sent_for'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriverHours',
+            fields=[
+                ('driver', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='hours_of_service', serialize=False, to='drivers.driver')),
+                ('last_hour', models.BigIntegerField(default=0)),
+                ('minutes', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'driver hours',
+                'db_table': 'driver_hours',
+            },
+        ),
+    ]
@@ -30,6 +30,12 @@ class Driver(models.Model):
     )
     license_expiry_date = models.DateField(db_index=True)
     license_state = models.CharField(max_length=50)
+    license_warning_sent_for = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Expiry date the last license expiry warning was sent for"
+    )
     
     # Employment
     hire_date = models.DateField()
@@ -74,6 +80,7 @@ class Driver(models.Model):
         indexes = [
             models.Index(fields=['status', 'license_expiry_date']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -89,11 +96,12 @@ class Driver(models.Model):
     
     @property
     def is_available_for_trip(self):
-        """Check if driver can be assigned to a trip"""
-        return (
-            self.status in [self.Status.ON_DUTY, self.Status.OFF_DUTY] and
-            self.is_license_valid
-        )
+        """Check if driver can be assigned to a trip.
+        
+        Drivers with expired licenses are suspended on save and by the daily
+        compliance sweep, so the stored status is enough.
+        """
+        return self.status in [self.Status.ON_DUTY, self.Status.OFF_DUTY]
     
     @property
     def days_until_license_expiry(self):
@@ -103,11 +111,25 @@ class Driver(models.Model):
     
     @property
     def completion_rate(self):
-        """Calculate trip completion rate"""
-        total_trips = self.trips.count()
+        """Calculate trip completion rate over hot and archived trips.
+        
+        Uses the ``trips_total`` and ``trips_completed`` annotations (and
+        their ``archived_`` counterparts) when the queryset has them.
+        """
+        if 'trips_total' in self.__dict__:
+            total_trips = self.trips_total + (self.__dict__.get('archived_trips_total') or 0)
+            completed = self.trips_completed + (self.__dict__.get('archived_trips_completed') or 0)
+        else:
+            from archive.query import aggregate_with_archive
+            from trips.models import Trip
+            counts = aggregate_with_archive(
+                Trip, None, models.Q(driver=self),
+                total=models.Count('pk'),
+                completed=models.Count('pk', filter=models.Q(status='COMPLETED'))
+            )
+            total_trips, completed = counts['total'], counts['completed']
         if total_trips == 0:
             return 100.0
-        completed = self.trips.filter(status='COMPLETED').count()
         return round((completed / total_trips) * 100, 2)
     
     def save(self, *args, **kwargs):
@@ -124,4 +146,47 @@ class Driver(models.Model):
             else:
                 new_number = 1
             self.driver_id = f'DRV-{new_number:06d}'
+        
+        # Never leave a driver with an expired license available
+        suspended_from = None
+        if self.is_available_for_trip and not self.is_license_valid:
+            suspended_from = self.status
+            if self.pk:
+                stored = Driver.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+                suspended_from = stored or suspended_from
+            self.status = self.Status.SUSPENDED
         super().save(*args, **kwargs)
+        
+        if suspended_from is not None and suspended_from != self.status:
+            # Reported like the compliance sweep's suspensions
+            from core.compliance import record_license_suspensions
+            from core.stats import bump_data_version
+            record_license_suspensions([(self.pk, self.driver_id, suspended_from)])
+            bump_data_version(Driver)
+            self.status_change_recorded = self.status
+
+
+class DriverHours(models.Model):
+    """Driving minutes per hour over the last 14 days, kept as a ring buffer.
+    
+    ``minutes`` holds one little-endian uint16 per hour; absolute hour ``h``
+    (hours since the epoch) lives in slot ``h % 336`` and
+    ``last_hour`` is the newest hour written. See ``drivers.hours``.
+    """
+    
+    driver = models.OneToOneField(
+        Driver,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='hours_of_service'
+    )
+    last_hour = models.BigIntegerField(default=0)
+    minutes = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'driver_hours'
+        verbose_name_plural = 'driver hours'
+    
+    def __str__(self):
+        return f"Hours of service for driver {self.driver_id}"
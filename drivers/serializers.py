@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.utils import timezone
+from .hours import remaining_hours
 from .models import Driver
 
 
@@ -88,3 +89,21 @@ class DriverSummarySerializer(serializers.ModelSerializer):
             'id', 'driver_id', 'full_name', 'status',
             'is_license_valid', 'safety_score'
         ]
+
+
+class AvailableDriverSerializer(DriverSummarySerializer):
+    """Summary plus driving and remaining hours; pass ``driving_hours``
+    output as the ``hours`` context.
+    """
+    
+    driving_hours = serializers.SerializerMethodField()
+    remaining_hours = serializers.SerializerMethodField()
+    
+    class Meta(DriverSummarySerializer.Meta):
+        fields = DriverSummarySerializer.Meta.fields + ['driving_hours', 'remaining_hours']
+    
+    def get_driving_hours(self, obj):
+        return self.context['hours'][obj.pk]
+    
+    def get_remaining_hours(self, obj):
+        return remaining_hours(self.context['hours'][obj.pk])
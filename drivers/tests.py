@@ -0,0 +1,98 @@
+import random
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from core.factories import make_driver
+from core.stats import data_version
+from events.bus import record_status_change
+from events.domain import DriverStatusChanged
+from events.models import OutboxEvent
+from .hours import WINDOWS, driving_hours, limits_reached, record_driving
+from .models import Driver
+
+
+class LicenseSuspensionOnSaveTests(TestCase):
+    
+    def setUp(self):
+        self.driver = make_driver(1, status=Driver.Status.ON_TRIP)
+        Driver.objects.filter(pk=self.driver.pk).update(license_expiry_date=date.today() - timedelta(days=1))
+        self.driver.refresh_from_db()
+    
+    def suspension_events(self):
+        return list(OutboxEvent.objects.filter(event_type='driver.status_changed').values_list('payload', flat=True))
+    
+    def test_suspension_is_recorded_and_invalidates_stats(self):
+        version = data_version(Driver)
+        self.driver.status = Driver.Status.ON_DUTY
+        self.driver.save()
+        
+        self.assertEqual(self.driver.status, Driver.Status.SUSPENDED)
+        [payload] = self.suspension_events()
+        self.assertEqual(payload['old_status'], Driver.Status.ON_TRIP)
+        self.assertEqual(payload['status'], Driver.Status.SUSPENDED)
+        self.assertEqual(payload['reason'], 'License expired')
+        self.assertNotEqual(data_version(Driver), version)
+    
+    def test_caller_does_not_record_the_change_twice(self):
+        self.driver.status = Driver.Status.ON_DUTY
+        self.driver.save()
+        record_status_change(DriverStatusChanged, self.driver, Driver.Status.ON_TRIP)
+        self.assertEqual(len(self.suspension_events()), 1)
+
+
+class HoursOfServiceRingTests(TestCase):
+    
+    def setUp(self):
+        self.driver = make_driver(1)
+        self.now = datetime(2026, 3, 15, 12, 30, tzinfo=dt_timezone.utc)
+    
+    def expected_hours(self, spans):
+        """Window totals computed hour by hour from the raw spans"""
+        minutes = {}
+        for start, end in spans:
+            hour = start.replace(minute=0, second=0, microsecond=0)
+            while hour < end:
+                overlap = min(end, hour + timedelta(hours=1)) - max(start, hour)
+                minutes[hour] = minutes.get(hour, 0) + round(overlap.total_seconds() / 60)
+                hour += timedelta(hours=1)
+        current = self.now.replace(minute=0, second=0, microsecond=0)
+        return {
+            window: round(sum(
+                value for hour, value in minutes.items()
+                if timedelta(0) <= current - hour < timedelta(hours=length)
+            ) / 60, 2)
+            for window, length in WINDOWS.items()
+        }
+    
+    def test_windows_match_spans_across_wraparound(self):
+        rng = random.Random(46)
+        spans = []
+        moment = self.now - timedelta(days=20)
+        while True:
+            moment += timedelta(minutes=rng.randrange(30, 900))
+            end = moment + timedelta(minutes=rng.randrange(10, 600))
+            if end > self.now:
+                break
+            spans.append((moment, end))
+            moment = end
+        for start, end in spans:
+            record_driving(self.driver.pk, start, end)
+        
+        hours = driving_hours([self.driver.pk], now=self.now)[self.driver.pk]
+        
+        self.assertEqual(hours, self.expected_hours(spans))
+        self.assertLess(hours['24h'], hours['7d'])
+        self.assertLess(hours['7d'], hours['14d'])
+    
+    def test_driving_older_than_the_buffer_drops_out(self):
+        record_driving(self.driver.pk, self.now - timedelta(days=16), self.now - timedelta(days=16, hours=-8))
+        record_driving(self.driver.pk, self.now - timedelta(hours=3), self.now - timedelta(hours=1))
+        
+        hours = driving_hours([self.driver.pk], now=self.now)[self.driver.pk]
+        
+        self.assertEqual(hours, {'24h': 2.0, '7d': 2.0, '14d': 2.0})
+    
+    def test_limits_reached(self):
+        self.assertEqual(limits_reached({'24h': 10, '7d': 20, '14d': 30}), ['24h'])
+        self.assertEqual(limits_reached({'24h': 9.5, '7d': 20, '14d': 30}), [])
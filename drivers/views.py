@@ -4,16 +4,35 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
+from django.db import transaction
+from django.conf import settings
+from django.db.models import Count, OuterRef, Q, Subquery
 from datetime import timedelta
 from .models import Driver
 from .serializers import (
     DriverSerializer,
     DriverCreateUpdateSerializer,
-    DriverSummarySerializer
+    AvailableDriverSerializer
 )
+from core.mixins import ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin
+from events.bus import record_status_change
+from events.domain import DriverStatusChanged
+from core.stats import breakdown, total, cached_stats
+from .hours import available_drivers, driving_hours, remaining_hours, limits_reached
+from trips.models import Trip
+from archive.models import ArchivedTrip
+from archive.query import needs_archive
 
 
-class DriverViewSet(viewsets.ModelViewSet):
+def _archived_trip_count(**filters):
+    return Subquery(
+        ArchivedTrip.objects.filter(driver=OuterRef('pk'), **filters).order_by().values('driver').annotate(
+            count=Count('pk')
+        ).values('count')
+    )
+
+
+class DriverViewSet(ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, viewsets.ModelViewSet):
     """ViewSet for Driver CRUD operations"""
     
     queryset = Driver.objects.select_related('created_by').all()
@@ -21,28 +40,65 @@ class DriverViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'license_type']
     search_fields = ['driver_id', 'first_name', 'last_name', 'email', 'license_number']
+    natural_id_field = 'driver_id'
+    query_budget = {'list': 5, 'retrieve': 5, 'changes': 6, 'batch': 5}
     ordering_fields = ['driver_id', 'created_at', 'safety_score', 'license_expiry_date']
     
     def get_serializer_class(self):
         if self.action == 'available':
-            return DriverSummarySerializer
+            return AvailableDriverSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return DriverCreateUpdateSerializer
         return DriverSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve', 'changes', 'batch']:
+            # Counted in the same query instead of two per driver for completion_rate
+            queryset = queryset.annotate(
+                trips_total=Count('trips'),
+                trips_completed=Count('trips', filter=Q(trips__status='COMPLETED'))
+            )
+            if needs_archive(Trip, None):
+                queryset = queryset.annotate(
+                    archived_trips_total=_archived_trip_count(),
+                    archived_trips_completed=_archived_trip_count(status='COMPLETED')
+                )
+        return queryset
+    
     def perform_create(self, serializer):
         """Set created_by to current user"""
         serializer.save(created_by=self.request.user)
     
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Record status changes made through a plain update"""
+        old_status = serializer.instance.status
+        driver = serializer.save()
+        record_status_change(DriverStatusChanged, driver, old_status)
+    
     @action(detail=False, methods=['get'])
     def available(self, request):
-        """Get all available drivers for trip assignment"""
-        drivers = self.queryset.filter(
-            status__in=[Driver.Status.ON_DUTY, Driver.Status.OFF_DUTY],
-            license_expiry_date__gte=timezone.now().date()
-        )
-        serializer = DriverSummarySerializer(drivers, many=True)
-        return Response(serializer.data)
+        """Get all available drivers for trip assignment.
+        
+        Drivers at an hours-of-service limit are left out; the rest carry
+        their driving and remaining hours per window.
+        """
+        drivers, hours = available_drivers(self.queryset)
+        return Response(AvailableDriverSerializer(drivers, many=True, context={'hours': hours}).data)
+    
+    @action(detail=True, methods=['get'])
+    def hours(self, request, pk=None):
+        """Get a driver's rolling driving hours against the hours-of-service limits"""
+        driver = self.get_object()
+        hours = driving_hours([driver.pk])[driver.pk]
+        return Response({
+            'driver_id': driver.driver_id,
+            'driving_hours': hours,
+            'remaining_hours': remaining_hours(hours),
+            'limits': settings.HOURS_OF_SERVICE_LIMITS,
+            'limits_reached': limits_reached(hours),
+        })
     
     @action(detail=False, methods=['get'])
     def expiring_licenses(self, request):
@@ -61,23 +117,31 @@ class DriverViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get driver statistics"""
-        stats = {
-            'total': self.queryset.count(),
-            'on_duty': self.queryset.filter(status=Driver.Status.ON_DUTY).count(),
-            'off_duty': self.queryset.filter(status=Driver.Status.OFF_DUTY).count(),
-            'on_trip': self.queryset.filter(status=Driver.Status.ON_TRIP).count(),
-            'suspended': self.queryset.filter(status=Driver.Status.SUSPENDED).count(),
-            'expired_licenses': self.queryset.filter(
-                license_expiry_date__lt=timezone.now().date()
-            ).count(),
-            'expiring_soon': self.queryset.filter(
-                license_expiry_date__gte=timezone.now().date(),
-                license_expiry_date__lte=timezone.now().date() + timedelta(days=30)
-            ).count(),
+        return Response(cached_stats('drivers', [Driver], self._build_stats))
+    
+    def _build_stats(self):
+        today = timezone.now().date()
+        by_status = breakdown(self.queryset, 'status', Driver.Status.choices)
+        licenses = self.queryset.aggregate(
+            expired_licenses=Count('id', filter=Q(license_expiry_date__lt=today)),
+            expiring_soon=Count('id', filter=Q(
+                license_expiry_date__gte=today,
+                license_expiry_date__lte=today + timedelta(days=30)
+            ))
+        )
+        
+        return {
+            'total': total(by_status),
+            'on_duty': by_status[Driver.Status.ON_DUTY]['count'],
+            'off_duty': by_status[Driver.Status.OFF_DUTY]['count'],
+            'on_trip': by_status[Driver.Status.ON_TRIP]['count'],
+            'suspended': by_status[Driver.Status.SUSPENDED]['count'],
+            'expired_licenses': licenses['expired_licenses'],
+            'expiring_soon': licenses['expiring_soon'],
         }
-        return Response(stats)
     
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def suspend(self, request, pk=None):
         """Suspend a driver"""
         driver = self.get_object()
@@ -88,13 +152,16 @@ class DriverViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        old_status = driver.status
         driver.status = Driver.Status.SUSPENDED
         driver.save()
+        record_status_change(DriverStatusChanged, driver, old_status)
         
         serializer = self.get_serializer(driver)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def reactivate(self, request, pk=None):
         """Reactivate a suspended driver"""
         driver = self.get_object()
@@ -108,6 +175,7 @@ class DriverViewSet(viewsets.ModelViewSet):
         if driver.status == Driver.Status.SUSPENDED:
             driver.status = Driver.Status.OFF_DUTY
             driver.save()
+            record_status_change(DriverStatusChanged, driver, Driver.Status.SUSPENDED)
         
         serializer = self.get_serializer(driver)
         return Response(serializer.data)
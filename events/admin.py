@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Admin configuration for OutboxEvent model"""
+    
+    list_display = ['id', 'event_type', 'aggregate_type', 'aggregate_id', 'occurred_at', 'published_at']
+    list_filter = ['event_type', 'aggregate_type']
+    readonly_fields = ['event_type', 'aggregate_type', 'aggregate_id', 'payload', 'occurred_at', 'published_at']
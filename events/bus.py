@@ -0,0 +1,101 @@
+"""
+Transactional outbox and Redis relay.
+
+``record_event`` stores an event in the caller's transaction. ``relay_batch``
+moves unpublished events to Redis in one pipeline: each event is published
+on the ``EVENT_BUS_CHANNEL`` pub/sub channel for live consumers and appended
+to the ``EVENT_BUS_STREAM`` stream for consumers that need replay.
+"""
+import json
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.EVENT_BUS_REDIS_URL)
+    return _client
+
+
+def _outbox_row(event):
+    return OutboxEvent(
+        event_type=event.event_type,
+        aggregate_type=event.aggregate_type,
+        aggregate_id=event.id,
+        payload=event.to_payload()
+    )
+
+
+def record_event(event):
+    """Write ``event`` to the outbox as part of the current transaction"""
+    row = _outbox_row(event)
+    row.save()
+    return row
+
+
+def record_events(events):
+    """Write several events to the outbox with one insert"""
+    return OutboxEvent.objects.bulk_create([_outbox_row(event) for event in events])
+
+
+def relay_batch(batch_size=None):
+    """Publish the oldest unpublished events and mark them published.
+    
+    Rows are locked with SKIP LOCKED so several relays can run side by side.
+    Returns the number of events relayed.
+    """
+    batch_size = batch_size or settings.EVENT_BUS_BATCH_SIZE
+    
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(published_at__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+        
+        pipeline = get_redis().pipeline(transaction=False)
+        for event in events:
+            message = json.dumps(event.envelope())
+            pipeline.publish(settings.EVENT_BUS_CHANNEL, message)
+            pipeline.xadd(
+                settings.EVENT_BUS_STREAM,
+                {'event': message},
+                maxlen=settings.EVENT_BUS_STREAM_MAXLEN,
+                approximate=True
+            )
+        pipeline.execute()
+        
+        OutboxEvent.objects.filter(
+            pk__in=[event.pk for event in events]
+        ).update(published_at=timezone.now())
+    
+    return len(events)
+
+
+def prune_published():
+    """Delete published events older than the retention window"""
+    cutoff = timezone.now() - timedelta(days=settings.EVENT_OUTBOX_RETENTION_DAYS)
+    deleted, _ = OutboxEvent.objects.filter(published_at__lt=cutoff).delete()
+    return deleted
+
+
+def record_status_change(event_class, instance, old_status, **extra):
+    """Record a ``StatusChanged`` event unless the status did not change.
+    
+    Models that record a change themselves on save (a driver suspended over
+    an expired license) set ``status_change_recorded`` to the new status.
+    """
+    if old_status == instance.status or getattr(instance, 'status_change_recorded', None) == instance.status:
+        return None
+    return record_event(event_class.of(instance, old_status, **extra))
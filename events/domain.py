@@ -0,0 +1,158 @@
+"""
+Typed domain events.
+
+Every event is a frozen dataclass with a dotted ``event_type``. Status
+transitions share the ``StatusChanged`` fields so push channels can render
+them uniformly.
+"""
+from dataclasses import dataclass, asdict
+from decimal import Decimal
+from typing import ClassVar, Optional
+
+from core.signals import SYNCED_MODELS
+
+EVENT_TYPES = {}
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    """Base class for all domain events"""
+    
+    event_type: ClassVar[str] = ''
+    aggregate_type: ClassVar[str] = ''
+    
+    id: int
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.event_type:
+            EVENT_TYPES[cls.event_type] = cls
+    
+    def to_payload(self):
+        """JSON-safe dict of the event fields"""
+        return {
+            key: str(value) if isinstance(value, Decimal) else value
+            for key, value in asdict(self).items()
+        }
+    
+    @classmethod
+    def from_payload(cls, event_type, payload):
+        return EVENT_TYPES[event_type](**payload)
+
+
+@dataclass(frozen=True)
+class StatusChanged(DomainEvent):
+    """A status transition of a trip, vehicle, driver or maintenance record"""
+    
+    natural_id: str
+    old_status: str
+    status: str
+    
+    @classmethod
+    def of(cls, instance, old_status, **extra):
+        """Build the event from a saved model instance"""
+        return cls(
+            id=instance.pk,
+            natural_id=getattr(instance, SYNCED_MODELS[instance._meta.label_lower]),
+            old_status=old_status,
+            status=instance.status,
+            **extra
+        )
+
+
+@dataclass(frozen=True)
+class VehicleStatusChanged(StatusChanged):
+    event_type: ClassVar[str] = 'vehicle.status_changed'
+    aggregate_type: ClassVar[str] = 'vehicle'
+
+
+@dataclass(frozen=True)
+class DriverStatusChanged(StatusChanged):
+    event_type: ClassVar[str] = 'driver.status_changed'
+    aggregate_type: ClassVar[str] = 'driver'
+    
+    reason: str = ''
+
+
+@dataclass(frozen=True)
+class TripDispatched(StatusChanged):
+    event_type: ClassVar[str] = 'trip.dispatched'
+    aggregate_type: ClassVar[str] = 'trip'
+    
+    vehicle_id: int
+    driver_id: int
+    start_odometer_km: Decimal
+
+
+@dataclass(frozen=True)
+class TripCompleted(StatusChanged):
+    event_type: ClassVar[str] = 'trip.completed'
+    aggregate_type: ClassVar[str] = 'trip'
+    
+    vehicle_id: int
+    driver_id: int
+    end_odometer_km: Decimal
+    actual_distance_km: Decimal
+
+
+@dataclass(frozen=True)
+class TripCancelled(StatusChanged):
+    event_type: ClassVar[str] = 'trip.cancelled'
+    aggregate_type: ClassVar[str] = 'trip'
+    
+    vehicle_id: int
+    driver_id: int
+    reason: str
+
+
+@dataclass(frozen=True)
+class MaintenanceStarted(StatusChanged):
+    event_type: ClassVar[str] = 'maintenance.started'
+    aggregate_type: ClassVar[str] = 'maintenance'
+    
+    vehicle_id: int
+
+
+@dataclass(frozen=True)
+class MaintenanceCompleted(StatusChanged):
+    event_type: ClassVar[str] = 'maintenance.completed'
+    aggregate_type: ClassVar[str] = 'maintenance'
+    
+    vehicle_id: int
+    total_cost: Optional[Decimal] = None
+
+
+@dataclass(frozen=True)
+class TripDelayed(DomainEvent):
+    """An active trip missed its pickup or delivery deadline"""
+    
+    event_type: ClassVar[str] = 'trip.delayed'
+    aggregate_type: ClassVar[str] = 'trip'
+    
+    natural_id: str
+    status: str
+    deadline: str
+    deadline_at: str
+
+
+@dataclass(frozen=True)
+class DriverLicenseExpiring(DomainEvent):
+    """A driver's license expires within the warning window"""
+    
+    event_type: ClassVar[str] = 'driver.license_expiring'
+    aggregate_type: ClassVar[str] = 'driver'
+    
+    natural_id: str
+    license_expiry_date: str
+    days_left: int
+
+
+@dataclass(frozen=True)
+class VehicleMaintenanceOverdue(DomainEvent):
+    """A vehicle has scheduled maintenance past its date"""
+    
+    event_type: ClassVar[str] = 'vehicle.maintenance_overdue'
+    aggregate_type: ClassVar[str] = 'vehicle'
+    
+    natural_id: str
+    scheduled_date: str
@@ -0,0 +1,43 @@
+import time
+
+import redis
+from django.core.management.base import BaseCommand
+from events.bus import relay_batch, prune_published
+
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Relay outbox events to Redis pub/sub and streams'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+        parser.add_argument('--interval', type=float, default=0.5, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--batch-size', type=int, default=None)
+    
+    def handle(self, *args, **options):
+        if options['once']:
+            total = 0
+            while relayed := relay_batch(options['batch_size']):
+                total += relayed
+            self.stdout.write(self.style.SUCCESS(f'Relayed {total} events'))
+            return
+        
+        self.stdout.write('Relaying outbox events, press Ctrl+C to stop')
+        last_prune = 0
+        while True:
+            if time.monotonic() - last_prune > PRUNE_INTERVAL_SECONDS:
+                pruned = prune_published()
+                if pruned:
+                    self.stdout.write(f'Pruned {pruned} published events')
+                last_prune = time.monotonic()
+            
+            try:
+                relayed = relay_batch(options['batch_size'])
+            except redis.RedisError as exc:
+                self.stderr.write(f'Redis unavailable, retrying: {exc}')
+                relayed = 0
+                time.sleep(1)
+            
+            if not relayed:
+                time.sleep(options['interval'])
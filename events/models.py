@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """Domain event written in the same transaction as the change it describes.
+    
+    A relay process publishes unpublished rows to Redis and stamps
+    ``published_at``, so events are never lost or emitted for rolled back
+    changes.
+    """
+    
+    event_type = models.CharField(max_length=100, db_index=True)
+    aggregate_type = models.CharField(max_length=50)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField()
+    occurred_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['published_at', 'id']),
+            models.Index(fields=['aggregate_type', 'aggregate_id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} {self.aggregate_type}:{self.aggregate_id}"
+    
+    def envelope(self):
+        """Wire format published to Redis"""
+        return {
+            'event_id': self.pk,
+            'event_type': self.event_type,
+            'aggregate_type': self.aggregate_type,
+            'aggregate_id': self.aggregate_id,
+            'occurred_at': self.occurred_at.isoformat(),
+            'payload': self.payload
+        }
@@ -0,0 +1,151 @@
+"""
+Fuel efficiency anomaly detection.
+
+All fills are loaded into numpy arrays once and sorted per vehicle by date
+and odometer. The km/l of each fill is the odometer distance since the
+vehicle's previous fill over the litres bought (the fill-to-full method).
+Each fill is scored against its own vehicle's fills with the robust z-score
+``0.6745 * (x - median) / MAD``, so a few bad readings do not shift the
+baseline, and fills beyond ``FUEL_ANOMALY_THRESHOLD`` are flagged:
+
+- low km/l: fuel that did not go into distance (theft, leaks);
+- high km/l: more distance than the fuel allows (mis-keyed odometer, a
+  missed fill);
+- an odometer lower than the previous fill;
+- more litres than the vehicle's tank holds.
+
+Every run replaces the contents of the anomalies table.
+"""
+from array import array
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from vehicles.models import Vehicle
+from .models import FuelExpense, FuelAnomaly
+
+LOAD_CHUNK_SIZE = 20000
+MAD_SCALE = 0.6745
+
+
+def _load_fills(progress=None):
+    """Fill columns as arrays: pk, vehicle, date ordinal, odometer, litres"""
+    columns = [array('q'), array('q'), array('q'), array('d'), array('d')]
+    rows = FuelExpense.objects.order_by().values_list(
+        'pk', 'vehicle_id', 'date', 'odometer_reading_km', 'liters'
+    )
+    for count, (pk, vehicle_id, day, odometer, liters) in enumerate(rows.iterator(chunk_size=LOAD_CHUNK_SIZE), 1):
+        columns[0].append(pk)
+        columns[1].append(vehicle_id)
+        columns[2].append(day.toordinal())
+        columns[3].append(float(odometer))
+        columns[4].append(float(liters))
+        if progress and count % LOAD_CHUNK_SIZE == 0:
+            progress(count)
+    return [np.frombuffer(column, dtype=column.typecode) if column else np.array([]) for column in columns]
+
+
+def _group_median(groups, values, group_count):
+    """Median of ``values`` per group id in ``range(group_count)``; NaN for empty groups"""
+    order = np.lexsort((values, groups))
+    sorted_groups = groups[order]
+    sorted_values = values[order]
+    starts = np.searchsorted(sorted_groups, np.arange(group_count), side='left')
+    counts = np.searchsorted(sorted_groups, np.arange(group_count), side='right') - starts
+    
+    medians = np.full(group_count, np.nan)
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    medians[present] = (sorted_values[low] + sorted_values[high]) / 2
+    return medians, counts
+
+
+def find_anomalies(pks, vehicles, days, odometers, liters, tank_capacity):
+    """Flag fills in the given columns.
+    
+    ``tank_capacity`` maps vehicle pk to litres. Returns a list of dicts
+    with the ``FuelAnomaly`` fields.
+    """
+    if not len(pks):
+        return []
+    order = np.lexsort((pks, odometers, days, vehicles))
+    pks, vehicles, days, odometers, liters = (
+        column[order] for column in (pks, vehicles, days, odometers, liters)
+    )
+    vehicle_ids, groups = np.unique(vehicles, return_inverse=True)
+    
+    # Each fill against the previous fill of the same vehicle
+    follows = np.zeros(len(pks), dtype=bool)
+    follows[1:] = vehicles[1:] == vehicles[:-1]
+    distance = np.full(len(pks), np.nan)
+    distance[1:] = odometers[1:] - odometers[:-1]
+    distance[~follows] = np.nan
+    
+    rated = follows & (distance >= 0) & (liters > 0)
+    km_per_liter = np.full(len(pks), np.nan)
+    km_per_liter[rated] = distance[rated] / liters[rated]
+    
+    medians, counts = _group_median(groups[rated], km_per_liter[rated], len(vehicle_ids))
+    deviations = np.abs(km_per_liter - medians[groups])
+    mads, _ = _group_median(groups[rated], deviations[rated], len(vehicle_ids))
+    mads = np.maximum(mads, np.maximum(medians * settings.FUEL_ANOMALY_MIN_SPREAD, 1e-6))
+    
+    scores = np.zeros(len(pks))
+    scored = rated & (counts[groups] >= settings.FUEL_ANOMALY_MIN_FILLS)
+    scores[scored] = MAD_SCALE * (km_per_liter[scored] - medians[groups[scored]]) / mads[groups[scored]]
+    
+    capacity = np.array([tank_capacity.get(vehicle_id) or np.inf for vehicle_id in vehicle_ids.tolist()])
+    threshold = settings.FUEL_ANOMALY_THRESHOLD
+    flags = [
+        (FuelAnomaly.Kind.LOW_EFFICIENCY, scored & (scores < -threshold)),
+        (FuelAnomaly.Kind.HIGH_EFFICIENCY, scored & (scores > threshold)),
+        (FuelAnomaly.Kind.ODOMETER_ROLLBACK, follows & (distance < 0)),
+        (FuelAnomaly.Kind.OVER_TANK_CAPACITY, liters > capacity[groups]),
+    ]
+    
+    def figure(values, position):
+        return None if np.isnan(values[position]) else round(float(values[position]), 3)
+    
+    anomalies = []
+    for kind, mask in flags:
+        for position in np.flatnonzero(mask).tolist():
+            anomalies.append({
+                'fuel_expense_id': int(pks[position]),
+                'vehicle_id': int(vehicles[position]),
+                'kind': kind,
+                'day': int(days[position]),
+                'distance_km': figure(distance, position),
+                'km_per_liter': figure(km_per_liter, position),
+                'expected_km_per_liter': figure(medians, groups[position]),
+                'score': round(float(scores[position]), 3),
+            })
+    return anomalies
+
+
+def detect_fuel_anomalies(progress=None):
+    """Analyse every fuel fill and replace the anomalies table; returns counts per kind"""
+    columns = _load_fills(progress)
+    tank_capacity = {
+        pk: float(capacity)
+        for pk, capacity in Vehicle.objects.filter(fuel_capacity_liters__gt=0).values_list('pk', 'fuel_capacity_liters')
+    }
+    anomalies = find_anomalies(*columns, tank_capacity)
+    
+    now = timezone.now()
+    records = []
+    for anomaly in anomalies:
+        day = anomaly.pop('day')
+        records.append(FuelAnomaly(**anomaly, date=date.fromordinal(day), detected_at=now))
+    
+    with transaction.atomic():
+        FuelAnomaly.objects.all().delete()
+        FuelAnomaly.objects.bulk_create(records, batch_size=2000)
+    
+    found = {kind: 0 for kind in FuelAnomaly.Kind.values}
+    for record in records:
+        found[record.kind] += 1
+    return {'fills': len(columns[0]), 'anomalies': found}
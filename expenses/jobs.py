@@ -0,0 +1,14 @@
+from jobs.registry import job
+from .anomalies import detect_fuel_anomalies
+from .models import FuelExpense
+
+
+@job('expenses.fuel_anomalies')
+def fuel_anomalies(ctx):
+    """Re-run the fuel efficiency anomaly analysis"""
+    ctx.progress(0, FuelExpense.objects.count(), message='Loading fuel fills')
+    result = detect_fuel_anomalies(
+        progress=lambda count: ctx.progress(count, message=f'Loaded {count} fuel fills')
+    )
+    ctx.progress(result['fills'], result['fills'], message='Done')
+    return result
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from expenses.anomalies import detect_fuel_anomalies
+
+
+class Command(BaseCommand):
+    help = 'Flag fuel fills with outlying km/l, odometer rollbacks or more fuel than the tank holds'
+    
+    def handle(self, *args, **options):
+        result = detect_fuel_anomalies()
+        found = ', '.join(f'{count} {kind.lower()}' for kind, count in result['anomalies'].items())
+        self.stdout.write(self.style.SUCCESS(f"Analysed {result['fills']} fuel fills: {found}"))
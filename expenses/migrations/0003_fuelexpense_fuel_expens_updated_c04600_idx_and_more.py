@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_alter_fuelexpense_expense_id_and_more'),
+        ('trips', '0003_trip_trips_updated_540a71_idx'),
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fuelexpense',
+            index=models.Index(fields=['updated_at'], name='fuel_expens_updated_c04600_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otherexpense',
+            index=models.Index(fields=['updated_at'], name='other_expen_updated_14f7b3_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_fuelexpense_fuel_expens_updated_c04600_idx_and_more'),
+        ('vehicles', '0004_vehicle_maintenance_overdue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FuelAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('LOW_EFFICIENCY', 'Low Efficiency (possible theft or leak)'), ('HIGH_EFFICIENCY', 'High Efficiency (possible mis-keyed odometer or missed fill)'), ('ODOMETER_ROLLBACK', 'Odometer Lower Than Previous Fill'), ('OVER_TANK_CAPACITY', 'More Fuel Than Tank Capacity')], max_length=20)),
+                ('date', models.DateField(help_text='Date of the flagged fill')),
+                ('distance_km', models.FloatField(blank=True, help_text='Odometer distance since the previous fill', null=True)),
+                ('km_per_liter', models.FloatField(blank=True, null=True)),
+                ('expected_km_per_liter', models.FloatField(blank=True, help_text="Median km/l of the vehicle's fills", null=True)),
+                ('score', models.FloatField(default=0, help_text="Robust z-score of km/l against the vehicle's fills")),
+                ('detected_at', models.DateTimeField()),
+                ('fuel_expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='expenses.fuelexpense')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fuel_anomalies', to='vehicles.vehicle')),
+            ],
+            options={
+                'db_table': 'fuel_anomalies',
+                'ordering': ['-date', 'vehicle'],
+                'indexes': [models.Index(fields=['vehicle', '-date'], name='fuel_anomal_vehicle_3bdb59_idx'), models.Index(fields=['kind', '-date'], name='fuel_anomal_kind_9bf3d3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fuel_expense', 'kind'), name='fuel_anomalies_unique_kind')],
+            },
+        ),
+    ]
@@ -86,6 +86,7 @@ class FuelExpense(models.Model):
         indexes = [
             models.Index(fields=['vehicle', '-date']),
             models.Index(fields=['-date']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -112,6 +113,51 @@ class FuelExpense(models.Model):
         super().save(*args, **kwargs)
 
 
+class FuelAnomaly(models.Model):
+    """Fuel fill flagged by the fuel efficiency analysis"""
+    
+    class Kind(models.TextChoices):
+        LOW_EFFICIENCY = 'LOW_EFFICIENCY', _('Low Efficiency (possible theft or leak)')
+        HIGH_EFFICIENCY = 'HIGH_EFFICIENCY', _('High Efficiency (possible mis-keyed odometer or missed fill)')
+        ODOMETER_ROLLBACK = 'ODOMETER_ROLLBACK', _('Odometer Lower Than Previous Fill')
+        OVER_TANK_CAPACITY = 'OVER_TANK_CAPACITY', _('More Fuel Than Tank Capacity')
+    
+    fuel_expense = models.ForeignKey(
+        FuelExpense,
+        on_delete=models.CASCADE,
+        related_name='anomalies'
+    )
+    vehicle = models.ForeignKey(
+        'vehicles.Vehicle',
+        on_delete=models.CASCADE,
+        related_name='fuel_anomalies'
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    date = models.DateField(help_text="Date of the flagged fill")
+    
+    # Figures behind the flag
+    distance_km = models.FloatField(null=True, blank=True, help_text="Odometer distance since the previous fill")
+    km_per_liter = models.FloatField(null=True, blank=True)
+    expected_km_per_liter = models.FloatField(null=True, blank=True, help_text="Median km/l of the vehicle's fills")
+    score = models.FloatField(default=0, help_text="Robust z-score of km/l against the vehicle's fills")
+    
+    detected_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'fuel_anomalies'
+        ordering = ['-date', 'vehicle']
+        constraints = [
+            models.UniqueConstraint(fields=['fuel_expense', 'kind'], name='fuel_anomalies_unique_kind'),
+        ]
+        indexes = [
+            models.Index(fields=['vehicle', '-date']),
+            models.Index(fields=['kind', '-date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.fuel_expense_id} - {self.kind}"
+
+
 class OtherExpense(models.Model):
     """Model for other operational expenses"""
     
@@ -180,6 +226,7 @@ class OtherExpense(models.Model):
         indexes = [
             models.Index(fields=['vehicle', '-date']),
             models.Index(fields=['expense_type', '-date']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
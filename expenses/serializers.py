@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import FuelExpense, OtherExpense
+from .models import FuelExpense, FuelAnomaly, OtherExpense
 from vehicles.serializers import VehicleSummarySerializer
 
 
@@ -37,6 +37,27 @@ class FuelExpenseCreateUpdateSerializer(serializers.ModelSerializer):
         read_only_fields = ['expense_id']
 
 
+class FuelAnomalySerializer(serializers.ModelSerializer):
+    """Serializer for FuelAnomaly model"""
+    
+    expense_id = serializers.CharField(source='fuel_expense.expense_id', read_only=True)
+    vehicle_id = serializers.CharField(source='vehicle.vehicle_id', read_only=True)
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    liters = serializers.DecimalField(source='fuel_expense.liters', max_digits=8, decimal_places=2, read_only=True)
+    odometer_reading_km = serializers.DecimalField(
+        source='fuel_expense.odometer_reading_km', max_digits=10, decimal_places=2, read_only=True
+    )
+    
+    class Meta:
+        model = FuelAnomaly
+        fields = [
+            'id', 'fuel_expense', 'expense_id', 'vehicle', 'vehicle_id',
+            'kind', 'kind_display', 'date', 'liters', 'odometer_reading_km',
+            'distance_km', 'km_per_liter', 'expected_km_per_liter', 'score',
+            'detected_at'
+        ]
+
+
 class OtherExpenseSerializer(serializers.ModelSerializer):
     """Serializer for OtherExpense model"""
     
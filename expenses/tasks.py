@@ -0,0 +1,8 @@
+from celery import shared_task
+from .anomalies import detect_fuel_anomalies as detect
+
+
+@shared_task(name='expenses.detect_fuel_anomalies', ignore_result=True)
+def detect_fuel_anomalies():
+    """Nightly fuel efficiency anomaly analysis"""
+    return detect()
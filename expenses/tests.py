@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import numpy as np
+from django.test import TestCase
+from django.utils import timezone
+
+from core.factories import api_client, make_fill, make_vehicle
+from .anomalies import find_anomalies
+from .models import FuelAnomaly
+
+
+class MonthlyTrendTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        self.today = timezone.now().date()
+        self.first, self.second = make_vehicle(1), make_vehicle(2)
+        make_fill(self.first, self.today, cost=100)
+        make_fill(self.second, self.today, cost=40)
+    
+    def test_vehicle_filter_takes_the_natural_id(self):
+        response = self.client.get(f'/api/fuel-expenses/monthly_trend/?vehicle={self.first.vehicle_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[self.today.strftime('%Y-%m')]['total_cost'], 100.0)
+    
+    def test_future_fills_are_left_out(self):
+        make_fill(self.first, self.today + timedelta(days=62))
+        response = self.client.get('/api/fuel-expenses/monthly_trend/?group_by=vehicle')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(max(response.json()), self.today.strftime('%Y-%m'))
+
+
+class FuelAnomalyTests(TestCase):
+    
+    def columns(self, fills):
+        """Columns for ``find_anomalies`` from ``(odometer, liters)`` fills of vehicle 1"""
+        count = len(fills)
+        return (
+            np.arange(1, count + 1), np.ones(count, dtype=int), np.arange(count) + 739000,
+            np.array([odometer for odometer, _ in fills], dtype=float),
+            np.array([liters for _, liters in fills], dtype=float)
+        )
+    
+    def test_flags_low_efficiency_rollback_and_over_capacity(self):
+        fills = [(1000 + 100 * i, 10) for i in range(10)]
+        fills[5] = (1500, 40)
+        fills.append((1800, 10))
+        fills.append((2000, 90))
+        kinds = {
+            (anomaly['fuel_expense_id'], anomaly['kind'])
+            for anomaly in find_anomalies(*self.columns(fills), tank_capacity={1: 80})
+        }
+        self.assertIn((6, FuelAnomaly.Kind.LOW_EFFICIENCY), kinds)
+        self.assertIn((11, FuelAnomaly.Kind.ODOMETER_ROLLBACK), kinds)
+        self.assertIn((12, FuelAnomaly.Kind.OVER_TANK_CAPACITY), kinds)
+        self.assertNotIn((2, FuelAnomaly.Kind.LOW_EFFICIENCY), kinds)
+    
+    def test_anomalies_filter_by_vehicle_id(self):
+        client = api_client()
+        vehicle, other = make_vehicle(1), make_vehicle(2)
+        for target in (vehicle, other):
+            fill = make_fill(target, timezone.now().date())
+            FuelAnomaly.objects.create(
+                fuel_expense=fill, vehicle=target, kind=FuelAnomaly.Kind.OVER_TANK_CAPACITY,
+                date=fill.date, detected_at=timezone.now()
+            )
+        
+        response = client.get(f'/api/fuel-expenses/anomalies/?vehicle={vehicle.vehicle_id}')
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([row['vehicle_id'] for row in results], [vehicle.vehicle_id])
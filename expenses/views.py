@@ -3,18 +3,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Avg, Count
+from django.db.models import Sum, Avg, Count, F, Q
+from django.db.models.functions import TruncMonth
 from datetime import datetime, timedelta
-from .models import FuelExpense, OtherExpense
+from .models import FuelExpense, FuelAnomaly, OtherExpense
 from .serializers import (
     FuelExpenseSerializer,
     FuelExpenseCreateUpdateSerializer,
+    FuelAnomalySerializer,
     OtherExpenseSerializer,
     OtherExpenseCreateUpdateSerializer
 )
+from core.mixins import ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin
+from core.stats import breakdown, total, cached_stats
+from archive.query import add_archived_breakdown, grouped_with_archive
 
 
-class FuelExpenseViewSet(viewsets.ModelViewSet):
+class FuelExpenseViewSet(ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, viewsets.ModelViewSet):
     """ViewSet for FuelExpense CRUD operations"""
     
     queryset = FuelExpense.objects.select_related(
@@ -24,6 +29,7 @@ class FuelExpenseViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['vehicle', 'fuel_type', 'date']
     search_fields = ['expense_id', 'fuel_station', 'receipt_number']
+    natural_id_field = 'expense_id'
     ordering_fields = ['expense_id', 'date', 'total_cost']
     
     def get_serializer_class(self):
@@ -35,28 +41,57 @@ class FuelExpenseViewSet(viewsets.ModelViewSet):
         """Set created_by to current user"""
         serializer.save(created_by=self.request.user)
     
+    @action(detail=False, methods=['get'])
+    def anomalies(self, request):
+        """Get fills flagged by the last fuel anomaly analysis (``?kind=&vehicle=<vehicle_id>``)"""
+        anomalies = FuelAnomaly.objects.select_related('fuel_expense', 'vehicle')
+        if request.query_params.get('kind'):
+            anomalies = anomalies.filter(kind=request.query_params['kind'])
+        if request.query_params.get('vehicle'):
+            anomalies = anomalies.filter(vehicle__vehicle_id=request.query_params['vehicle'])
+        
+        page = self.paginate_queryset(anomalies)
+        if page is not None:
+            return self.get_paginated_response(FuelAnomalySerializer(page, many=True).data)
+        return Response(FuelAnomalySerializer(anomalies, many=True).data)
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get fuel expense statistics"""
-        stats = {
-            'total_expenses': self.queryset.count(),
-            'total_cost': self.queryset.aggregate(Sum('total_cost'))['total_cost__sum'] or 0,
-            'total_liters': self.queryset.aggregate(Sum('liters'))['liters__sum'] or 0,
-            'avg_price_per_liter': self.queryset.aggregate(Avg('price_per_liter'))['price_per_liter__avg'] or 0,
-            'by_fuel_type': {}
-        }
+        return Response(cached_stats('fuel-expenses', [FuelExpense], self._build_stats))
+    
+    def _build_stats(self):
+        by_fuel_type = breakdown(
+            self.queryset, 'fuel_type', FuelExpense._meta.get_field('fuel_type').choices,
+            cost=Sum('total_cost'),
+            liters=Sum('liters'),
+            price_sum=Sum('price_per_liter')
+        )
+        add_archived_breakdown(
+            by_fuel_type, FuelExpense, 'fuel_type',
+            cost=Sum('total_cost'),
+            liters=Sum('liters'),
+            price_sum=Sum('price_per_liter')
+        )
         
-        # Aggregate by fuel type
-        for fuel_choice in FuelExpense._meta.get_field('fuel_type').choices:
-            fuel_type = fuel_choice[0]
-            type_stats = self.queryset.filter(fuel_type=fuel_type).aggregate(
-                count=Count('id'),
-                total_cost=Sum('total_cost'),
-                total_liters=Sum('liters')
-            )
-            stats['by_fuel_type'][fuel_type] = type_stats
+        # Overall figures are derived from the per-type rows, not re-queried
+        total_expenses = total(by_fuel_type)
+        price_sum = total(by_fuel_type, 'price_sum')
         
-        return Response(stats)
+        return {
+            'total_expenses': total_expenses,
+            'total_cost': total(by_fuel_type, 'cost'),
+            'total_liters': total(by_fuel_type, 'liters'),
+            'avg_price_per_liter': price_sum / total_expenses if total_expenses else 0,
+            'by_fuel_type': {
+                fuel_type: {
+                    'count': row['count'],
+                    'total_cost': row['cost'],
+                    'total_liters': row['liters']
+                }
+                for fuel_type, row in by_fuel_type.items()
+            }
+        }
     
     @action(detail=False, methods=['get'])
     def by_vehicle(self, request):
@@ -68,43 +103,91 @@ class FuelExpenseViewSet(viewsets.ModelViewSet):
         else:
             return Response({'error': 'vehicle_id parameter is required'}, status=400)
         
+        totals = expenses.aggregate(
+            cost=Sum('total_cost'),
+            liters=Sum('liters'),
+            avg_cost=Avg('total_cost'),
+            count=Count('id')
+        )
+        
         stats = {
-            'total_cost': expenses.aggregate(Sum('total_cost'))['total_cost__sum'] or 0,
-            'total_liters': expenses.aggregate(Sum('liters'))['liters__sum'] or 0,
-            'avg_cost_per_fill': expenses.aggregate(Avg('total_cost'))['total_cost__avg'] or 0,
-            'expense_count': expenses.count()
+            'total_cost': totals['cost'] or 0,
+            'total_liters': totals['liters'] or 0,
+            'avg_cost_per_fill': totals['avg_cost'] or 0,
+            'expense_count': totals['count']
         }
         
         return Response(stats)
     
     @action(detail=False, methods=['get'])
     def monthly_trend(self, request):
-        """Get monthly fuel expense trend"""
-        months = int(request.query_params.get('months', 6))
+        """Get monthly fuel expense trend
+        
+        Months are aggregated in the database, archived fills included when
+        the window reaches them, and months without fills are returned as
+        zero rows. Optional ``vehicle`` (``vehicle_id``) and
+        ``fuel_type`` narrow the data; ``group_by=vehicle|fuel_type`` splits each month further.
+        """
+        try:
+            months = int(request.query_params.get('months', 6))
+            if months < 1:
+                raise ValueError()
+        except (ValueError, TypeError):
+            return Response({'error': 'months must be a positive integer'}, status=400)
+        
+        group_by = request.query_params.get('group_by')
+        group_fields = {'vehicle': 'vehicle__vehicle_id', 'fuel_type': 'fuel_type'}
+        if group_by and group_by not in group_fields:
+            return Response({'error': 'group_by must be one of: vehicle, fuel_type'}, status=400)
         
         from django.utils import timezone
-        start_date = timezone.now().date() - timedelta(days=months * 30)
+        today = timezone.now().date()
+        start_date = today - timedelta(days=months * 30)
         
-        expenses = self.queryset.filter(date__gte=start_date).order_by('date')
+        # Fills dated in a future month would fall outside the month buckets
+        filters = Q(date__gte=start_date, date__lte=today)
+        if request.query_params.get('vehicle'):
+            filters &= Q(vehicle__vehicle_id=request.query_params['vehicle'])
+        if request.query_params.get('fuel_type'):
+            filters &= Q(fuel_type=request.query_params['fuel_type'])
         
-        # Group by month
+        dimensions = {'month': TruncMonth('date')}
+        if group_by:
+            dimensions['group'] = F(group_fields[group_by])
+        rows = grouped_with_archive(
+            FuelExpense, start_date, filters, dimensions,
+            cost=Sum('total_cost'),
+            liters=Sum('liters'),
+            count=Count('id')
+        )
+        
+        # Every month in the window is present, even without fills
         monthly_data = {}
-        for expense in expenses:
-            month_key = expense.date.strftime('%Y-%m')
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {
-                    'total_cost': 0,
-                    'total_liters': 0,
-                    'count': 0
-                }
-            monthly_data[month_key]['total_cost'] += float(expense.total_cost)
-            monthly_data[month_key]['total_liters'] += float(expense.liters)
-            monthly_data[month_key]['count'] += 1
+        month = start_date.replace(day=1)
+        while month <= today:
+            monthly_data[month.strftime('%Y-%m')] = {} if group_by else {
+                'total_cost': 0.0,
+                'total_liters': 0.0,
+                'count': 0
+            }
+            month = (month + timedelta(days=32)).replace(day=1)
+        
+        for key, row in rows.items():
+            totals = {
+                'total_cost': float(row['cost'] or 0),
+                'total_liters': float(row['liters'] or 0),
+                'count': row['count']
+            }
+            if group_by:
+                month, group = key
+                monthly_data[month.strftime('%Y-%m')][group] = totals
+            else:
+                monthly_data[key.strftime('%Y-%m')] = totals
         
         return Response(monthly_data)
 
 
-class OtherExpenseViewSet(viewsets.ModelViewSet):
+class OtherExpenseViewSet(ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, viewsets.ModelViewSet):
     """ViewSet for OtherExpense CRUD operations"""
     
     queryset = OtherExpense.objects.select_related(
@@ -114,6 +197,7 @@ class OtherExpenseViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['vehicle', 'expense_type', 'date']
     search_fields = ['expense_id', 'description', 'vendor', 'receipt_number']
+    natural_id_field = 'expense_id'
     ordering_fields = ['expense_id', 'date', 'amount']
     
     def get_serializer_class(self):
@@ -128,22 +212,20 @@ class OtherExpenseViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get other expense statistics"""
-        stats = {
-            'total_expenses': self.queryset.count(),
-            'total_amount': self.queryset.aggregate(Sum('amount'))['amount__sum'] or 0,
-            'by_type': {}
-        }
-        
-        # Aggregate by expense type
-        for expense_choice in OtherExpense.ExpenseType.choices:
-            expense_type = expense_choice[0]
-            type_stats = self.queryset.filter(expense_type=expense_type).aggregate(
-                count=Count('id'),
-                total_amount=Sum('amount')
-            )
-            stats['by_type'][expense_type] = type_stats
+        return Response(cached_stats('other-expenses', [OtherExpense], self._build_stats))
+    
+    def _build_stats(self):
+        by_type = breakdown(
+            self.queryset, 'expense_type', OtherExpense.ExpenseType.choices,
+            total_amount=Sum('amount')
+        )
+        add_archived_breakdown(by_type, OtherExpense, 'expense_type', total_amount=Sum('amount'))
         
-        return Response(stats)
+        return {
+            'total_expenses': total(by_type),
+            'total_amount': total(by_type, 'total_amount'),
+            'by_type': by_type
+        }
     
     @action(detail=False, methods=['get'])
     def by_vehicle(self, request):
@@ -155,17 +237,15 @@ class OtherExpenseViewSet(viewsets.ModelViewSet):
         else:
             return Response({'error': 'vehicle_id parameter is required'}, status=400)
         
+        by_type = breakdown(
+            expenses, 'expense_type', OtherExpense.ExpenseType.choices,
+            amount=Sum('amount')
+        )
+        
         stats = {
-            'total_amount': expenses.aggregate(Sum('amount'))['amount__sum'] or 0,
-            'expense_count': expenses.count(),
-            'by_type': {}
+            'total_amount': total(by_type, 'amount'),
+            'expense_count': total(by_type),
+            'by_type': {expense_type: row['amount'] for expense_type, row in by_type.items()}
         }
         
-        for expense_choice in OtherExpense.ExpenseType.choices:
-            expense_type = expense_choice[0]
-            amount = expenses.filter(expense_type=expense_type).aggregate(
-                Sum('amount')
-            )['amount__sum'] or 0
-            stats['by_type'][expense_type] = amount
-        
         return Response(stats)
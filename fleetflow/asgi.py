@@ -2,6 +2,9 @@
 ASGI config for fleetflow project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI worker (e.g. ``gunicorn -k uvicorn.workers.UvicornWorker``)
+so the async status stream at ``/api/stream/status/`` does not tie up a thread
+per connected client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
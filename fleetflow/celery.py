@@ -0,0 +1,15 @@
+"""
+Celery application for fleetflow.
+
+Workers run background jobs (see the ``jobs`` app):
+    celery -A fleetflow worker -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fleetflow.settings')
+
+app = Celery('fleetflow')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
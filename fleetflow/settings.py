@@ -13,7 +13,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
+from celery.schedules import crontab
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +32,9 @@ DEBUG = config('DEBUG', default=True, cast=bool)
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=Csv())
 
+# Running under `manage.py test`
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Application definition
 
@@ -50,6 +55,7 @@ INSTALLED_APPS = [
     'drf_spectacular',
     
     # Local apps
+    'core.apps.CoreConfig',
     'accounts.apps.AccountsConfig',
     'vehicles.apps.VehiclesConfig',
     'drivers.apps.DriversConfig',
@@ -57,11 +63,16 @@ INSTALLED_APPS = [
     'maintenance.apps.MaintenanceConfig',
     'expenses.apps.ExpensesConfig',
     'analytics.apps.AnalyticsConfig',
+    'events.apps.EventsConfig',
+    'telemetry.apps.TelemetryConfig',
+    'jobs.apps.JobsConfig',
+    'archive.apps.ArchiveConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.instrumentation.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,25 +105,76 @@ WSGI_APPLICATION = 'fleetflow.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# Using SQLite for development - switch to PostgreSQL in production
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite for development; set DB_ENGINE=postgresql in production. PostgreSQL
+# connections come from a psycopg 3 pool (DB_POOL, the default) or are kept
+# open between requests for DB_CONN_MAX_AGE seconds and health-checked before
+# reuse. Statements running longer than DB_STATEMENT_TIMEOUT_MS are cancelled.
+# Compare the modes with `python manage.py benchmark_db_connections`.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DB_POOL = config('DB_POOL', default=True, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='fleetflow'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # A pool hands connections back on close, so it replaces CONN_MAX_AGE
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+                'options': f"-c statement_timeout={config('DB_STATEMENT_TIMEOUT_MS', default=30000, cast=int)}",
+            },
+        }
+    }
+    if DB_POOL:
+        from psycopg_pool import ConnectionPool
+        
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            # Seconds a request waits for a free connection before failing
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            # Recycle connections so server-side memory does not creep up
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=int),
+            # Ping a connection before handing it out
+            'check': ConnectionPool.check_connection,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
-}
 
-# Uncomment below for PostgreSQL (ensure correct credentials in .env)
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': config('DB_NAME', default='fleetflow'),
-#         'USER': config('DB_USER', default='postgres'),
-#         'PASSWORD': config('DB_PASSWORD', default=''),
-#         'HOST': config('DB_HOST', default='localhost'),
-#         'PORT': config('DB_PORT', default='5432'),
-#     }
-# }
+
+# Read replica. With DB_REPLICA_HOST set, list/retrieve and analytics reads
+# that opt in through core.mixins.ReplicaReadMixin go to the replica while
+# its lag is under the view's tolerance (REPLICA_MAX_LAG_SECONDS by default);
+# writes and everything else stay on the primary
+REPLICA_DB_ALIAS = 'replica'
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+REPLICA_LAG_CHECK_SECONDS = 5
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+if DB_ENGINE == 'postgresql' and config('DB_REPLICA_HOST', default=''):
+    DATABASES[REPLICA_DB_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': config('DB_REPLICA_HOST'),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # Tests read the primary through the replica alias
+        'TEST': {'MIRROR': 'default'},
+    }
+elif TESTING:
+    # Test runs get a replica alias mirroring the SQLite test database, so
+    # replica routing is exercised without a second server
+    DATABASES[REPLICA_DB_ALIAS] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
 
 
 # Cache configuration (Redis)
@@ -200,6 +262,146 @@ REST_FRAMEWORK = {
     'DATE_FORMAT': '%Y-%m-%d',
 }
 
+# Delta sync: how long deletions are remembered for ?updated_since= clients
+DELTA_SYNC_TOMBSTONE_RETENTION = timedelta(
+    days=config('DELTA_SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+)
+
+# Changed rows per page of a delta sync ?updated_since= response
+DELTA_SYNC_PAGE_SIZE = 500
+
+# Maximum natural IDs accepted by the batch lookup actions
+BATCH_LOOKUP_MAX_IDS = 1000
+
+# Seconds to cache stats actions per data version (0 disables caching)
+STATS_CACHE_TIMEOUT = config('STATS_CACHE_TIMEOUT', default=0, cast=int)
+
+# Per-request SQL instrumentation (core.instrumentation): query count and DB
+# time in X-Query-Count/Server-Timing headers, repeated query shapes (likely
+# N+1s) and query budget overruns logged to core.instrumentation. Views set
+# query_budget to override QUERY_BUDGET; strict mode raises instead of
+# logging and is on for test runs
+QUERY_INSTRUMENTATION = config('QUERY_INSTRUMENTATION', default=True, cast=bool)
+QUERY_TIMING_HEADERS = config('QUERY_TIMING_HEADERS', default=DEBUG, cast=bool)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_BUDGET = config('QUERY_BUDGET', default=50, cast=int)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=TESTING, cast=bool)
+
+# Serve the dashboard, fleet performance and financial reports from async
+# views that run independent queries concurrently (ASGI deployments only)
+ANALYTICS_ASYNC_VIEWS = config('ANALYTICS_ASYNC_VIEWS', default=False, cast=bool)
+ANALYTICS_QUERY_WORKERS = config('ANALYTICS_QUERY_WORKERS', default=8, cast=int)
+
+# Domain event bus (transactional outbox relayed to Redis pub/sub and streams)
+EVENT_BUS_REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+EVENT_BUS_CHANNEL = 'fleetflow:events'
+EVENT_BUS_STREAM = 'fleetflow:events:stream'
+EVENT_BUS_STREAM_MAXLEN = 100000
+EVENT_BUS_BATCH_SIZE = 500
+EVENT_OUTBOX_RETENTION_DAYS = 7
+
+# Live status stream (Server-Sent Events over ASGI, fed by the event bus)
+LIVE_STREAM_QUEUE_SIZE = 100
+LIVE_STREAM_HEARTBEAT_SECONDS = 15
+
+# GPS telemetry: ingest requests are buffered in a Redis list and written as
+# packed hourly chunks by `manage.py flush_telemetry`
+TELEMETRY_BUFFERED = config('TELEMETRY_BUFFERED', default=True, cast=bool)
+TELEMETRY_REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+TELEMETRY_BUFFER_KEY = 'fleetflow:telemetry:buffer'
+TELEMETRY_MAX_BATCH = 5000
+TELEMETRY_FLUSH_BATCHES = 200
+TELEMETRY_RETENTION_DAYS = config('TELEMETRY_RETENTION_DAYS', default=90, cast=int)
+
+# Furthest distance /api/vehicles/nearest/ searches before giving up
+NEAREST_VEHICLE_MAX_RADIUS_KM = 500
+
+# Days ahead covered by the hourly capacity calendar behind
+# /api/vehicles/free/ and /api/vehicles/calendar/
+CAPACITY_CALENDAR_DAYS = 28
+
+# Lane distances are cached per coordinate pair rounded to this many decimal
+# places (3 is roughly 100 m)
+DISTANCE_CACHE_PRECISION = 3
+DISTANCE_MATRIX_MAX_CELLS = 250000
+
+# Draft trip auto-assignment: cost weights (distance per 100 km to pickup,
+# unused capacity share, driver workload share, safety risk on heavy loads)
+AUTO_ASSIGN_WEIGHTS = {'distance': 1.0, 'slack': 0.5, 'workload': 0.3, 'safety': 0.2}
+AUTO_ASSIGN_WORKLOAD_DAYS = 7
+AUTO_ASSIGN_MAX_TRIPS = 2000
+
+# Largest batch POST /api/trips/bulk/ accepts
+TRIP_BULK_MAX_TRIPS = 500
+
+# Draft trips on the same lane are consolidated when their pickups fall
+# within this many hours of each other
+CONSOLIDATION_WINDOW_HOURS = 4
+
+# Hours of service: driving hours allowed per rolling window before a
+# driver can no longer be booked or dispatched
+HOURS_OF_SERVICE_LIMITS = {'24h': 10, '7d': 56, '14d': 90}
+
+# Celery (background jobs). Set CELERY_TASK_ALWAYS_EAGER=True to run jobs
+# inline without a broker; test runs do so by default
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=config('REDIS_URL', default='redis://localhost:6379/0'))
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=TESTING, cast=bool)
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'sweep-compliance': {
+        'task': 'core.sweep_compliance',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'schedule-predicted-maintenance': {
+        'task': 'maintenance.schedule_predicted',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'detect-fuel-anomalies': {
+        'task': 'expenses.detect_fuel_anomalies',
+        'schedule': crontab(hour=1, minute=0),
+    },
+    'archive-closed-records': {
+        'task': 'archive.archive_closed_records',
+        'schedule': crontab(hour=2, minute=0, day_of_week='sun'),
+    },
+}
+
+# Seconds between progress writes from a running job
+JOBS_PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Daily compliance sweep: license expiry warnings and bulk update batch size
+COMPLIANCE_LICENSE_WARNING_DAYS = config('COMPLIANCE_LICENSE_WARNING_DAYS', default=30, cast=int)
+COMPLIANCE_BATCH_SIZE = 1000
+
+# Predictive maintenance: service intervals per maintenance type (km and/or
+# days, whichever comes first), the window km rates are averaged over and
+# how far ahead records are created
+MAINTENANCE_INTERVALS = {
+    'OIL_CHANGE': {'km': 10000, 'days': 180},
+    'PREVENTIVE': {'km': 20000, 'days': 365},
+    'TIRE_SERVICE': {'km': 40000},
+    'BRAKE_SERVICE': {'km': 30000, 'days': 365},
+    'INSPECTION': {'days': 365},
+}
+MAINTENANCE_RATE_WINDOW_DAYS = 90
+MAINTENANCE_FORECAST_DAYS = 14
+
+# Fuel anomalies: robust z-score cut-off, fills a vehicle needs before its
+# km/l is scored, and the smallest spread (share of the median) assumed
+FUEL_ANOMALY_THRESHOLD = 3.5
+FUEL_ANOMALY_MIN_FILLS = 5
+FUEL_ANOMALY_MIN_SPREAD = 0.05
+
+# Archival: closed trips and their expenses older than this many months
+# move to the archive tables in batches of ARCHIVE_BATCH_SIZE. Aggregates
+# over archived rows are cached for ARCHIVE_CACHE_TIMEOUT seconds (0 = off)
+ARCHIVE_AFTER_MONTHS = config('ARCHIVE_AFTER_MONTHS', default=12, cast=int)
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_CACHE_TIMEOUT = config('ARCHIVE_CACHE_TIMEOUT', default=86400, cast=int)
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=12),
@@ -221,6 +423,7 @@ CORS_ALLOWED_ORIGINS = config(
     cast=Csv()
 )
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['X-Query-Count', 'Server-Timing']
 
 # API Documentation
 SPECTACULAR_SETTINGS = {
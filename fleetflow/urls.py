@@ -8,6 +8,7 @@ from django.conf.urls.static import static
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from core.views import fleet_status_stream, DistanceMatrixView
 
 # Import ViewSets
 from accounts.views import UserViewSet
@@ -16,12 +17,30 @@ from drivers.views import DriverViewSet
 from trips.views import TripViewSet
 from maintenance.views import MaintenanceRecordViewSet
 from expenses.views import FuelExpenseViewSet, OtherExpenseViewSet
+from jobs.views import JobViewSet
 from analytics.views import (
     DashboardAnalyticsView,
     FleetPerformanceView,
     FinancialReportView,
-    DriverPerformanceView
+    DriverPerformanceView,
+    DispatchBoardView
 )
+from analytics import async_views as async_analytics
+from telemetry.views import TelemetryIngestView, TelemetryTrackView, LatestPositionsView
+
+# Analytics views fire their queries concurrently when served over ASGI
+if settings.ANALYTICS_ASYNC_VIEWS:
+    analytics_views = {
+        'dashboard': async_analytics.dashboard_analytics,
+        'fleet': async_analytics.fleet_performance,
+        'financial': async_analytics.financial_report,
+    }
+else:
+    analytics_views = {
+        'dashboard': DashboardAnalyticsView.as_view(),
+        'fleet': FleetPerformanceView.as_view(),
+        'financial': FinancialReportView.as_view(),
+    }
 
 # Create router and register ViewSets
 router = routers.DefaultRouter()
@@ -32,6 +51,7 @@ router.register(r'trips', TripViewSet)
 router.register(r'maintenance', MaintenanceRecordViewSet)
 router.register(r'fuel-expenses', FuelExpenseViewSet)
 router.register(r'other-expenses', OtherExpenseViewSet)
+router.register(r'jobs', JobViewSet)
 
 urlpatterns = [
     # Admin
@@ -47,11 +67,21 @@ urlpatterns = [
     path('api/auth/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
     # Analytics Endpoints
-    path('api/analytics/dashboard/', DashboardAnalyticsView.as_view(), name='analytics-dashboard'),
-    path('api/analytics/fleet-performance/', FleetPerformanceView.as_view(), name='analytics-fleet'),
-    path('api/analytics/financial/', FinancialReportView.as_view(), name='analytics-financial'),
+    path('api/analytics/dashboard/', analytics_views['dashboard'], name='analytics-dashboard'),
+    path('api/analytics/fleet-performance/', analytics_views['fleet'], name='analytics-fleet'),
+    path('api/analytics/financial/', analytics_views['financial'], name='analytics-financial'),
     path('api/analytics/driver-performance/', DriverPerformanceView.as_view(), name='analytics-drivers'),
     
+    # Command center
+    path('api/dispatch-board/', DispatchBoardView.as_view(), name='dispatch-board'),
+    path('api/stream/status/', fleet_status_stream, name='status-stream'),
+    path('api/distances/matrix/', DistanceMatrixView.as_view(), name='distance-matrix'),
+    
+    # Telemetry
+    path('api/telemetry/', TelemetryIngestView.as_view(), name='telemetry-ingest'),
+    path('api/telemetry/track/', TelemetryTrackView.as_view(), name='telemetry-track'),
+    path('api/telemetry/latest/', LatestPositionsView.as_view(), name='telemetry-latest'),
+    
     # API Router
     path('api/', include(router.urls)),
 ]
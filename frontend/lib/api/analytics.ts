@@ -31,4 +31,10 @@ export const analyticsApi = {
     });
     return response.data;
   },
+
+  // Get the command center dispatch board in one request
+  async getDispatchBoard() {
+    const response = await apiClient.get('/dispatch-board/');
+    return response.data;
+  },
 };
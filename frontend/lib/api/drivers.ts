@@ -66,6 +66,12 @@ export const driverApi = {
     return response.data;
   },
 
+  // Get driving hours per rolling window and hours left under the limits
+  async getHours(id: number) {
+    const response = await apiClient.get(`/drivers/${id}/hours/`);
+    return response.data;
+  },
+
   // Get drivers with expiring licenses
   async getExpiringLicenses(days: number = 30) {
     const response = await apiClient.get('/drivers/expiring_licenses/', {
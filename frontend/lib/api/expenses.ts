@@ -46,4 +46,9 @@ export const expensesApi = {
   delete: async (id: number) => {
     await apiClient.delete(`/other-expenses/${id}/`);
   },
+
+  getFuelAnomalies: async (params?: { kind?: string; vehicle?: number; page?: number }) => {
+    const response = await apiClient.get('/fuel-expenses/anomalies/', { params });
+    return response.data;
+  },
 };
@@ -4,4 +4,5 @@ export * from './vehicles';
 export * from './drivers';
 export * from './trips';
 export * from './analytics';
+export * from './jobs';
 export { default as apiClient } from './client';
@@ -0,0 +1,53 @@
+// Background jobs API
+import apiClient from './client';
+
+export interface Job {
+  id: string;
+  kind: string;
+  params: Record<string, any>;
+  status: 'PENDING' | 'RUNNING' | 'SUCCEEDED' | 'FAILED' | 'CANCELLED';
+  progress_current: number;
+  progress_total: number | null;
+  progress_percent: number | null;
+  message: string;
+  cancel_requested: boolean;
+  result: any;
+  error: string;
+  created_by: number | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  updated_at: string;
+}
+
+export const jobApi = {
+  // Start a job, e.g. start('export.csv', { resource: 'trips' })
+  async start(kind: string, params: Record<string, any> = {}): Promise<Job> {
+    const response = await apiClient.post('/jobs/', { kind, params });
+    return response.data;
+  },
+
+  // Get job progress and result
+  async get(id: string): Promise<Job> {
+    const response = await apiClient.get(`/jobs/${id}/`);
+    return response.data;
+  },
+
+  // Cancel a pending or running job
+  async cancel(id: string): Promise<Job> {
+    const response = await apiClient.post(`/jobs/${id}/cancel/`);
+    return response.data;
+  },
+
+  // Poll until the job finishes
+  async wait(id: string, onProgress?: (job: Job) => void, intervalMs = 1000): Promise<Job> {
+    for (;;) {
+      const job = await this.get(id);
+      onProgress?.(job);
+      if (['SUCCEEDED', 'FAILED', 'CANCELLED'].includes(job.status)) {
+        return job;
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+};
@@ -0,0 +1,24 @@
+// Live fleet status stream (Server-Sent Events)
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
+
+export interface StatusChange {
+  type: 'trip' | 'vehicle' | 'driver' | 'maintenance';
+  event: string;
+  id: number;
+  natural_id: string;
+  old_status: string;
+  status: string;
+  at: string;
+}
+
+// Subscribe to status transitions; returns a function that closes the stream
+export function subscribeToStatusChanges(onChange: (change: StatusChange) => void): () => void {
+  const token = localStorage.getItem('access_token');
+  const source = new EventSource(`${API_BASE_URL}/stream/status/?token=${encodeURIComponent(token || '')}`);
+
+  source.addEventListener('status', (event) => {
+    onChange(JSON.parse((event as MessageEvent).data));
+  });
+
+  return () => source.close();
+}
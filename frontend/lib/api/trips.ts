@@ -11,9 +11,13 @@ export interface Trip {
   pickup_location: string;
   pickup_address: string;
   pickup_coordinates?: string;
+  pickup_latitude?: number | null;
+  pickup_longitude?: number | null;
   dropoff_location: string;
   dropoff_address: string;
   dropoff_coordinates?: string;
+  dropoff_latitude?: number | null;
+  dropoff_longitude?: number | null;
   cargo_description: string;
   cargo_weight_kg: number;
   cargo_value?: number;
@@ -29,6 +33,7 @@ export interface Trip {
   status: 'DRAFT' | 'DISPATCHED' | 'IN_PROGRESS' | 'COMPLETED' | 'CANCELLED';
   duration_hours?: number;
   is_delayed: boolean;
+  next_deadline?: string | null;
   notes?: string;
   cancellation_reason?: string;
   created_at: string;
@@ -101,4 +106,40 @@ export const tripApi = {
     const response = await apiClient.get('/trips/active/');
     return response.data;
   },
+
+  // Get active trips that missed a deadline
+  async getDelayed() {
+    const response = await apiClient.get('/trips/delayed/');
+    return response.data;
+  },
+
+  // Create several trips at once (all or nothing)
+  async bulkCreate(trips: Partial<Trip>[]): Promise<Trip[]> {
+    const response = await apiClient.post('/trips/bulk/', { trips });
+    return response.data;
+  },
+
+  // Get trips that overlap on the same vehicle or driver
+  async getConflicts(params?: { start?: string; end?: string; vehicle?: string; driver?: string }) {
+    const response = await apiClient.get('/trips/conflicts/', { params });
+    return response.data;
+  },
+
+  // Plan shared vehicles for draft trips on the same lane and window
+  async getConsolidationPlan(window_hours?: number) {
+    const response = await apiClient.get('/trips/consolidation/', {
+      params: { window_hours },
+    });
+    return response.data;
+  },
+
+  // Propose (or apply) the cheapest vehicle and driver for draft trips
+  async autoAssign(data: {
+    trips?: string[];
+    weights?: Partial<Record<'distance' | 'slack' | 'workload' | 'safety', number>>;
+    apply?: boolean;
+  } = {}) {
+    const response = await apiClient.post('/trips/auto-assign/', data);
+    return response.data;
+  },
 };
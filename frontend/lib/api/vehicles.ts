@@ -15,6 +15,7 @@ export interface Vehicle {
   fuel_capacity_liters?: number;
   current_odometer_km: number;
   status: 'AVAILABLE' | 'ON_TRIP' | 'IN_SHOP' | 'RETIRED';
+  maintenance_overdue: boolean;
   acquisition_cost?: number;
   acquisition_date?: string;
   notes?: string;
@@ -34,6 +35,19 @@ export interface VehicleStats {
   by_type: Record<string, number>;
 }
 
+export interface NearestVehicle {
+  id: number;
+  vehicle_id: string;
+  name: string;
+  vehicle_type: string;
+  status: string;
+  max_capacity_kg: number;
+  distance_km: number;
+  latitude: number;
+  longitude: number;
+  position_recorded_at: string;
+}
+
 export const vehicleApi = {
   // Get all vehicles
   async getAll(params?: Record<string, any>) {
@@ -70,6 +84,24 @@ export const vehicleApi = {
     return response.data;
   },
 
+  // Get vehicles with nothing scheduled in a window
+  async getFree(params: { start: string; end: string; vehicle_type?: string; min_capacity_kg?: number }) {
+    const response = await apiClient.get('/vehicles/free/', { params });
+    return response.data;
+  },
+
+  // Get the daily availability forecast
+  async getCalendar(params?: { vehicle_type?: string; min_capacity_kg?: number }) {
+    const response = await apiClient.get('/vehicles/calendar/', { params });
+    return response.data;
+  },
+
+  // Get closest available vehicles to a point or a trip's pickup
+  async getNearest(params: { lat?: number; lon?: number; trip?: string; min_capacity_kg?: number; k?: number; max_radius_km?: number }): Promise<NearestVehicle[]> {
+    const response = await apiClient.get('/vehicles/nearest/', { params });
+    return response.data;
+  },
+
   // Get vehicle stats
   async getStats(): Promise<VehicleStats> {
     const response = await apiClient.get('/vehicles/stats/');
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin configuration for Job model"""
+    
+    list_display = ['id', 'kind', 'status', 'progress_current', 'progress_total', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    search_fields = ['id', 'kind']
+    readonly_fields = [
+        'kind', 'params', 'status', 'progress_current', 'progress_total', 'message',
+        'cancel_requested', 'result', 'error', 'created_at', 'started_at', 'finished_at',
+        'updated_at', 'created_by'
+    ]
@@ -0,0 +1,91 @@
+"""
+Job handler registry and the context handlers report progress through.
+
+Handlers are plain functions registered with ``@job('kind')`` in an app's
+``jobs.py``. They are called with a ``JobContext`` followed by the job's
+params as keyword arguments and return a JSON-serializable result.
+"""
+import inspect
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+HANDLERS = {}
+
+
+def job(kind):
+    """Register a job handler under ``kind``"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def validate_params(kind, params):
+    """Raise ``TypeError`` if ``params`` do not fit the handler's signature"""
+    inspect.signature(HANDLERS[kind]).bind(None, **params)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation has been requested"""
+
+
+class JobContext:
+    """Progress reporting and cancellation checks for a running job.
+    
+    Progress is kept in memory and written at most once per
+    ``JOBS_PROGRESS_INTERVAL_SECONDS``; each write also picks up a pending
+    cancellation request.
+    """
+    
+    def __init__(self, job):
+        self.job = job
+        self._last_flush = time.monotonic()
+    
+    def progress(self, current=None, total=None, message=None):
+        """Record progress and raise ``JobCancelled`` if the job was cancelled"""
+        if current is not None:
+            self.job.progress_current = current
+        if total is not None:
+            self.job.progress_total = total
+        if message is not None:
+            self.job.message = message[:255]
+        
+        if time.monotonic() - self._last_flush >= settings.JOBS_PROGRESS_INTERVAL_SECONDS:
+            self.flush()
+    
+    def advance(self, count=1, message=None):
+        """Add ``count`` to the current progress"""
+        self.progress(self.job.progress_current + count, message=message)
+    
+    def flush(self):
+        """Write progress now and check for cancellation"""
+        self._last_flush = time.monotonic()
+        Job.objects.filter(pk=self.job.pk).update(
+            progress_current=self.job.progress_current,
+            progress_total=self.job.progress_total,
+            message=self.job.message,
+            updated_at=timezone.now()
+        )
+        if Job.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled
+    
+    def chunks(self, queryset, chunk_size=1000):
+        """Yield ``queryset`` in primary key order as lists of ``chunk_size``
+        rows, advancing progress after each chunk.
+        """
+        self.progress(total=queryset.count())
+        last_pk = None
+        while True:
+            page = queryset.order_by('pk')
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            rows = list(page[:chunk_size])
+            if not rows:
+                return
+            yield rows
+            last_pk = rows[-1].pk
+            self.advance(len(rows))
@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from .models import Job
+from .registry import HANDLERS, validate_params
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for Job model"""
+    
+    progress_percent = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'params', 'status',
+            'progress_current', 'progress_total', 'progress_percent', 'message',
+            'cancel_requested', 'result', 'error',
+            'created_by', 'created_at', 'started_at', 'finished_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class JobCreateSerializer(serializers.Serializer):
+    """Serializer for starting a job"""
+    
+    kind = serializers.CharField()
+    params = serializers.DictField(required=False, default=dict)
+    
+    def validate_kind(self, value):
+        if value not in HANDLERS:
+            raise serializers.ValidationError(
+                f"Unknown job kind. Available: {', '.join(sorted(HANDLERS))}"
+            )
+        return value
+    
+    def validate(self, data):
+        try:
+            validate_params(data['kind'], data['params'])
+        except TypeError as exc:
+            raise serializers.ValidationError({'params': str(exc)})
+        return data
@@ -0,0 +1,56 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+from .registry import HANDLERS, JobCancelled, JobContext
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(kind, params=None, user=None):
+    """Create a job and hand it to a worker once the transaction commits"""
+    job = Job.objects.create(kind=kind, params=params or {}, created_by=user)
+    transaction.on_commit(lambda: run_job.delay(str(job.pk)))
+    return job
+
+
+def _finish(job, status, **fields):
+    Job.objects.filter(pk=job.pk).update(
+        status=status,
+        progress_current=job.progress_current,
+        progress_total=job.progress_total,
+        message=job.message,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+        **fields
+    )
+
+
+@shared_task(name='jobs.run_job', ignore_result=True)
+def run_job(job_id):
+    """Run a pending job's handler and store its outcome"""
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=job_id, status=Job.Status.PENDING).update(
+        status=Job.Status.RUNNING,
+        started_at=now,
+        updated_at=now
+    )
+    if not claimed:
+        # Cancelled before a worker picked it up, or delivered twice
+        return
+    
+    job = Job.objects.get(pk=job_id)
+    try:
+        result = HANDLERS[job.kind](JobContext(job), **job.params)
+    except JobCancelled:
+        _finish(job, Job.Status.CANCELLED)
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed', job.pk, job.kind)
+        _finish(job, Job.Status.FAILED, error=f'{type(exc).__name__}: {exc}')
+    else:
+        if job.progress_total is not None:
+            job.progress_current = job.progress_total
+        _finish(job, Job.Status.SUCCEEDED, result=result)
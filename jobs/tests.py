@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from core.factories import api_client, make_user
+from .models import Job
+from .registry import HANDLERS
+from .tasks import enqueue
+
+# What the test handlers observed while running
+seen = []
+
+
+def count_to(context, n):
+    context.progress(total=n, message='Counting')
+    for _ in range(n):
+        context.advance()
+        seen.append(Job.objects.values_list('progress_current', 'progress_total', 'message').get())
+    return {'counted': n}
+
+
+def cancelled_midway(context):
+    context.progress(current=1, total=2)
+    Job.objects.update(cancel_requested=True)
+    context.flush()
+    seen.append('after cancel')
+
+
+def failing(context):
+    raise ValueError('no such vehicle')
+
+
+@override_settings(JOBS_PROGRESS_INTERVAL_SECONDS=0)
+@mock.patch.dict(HANDLERS, {'test.count_to': count_to, 'test.cancelled': cancelled_midway, 'test.failing': failing})
+class RunJobTests(TestCase):
+    """Jobs run eagerly once the enqueuing transaction commits"""
+    
+    def setUp(self):
+        seen.clear()
+        self.user = make_user()
+        self.client = api_client(self.user)
+    
+    def start(self, kind, params=None, run=True):
+        with self.captureOnCommitCallbacks(execute=run):
+            response = self.client.post('/api/jobs/', {'kind': kind, 'params': params or {}}, format='json')
+        self.assertEqual(response.status_code, 202, response.content)
+        return Job.objects.get(pk=response.json()['id'])
+    
+    def test_progress_is_written_while_running(self):
+        job = self.start('test.count_to', {'n': 3})
+        
+        self.assertEqual(seen, [(1, 3, 'Counting'), (2, 3, 'Counting'), (3, 3, 'Counting')])
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual((job.progress_current, job.result), (3, {'counted': 3}))
+        self.assertIsNotNone(job.finished_at)
+    
+    def test_cancelling_a_pending_job_stops_it_from_running(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = enqueue('test.count_to', {'n': 3}, self.user)
+        
+        response = self.client.post(f'/api/jobs/{job.pk}/cancel/')
+        self.assertEqual(response.json()['status'], Job.Status.CANCELLED)
+        for callback in callbacks:
+            callback()
+        
+        self.assertEqual(seen, [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.started_at), (Job.Status.CANCELLED, None))
+    
+    def test_cancel_request_stops_a_running_handler(self):
+        job = self.start('test.cancelled')
+        
+        self.assertEqual(seen, [])
+        self.assertEqual(job.status, Job.Status.CANCELLED)
+        self.assertEqual((job.progress_current, job.progress_total), (1, 2))
+        self.assertEqual(self.client.post(f'/api/jobs/{job.pk}/cancel/').status_code, 400)
+    
+    def test_failing_handler_stores_the_error(self):
+        with self.assertLogs('jobs.tasks', 'ERROR'):
+            job = self.start('test.failing')
+        
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.error, 'ValueError: no such vehicle')
+        self.assertIsNone(job.result)
@@ -0,0 +1,69 @@
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django_filters.rest_framework import DjangoFilterBackend
+from django.utils import timezone
+from .models import Job
+from .serializers import JobSerializer, JobCreateSerializer
+from .tasks import enqueue
+
+
+class JobViewSet(mixins.CreateModelMixin,
+                 mixins.RetrieveModelMixin,
+                 mixins.ListModelMixin,
+                 viewsets.GenericViewSet):
+    """Start background jobs, poll their progress and cancel them"""
+    
+    queryset = Job.objects.select_related('created_by').all()
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['kind', 'status']
+    
+    def get_queryset(self):
+        """Staff see every job, other users only their own"""
+        if self.request.user.is_staff:
+            return self.queryset
+        return self.queryset.filter(created_by=self.request.user)
+    
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return JobCreateSerializer
+        return JobSerializer
+    
+    def create(self, request, *args, **kwargs):
+        """Queue a job and return it for polling"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(
+            serializer.validated_data['kind'],
+            serializer.validated_data['params'],
+            request.user
+        )
+        job.refresh_from_db()
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a pending job or ask a running one to stop"""
+        job = self.get_object()
+        
+        if job.is_finished:
+            return Response(
+                {'error': f'Job already {job.get_status_display().lower()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        now = timezone.now()
+        cancelled = Job.objects.filter(pk=job.pk, status=Job.Status.PENDING).update(
+            status=Job.Status.CANCELLED,
+            cancel_requested=True,
+            finished_at=now,
+            updated_at=now
+        )
+        if not cancelled:
+            # Already running; the handler stops at its next progress update
+            Job.objects.filter(pk=job.pk).update(cancel_requested=True, updated_at=now)
+        
+        job.refresh_from_db()
+        return Response(JobSerializer(job).data)
@@ -10,16 +10,16 @@ class MaintenanceRecordAdmin(admin.ModelAdmin):
         'record_id', 'vehicle', 'maintenance_type', 'service_provider',
         'scheduled_date', 'status', 'total_cost', 'created_at'
     ]
-    list_filter = ['status', 'maintenance_type', 'scheduled_date']
+    list_filter = ['status', 'maintenance_type', 'is_predicted', 'scheduled_date']
     search_fields = [
         'record_id', 'description', 'service_provider',
         'vehicle__vehicle_id'
     ]
-    readonly_fields = ['created_at', 'updated_at', 'total_cost']
+    readonly_fields = ['is_predicted', 'created_at', 'updated_at', 'total_cost']
     
     fieldsets = (
         ('Record Information', {
-            'fields': ('record_id', 'vehicle', 'status')
+            'fields': ('record_id', 'vehicle', 'status', 'is_predicted')
         }),
         ('Maintenance Details', {
             'fields': ('maintenance_type', 'description', 'service_provider', 'technician_name')
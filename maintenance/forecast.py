@@ -0,0 +1,167 @@
+"""
+Predictive preventive maintenance.
+
+Each vehicle's daily km rate is the distance of its completed trips over the
+last ``MAINTENANCE_RATE_WINDOW_DAYS`` (or since its first trip in that
+window, for newer vehicles). Every maintenance type in
+``MAINTENANCE_INTERVALS`` falls due after its ``km`` or ``days`` interval
+since the last completed service of that type, whichever comes first; a
+vehicle that has never had one is measured from its last whole ``km``
+interval and its acquisition date. The projection runs over numpy arrays of
+vehicles x types, and services due within ``MAINTENANCE_FORECAST_DAYS``
+without an open record are bulk-created as SCHEDULED and ``is_predicted``.
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.stats import bump_data_version
+from trips.models import Trip
+from vehicles.models import Vehicle
+from .models import MaintenanceRecord
+
+MIN_OBSERVED_DAYS = 7
+RECORD_NUMBER_ATTEMPTS = 3
+
+
+def daily_km_rates(vehicle_pks, today):
+    """Average km per day for each vehicle pk, in the same order"""
+    window = settings.MAINTENANCE_RATE_WINDOW_DAYS
+    now = timezone.make_aware(datetime.combine(today, time.min)) + timedelta(days=1)
+    index = {pk: position for position, pk in enumerate(vehicle_pks)}
+    
+    rows = [
+        (index[vehicle_id], delivered.timestamp(), float(distance))
+        for vehicle_id, delivered, distance in Trip.objects.filter(
+            status=Trip.Status.COMPLETED,
+            actual_delivery_time__gte=now - timedelta(days=window),
+            actual_distance_km__isnull=False
+        ).values_list('vehicle_id', 'actual_delivery_time', 'actual_distance_km').iterator(chunk_size=5000)
+        if vehicle_id in index
+    ]
+    rates = np.zeros(len(vehicle_pks))
+    if not rows:
+        return rates
+    
+    positions, delivered, distance = (np.array(column) for column in zip(*rows))
+    totals = np.bincount(positions, weights=distance, minlength=len(vehicle_pks))
+    first = np.full(len(vehicle_pks), now.timestamp())
+    np.minimum.at(first, positions, delivered)
+    observed_days = np.clip((now.timestamp() - first) / 86400, MIN_OBSERVED_DAYS, window)
+    return totals / observed_days
+
+
+def _next_record_numbers(count):
+    """The next ``count`` record numbers after the newest record.
+    
+    Nothing reserves them, so a record saved in the meantime can take one;
+    the caller retries when its insert hits the unique ``record_id``.
+    """
+    last_record = MaintenanceRecord.objects.order_by('-id').first()
+    try:
+        last_number = int(last_record.record_id.split('-')[1]) if last_record else 0
+    except (IndexError, ValueError):
+        last_number = 0
+    return range(last_number + 1, last_number + 1 + count)
+
+
+def schedule_predicted_maintenance(today=None):
+    """Create SCHEDULED records for services due soon; returns how many"""
+    today = today or timezone.localdate()
+    intervals = settings.MAINTENANCE_INTERVALS
+    types = list(intervals)
+    horizon = today.toordinal() + settings.MAINTENANCE_FORECAST_DAYS
+    
+    vehicles = list(
+        Vehicle.objects.exclude(status=Vehicle.Status.RETIRED).order_by('pk').values_list(
+            'pk', 'current_odometer_km', 'acquisition_date', 'created_at'
+        )
+    )
+    if not vehicles or not types:
+        return 0
+    pks = [vehicle[0] for vehicle in vehicles]
+    row = {pk: position for position, pk in enumerate(pks)}
+    column = {maintenance_type: position for position, maintenance_type in enumerate(types)}
+    
+    odometer = np.array([float(vehicle[1]) for vehicle in vehicles])
+    since_day = np.array([
+        (vehicle[2] or timezone.localtime(vehicle[3]).date()).toordinal() for vehicle in vehicles
+    ], dtype=float)
+    rates = daily_km_rates(pks, today)
+    interval_km = np.array([intervals[name].get('km', np.nan) for name in types], dtype=float)
+    interval_days = np.array([intervals[name].get('days', np.nan) for name in types], dtype=float)
+    
+    # Baselines from the last completed service of each type
+    last_km = np.floor(odometer[:, None] / interval_km[None, :]) * interval_km[None, :]
+    last_day = np.repeat(since_day[:, None], len(types), axis=1)
+    serviced = MaintenanceRecord.objects.filter(
+        status=MaintenanceRecord.Status.COMPLETED, maintenance_type__in=types
+    ).values('vehicle_id', 'maintenance_type').annotate(
+        last_date=Max('completed_date'), last_odometer=Max('odometer_reading_km')
+    ).order_by()
+    for service in serviced:
+        if service['vehicle_id'] not in row:
+            continue
+        position = row[service['vehicle_id']], column[service['maintenance_type']]
+        last_km[position] = float(service['last_odometer'])
+        if service['last_date']:
+            last_day[position] = service['last_date'].toordinal()
+    
+    open_records = np.zeros((len(vehicles), len(types)), dtype=bool)
+    for vehicle_id, maintenance_type in MaintenanceRecord.objects.filter(
+        status__in=[MaintenanceRecord.Status.SCHEDULED, MaintenanceRecord.Status.IN_PROGRESS],
+        maintenance_type__in=types
+    ).values_list('vehicle_id', 'maintenance_type').distinct():
+        if vehicle_id in row:
+            open_records[row[vehicle_id], column[maintenance_type]] = True
+    
+    # Due day by distance at the current rate, by elapsed time, or both
+    due_km = last_km + interval_km[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_to_km = np.where(rates[:, None] > 0, (due_km - odometer[:, None]) / rates[:, None], np.inf)
+    due_by_km = np.where(np.isnan(due_km), np.nan, today.toordinal() + np.ceil(np.maximum(days_to_km, 0)))
+    due_by_days = last_day + interval_days[None, :]
+    due = np.maximum(np.fmin(due_by_km, due_by_days), today.toordinal())
+    
+    rows, columns = np.nonzero((due <= horizon) & ~open_records)
+    if not len(rows):
+        return 0
+    
+    labels = dict(MaintenanceRecord.MaintenanceType.choices)
+    records = []
+    for vehicle_row, type_column in zip(rows, columns):
+        due_day = int(due[vehicle_row, type_column])
+        reasons = []
+        if due_by_km[vehicle_row, type_column] <= due_day:
+            reasons.append(f'at {due_km[vehicle_row, type_column]:,.0f} km')
+        if due_by_days[vehicle_row, type_column] <= due_day:
+            reasons.append(f'{intervals[types[type_column]]["days"]} days after the last service')
+        records.append(MaintenanceRecord(
+            vehicle_id=pks[vehicle_row],
+            maintenance_type=types[type_column],
+            description=f'{labels[types[type_column]]} due {" or ".join(reasons)}',
+            service_provider='To be assigned',
+            scheduled_date=date.fromordinal(due_day),
+            odometer_reading_km=round(
+                odometer[vehicle_row] + rates[vehicle_row] * (due_day - today.toordinal()), 2
+            ),
+            is_predicted=True,
+        ))
+    
+    for attempt in range(RECORD_NUMBER_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                # A failed attempt may have kept the pks of an earlier batch
+                for record, number in zip(records, _next_record_numbers(len(records))):
+                    record.pk, record.record_id = None, f'MNT-{number:06d}'
+                MaintenanceRecord.objects.bulk_create(records, batch_size=1000)
+            break
+        except IntegrityError:
+            if attempt == RECORD_NUMBER_ATTEMPTS - 1:
+                raise
+    bump_data_version(MaintenanceRecord)
+    return len(records)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from maintenance.forecast import schedule_predicted_maintenance
+
+
+class Command(BaseCommand):
+    help = 'Schedule preventive maintenance predicted from odometer history'
+    
+    def handle(self, *args, **options):
+        created = schedule_predicted_maintenance()
+        self.stdout.write(self.style.SUCCESS(f'Scheduled {created} predicted maintenance records'))
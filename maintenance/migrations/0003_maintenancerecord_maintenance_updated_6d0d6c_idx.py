@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0002_alter_maintenancerecord_record_id'),
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerecord',
+            index=models.Index(fields=['updated_at'], name='maintenance_updated_6d0d6c_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0003_maintenancerecord_maintenance_updated_6d0d6c_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenancerecord',
+            name='is_predicted',
+            field=models.BooleanField(default=False, editable=False, help_text='Scheduled by the predictive maintenance scheduler'),
+        ),
+    ]
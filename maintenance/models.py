@@ -74,6 +74,12 @@ class MaintenanceRecord(models.Model):
         db_index=True
     )
     
+    is_predicted = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Scheduled by the predictive maintenance scheduler"
+    )
+    
     # Additional
     notes = models.TextField(blank=True)
     attachments = models.FileField(
@@ -99,6 +105,7 @@ class MaintenanceRecord(models.Model):
         indexes = [
             models.Index(fields=['vehicle', 'status']),
             models.Index(fields=['-scheduled_date']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -20,7 +20,7 @@ class MaintenanceRecordSerializer(serializers.ModelSerializer):
             'maintenance_type', 'description', 'service_provider',
             'technician_name', 'scheduled_date', 'completed_date',
             'odometer_reading_km', 'labor_cost', 'parts_cost', 'total_cost',
-            'status', 'notes', 'attachments', 'created_by',
+            'status', 'is_predicted', 'notes', 'attachments', 'created_by',
             'created_by_name', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
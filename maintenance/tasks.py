@@ -0,0 +1,8 @@
+from celery import shared_task
+from .forecast import schedule_predicted_maintenance
+
+
+@shared_task(name='maintenance.schedule_predicted', ignore_result=True)
+def schedule_predicted():
+    """Daily predictive preventive maintenance scheduling"""
+    return schedule_predicted_maintenance()
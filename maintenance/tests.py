@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.factories import api_client, make_driver, make_trip, make_vehicle
+from events.models import OutboxEvent
+from trips.models import Trip
+from vehicles.models import Vehicle
+from .forecast import schedule_predicted_maintenance
+from .models import MaintenanceRecord
+
+
+class CreateMaintenanceEventsTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+        self.vehicle = make_vehicle(1)
+    
+    def create(self, status, **fields):
+        today = timezone.localdate()
+        response = self.client.post('/api/maintenance/', {
+            'vehicle': self.vehicle.pk, 'maintenance_type': 'REPAIR', 'description': 'Brakes',
+            'service_provider': 'Garage', 'scheduled_date': today - timedelta(days=1),
+            'odometer_reading_km': 1000, 'labor_cost': 100, 'parts_cost': 50, 'status': status, **fields
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return [
+            (event_type, payload['old_status'], payload['status'])
+            for event_type, payload in OutboxEvent.objects.order_by('id').values_list('event_type', 'payload')
+        ]
+    
+    def test_created_in_progress_reports_the_start(self):
+        events = self.create('IN_PROGRESS')
+        
+        self.assertEqual(events, [
+            ('maintenance.started', 'SCHEDULED', 'IN_PROGRESS'),
+            ('vehicle.status_changed', 'AVAILABLE', 'IN_SHOP'),
+        ])
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.status, Vehicle.Status.IN_SHOP)
+    
+    def test_created_completed_reports_the_completion(self):
+        events = self.create('COMPLETED', completed_date=timezone.localdate())
+        
+        self.assertEqual(events, [('maintenance.completed', 'SCHEDULED', 'COMPLETED')])
+        self.assertEqual(OutboxEvent.objects.get().payload['total_cost'], '150.00')
+    
+    def test_created_scheduled_reports_nothing(self):
+        self.assertEqual(self.create('SCHEDULED'), [])
+
+
+class PredictedMaintenanceTests(TestCase):
+    
+    def setUp(self):
+        self.today = timezone.localdate()
+    
+    def predicted(self):
+        return sorted(
+            MaintenanceRecord.objects.filter(is_predicted=True).values_list(
+                'vehicle__vehicle_id', 'maintenance_type', 'scheduled_date'
+            )
+        )
+    
+    def test_due_by_distance_at_the_recent_daily_rate(self):
+        vehicle = make_vehicle(1, acquisition_date=self.today)
+        delivered = timezone.now() - timedelta(days=1)
+        make_trip(
+            vehicle, make_driver(1), start=delivered - timedelta(hours=8), status=Trip.Status.COMPLETED,
+            actual_delivery_time=delivered, actual_distance_km=700
+        )
+        # 700 km over the minimum 7 observed days is 100 km a day
+        Vehicle.objects.filter(pk=vehicle.pk).update(current_odometer_km=9850)
+        
+        self.assertEqual(schedule_predicted_maintenance(self.today), 1)
+        
+        record = MaintenanceRecord.objects.get()
+        self.assertEqual(
+            (record.maintenance_type, record.scheduled_date, record.description),
+            ('OIL_CHANGE', self.today + timedelta(days=2), 'Oil Change due at 10,000 km')
+        )
+    
+    def test_due_by_days_skipping_open_records(self):
+        vehicle = make_vehicle(1, acquisition_date=self.today - timedelta(days=360))
+        MaintenanceRecord.objects.create(
+            vehicle=vehicle, maintenance_type='OIL_CHANGE', description='Booked', service_provider='Garage',
+            scheduled_date=self.today, odometer_reading_km=0
+        )
+        
+        self.assertEqual(schedule_predicted_maintenance(self.today), 3)
+        
+        due = self.today + timedelta(days=5)
+        self.assertEqual(self.predicted(), [
+            (vehicle.vehicle_id, 'BRAKE_SERVICE', due),
+            (vehicle.vehicle_id, 'INSPECTION', due),
+            (vehicle.vehicle_id, 'PREVENTIVE', due),
+        ])
+        self.assertEqual(
+            sorted(MaintenanceRecord.objects.values_list('record_id', flat=True)),
+            ['MNT-000001', 'MNT-000002', 'MNT-000003', 'MNT-000004']
+        )
+        
+        self.assertEqual(schedule_predicted_maintenance(self.today), 0)
+        self.assertEqual(MaintenanceRecord.objects.count(), 4)
+    
+    def test_record_numbers_taken_meanwhile_are_retried(self):
+        make_vehicle(1, acquisition_date=self.today - timedelta(days=170))
+        make_vehicle(2, acquisition_date=self.today)
+        taken = MaintenanceRecord.objects.create(
+            vehicle=make_vehicle(3, status=Vehicle.Status.RETIRED), maintenance_type='REPAIR',
+            description='Brakes', service_provider='Garage', scheduled_date=self.today, odometer_reading_km=0
+        )
+        
+        with mock.patch('maintenance.forecast._next_record_numbers', side_effect=[range(1, 2), range(2, 3)]):
+            self.assertEqual(schedule_predicted_maintenance(self.today), 1)
+        
+        self.assertEqual(taken.record_id, 'MNT-000001')
+        self.assertEqual(MaintenanceRecord.objects.get(is_predicted=True).record_id, 'MNT-000002')
@@ -11,9 +11,13 @@ from .serializers import (
     MaintenanceRecordCreateUpdateSerializer
 )
 from vehicles.models import Vehicle
+from core.mixins import ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin
+from events.bus import record_status_change
+from events.domain import VehicleStatusChanged, MaintenanceStarted, MaintenanceCompleted
+from core.stats import breakdown, counts, total, cached_stats
 
 
-class MaintenanceRecordViewSet(viewsets.ModelViewSet):
+class MaintenanceRecordViewSet(ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, viewsets.ModelViewSet):
     """ViewSet for MaintenanceRecord CRUD operations"""
     
     queryset = MaintenanceRecord.objects.select_related(
@@ -23,6 +27,7 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'maintenance_type', 'vehicle']
     search_fields = ['record_id', 'description', 'service_provider']
+    natural_id_field = 'record_id'
     ordering_fields = ['record_id', 'scheduled_date', 'created_at']
     
     def get_serializer_class(self):
@@ -30,15 +35,33 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
             return MaintenanceRecordCreateUpdateSerializer
         return MaintenanceRecordSerializer
     
+    @transaction.atomic
     def perform_create(self, serializer):
-        """Set created_by and update vehicle status if in progress"""
+        """Set created_by and update vehicle status if in progress.
+        
+        A record created already started or completed reports the same
+        events as one moved there from SCHEDULED.
+        """
         maintenance = serializer.save(created_by=self.request.user)
         
         # If maintenance is in progress, set vehicle to IN_SHOP
         if maintenance.status == MaintenanceRecord.Status.IN_PROGRESS:
+            record_status_change(
+                MaintenanceStarted, maintenance, MaintenanceRecord.Status.SCHEDULED,
+                vehicle_id=maintenance.vehicle_id
+            )
+            old_vehicle_status = maintenance.vehicle.status
             maintenance.vehicle.status = Vehicle.Status.IN_SHOP
             maintenance.vehicle.save()
+            record_status_change(VehicleStatusChanged, maintenance.vehicle, old_vehicle_status)
+        elif maintenance.status == MaintenanceRecord.Status.COMPLETED:
+            record_status_change(
+                MaintenanceCompleted, maintenance, MaintenanceRecord.Status.SCHEDULED,
+                vehicle_id=maintenance.vehicle_id,
+                total_cost=maintenance.total_cost
+            )
     
+    @transaction.atomic
     def perform_update(self, serializer):
         """Update vehicle status based on maintenance status"""
         old_status = self.get_object().status
@@ -47,10 +70,23 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
         # Status change logic
         if old_status != maintenance.status:
             if maintenance.status == MaintenanceRecord.Status.IN_PROGRESS:
+                record_status_change(
+                    MaintenanceStarted, maintenance, old_status,
+                    vehicle_id=maintenance.vehicle_id
+                )
+                
                 # Set vehicle to IN_SHOP
+                old_vehicle_status = maintenance.vehicle.status
                 maintenance.vehicle.status = Vehicle.Status.IN_SHOP
                 maintenance.vehicle.save()
+                record_status_change(VehicleStatusChanged, maintenance.vehicle, old_vehicle_status)
             elif maintenance.status == MaintenanceRecord.Status.COMPLETED:
+                record_status_change(
+                    MaintenanceCompleted, maintenance, old_status,
+                    vehicle_id=maintenance.vehicle_id,
+                    total_cost=maintenance.total_cost
+                )
+                
                 # Check if there are other in-progress maintenance records
                 other_in_progress = MaintenanceRecord.objects.filter(
                     vehicle=maintenance.vehicle,
@@ -59,33 +95,39 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
                 
                 if not other_in_progress:
                     # No other in-progress maintenance, set vehicle to AVAILABLE
+                    old_vehicle_status = maintenance.vehicle.status
                     maintenance.vehicle.status = Vehicle.Status.AVAILABLE
                     maintenance.vehicle.save()
+                    record_status_change(VehicleStatusChanged, maintenance.vehicle, old_vehicle_status)
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get maintenance statistics"""
-        stats = {
-            'total': self.queryset.count(),
-            'scheduled': self.queryset.filter(status=MaintenanceRecord.Status.SCHEDULED).count(),
-            'in_progress': self.queryset.filter(status=MaintenanceRecord.Status.IN_PROGRESS).count(),
-            'completed': self.queryset.filter(status=MaintenanceRecord.Status.COMPLETED).count(),
-            'cancelled': self.queryset.filter(status=MaintenanceRecord.Status.CANCELLED).count(),
-            'total_cost': self.queryset.filter(
-                status=MaintenanceRecord.Status.COMPLETED
-            ).aggregate(
-                labor=Sum('labor_cost'),
-                parts=Sum('parts_cost')
-            ),
-            'by_type': {}
+        return Response(cached_stats('maintenance', [MaintenanceRecord], self._build_stats))
+    
+    def _build_stats(self):
+        by_status = breakdown(
+            self.queryset, 'status', MaintenanceRecord.Status.choices,
+            labor=Sum('labor_cost'),
+            parts=Sum('parts_cost')
+        )
+        by_type = breakdown(
+            self.queryset, 'maintenance_type', MaintenanceRecord.MaintenanceType.choices
+        )
+        completed = by_status[MaintenanceRecord.Status.COMPLETED]
+        
+        return {
+            'total': total(by_status),
+            'scheduled': by_status[MaintenanceRecord.Status.SCHEDULED]['count'],
+            'in_progress': by_status[MaintenanceRecord.Status.IN_PROGRESS]['count'],
+            'completed': completed['count'],
+            'cancelled': by_status[MaintenanceRecord.Status.CANCELLED]['count'],
+            'total_cost': {
+                'labor': completed['labor'],
+                'parts': completed['parts']
+            },
+            'by_type': counts(by_type)
         }
-        
-        # Count by maintenance type
-        for mtype in MaintenanceRecord.MaintenanceType.choices:
-            count = self.queryset.filter(maintenance_type=mtype[0]).count()
-            stats['by_type'][mtype[0]] = count
-        
-        return Response(stats)
     
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
@@ -130,10 +172,16 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
         
         maintenance.status = MaintenanceRecord.Status.IN_PROGRESS
         maintenance.save()
+        record_status_change(
+            MaintenanceStarted, maintenance, MaintenanceRecord.Status.SCHEDULED,
+            vehicle_id=maintenance.vehicle_id
+        )
         
         # Set vehicle to IN_SHOP
+        old_vehicle_status = maintenance.vehicle.status
         maintenance.vehicle.status = Vehicle.Status.IN_SHOP
         maintenance.vehicle.save()
+        record_status_change(VehicleStatusChanged, maintenance.vehicle, old_vehicle_status)
         
         serializer = self.get_serializer(maintenance)
         return Response(serializer.data)
@@ -151,9 +199,15 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
             )
         
         from django.utils import timezone
+        old_status = maintenance.status
         maintenance.status = MaintenanceRecord.Status.COMPLETED
         maintenance.completed_date = timezone.now().date()
         maintenance.save()
+        record_status_change(
+            MaintenanceCompleted, maintenance, old_status,
+            vehicle_id=maintenance.vehicle_id,
+            total_cost=maintenance.total_cost
+        )
         
         # Check if there are other in-progress maintenance records
         other_in_progress = MaintenanceRecord.objects.filter(
@@ -163,8 +217,10 @@ class MaintenanceRecordViewSet(viewsets.ModelViewSet):
         
         if not other_in_progress:
             # Set vehicle to AVAILABLE
+            old_vehicle_status = maintenance.vehicle.status
             maintenance.vehicle.status = Vehicle.Status.AVAILABLE
             maintenance.vehicle.save()
+            record_status_change(VehicleStatusChanged, maintenance.vehicle, old_vehicle_status)
         
         serializer = self.get_serializer(maintenance)
         return Response(serializer.data)
@@ -11,6 +11,7 @@ from decimal import Decimal
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fleetflow.settings')
 django.setup()
 
+from django.utils import timezone
 from accounts.models import User
 from vehicles.models import Vehicle
 from drivers.models import Driver
@@ -208,8 +209,8 @@ def seed_data():
             'dropoff_address': '456 Harbor St, Boston, MA 02101',
             'cargo_weight_kg': Decimal('15000.00'),
             'cargo_description': 'Electronics and machinery parts',
-            'scheduled_pickup_time': datetime.now() + timedelta(hours=2),
-            'scheduled_delivery_time': datetime.now() + timedelta(hours=8),
+            'scheduled_pickup_time': timezone.now() + timedelta(hours=2),
+            'scheduled_delivery_time': timezone.now() + timedelta(hours=8),
             'status': 'DISPATCHED'
         },
         {
@@ -222,8 +223,8 @@ def seed_data():
             'dropoff_address': '321 Michigan Ave, Detroit, MI 48201',
             'cargo_weight_kg': Decimal('18000.00'),
             'cargo_description': 'Automotive parts',
-            'scheduled_pickup_time': datetime.now() - timedelta(hours=5),
-            'scheduled_delivery_time': datetime.now() + timedelta(hours=1),
+            'scheduled_pickup_time': timezone.now() - timedelta(hours=5),
+            'scheduled_delivery_time': timezone.now() + timedelta(hours=1),
             'status': 'IN_PROGRESS'
         },
         {
@@ -236,8 +237,8 @@ def seed_data():
             'dropoff_address': '200 Market St, San Francisco, CA 94102',
             'cargo_weight_kg': Decimal('12000.00'),
             'cargo_description': 'Consumer goods',
-            'scheduled_pickup_time': datetime.now() + timedelta(days=1),
-            'scheduled_delivery_time': datetime.now() + timedelta(days=1, hours=6),
+            'scheduled_pickup_time': timezone.now() + timedelta(days=1),
+            'scheduled_delivery_time': timezone.now() + timedelta(days=1, hours=6),
             'status': 'DRAFT'
         }
     ]
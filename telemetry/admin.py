@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import TelemetryChunk
+
+
+@admin.register(TelemetryChunk)
+class TelemetryChunkAdmin(admin.ModelAdmin):
+    """Admin configuration for TelemetryChunk model"""
+    
+    list_display = ['vehicle', 'trip', 'bucket', 'start_at', 'end_at', 'sample_count']
+    list_filter = ['bucket']
+    raw_id_fields = ['vehicle', 'trip']
+    exclude = ['data']
@@ -0,0 +1,62 @@
+"""
+Fixed-width binary encoding for GPS samples.
+
+A sample is ``(timestamp, latitude_e6, longitude_e6, odometer_m, speed,
+heading)`` with integer fields: epoch seconds, coordinates in millionths of
+a degree (about 0.1 m), odometer in metres, speed in tenths of km/h and
+heading in tenths of a degree. ``NO_VALUE`` marks a missing speed or
+heading.
+
+Stored chunks keep the time as an offset from the chunk's hour bucket, which
+brings a sample down to 18 bytes. Buffered records also carry the vehicle
+and trip keys.
+"""
+import struct
+from datetime import datetime, timezone
+
+NO_VALUE = 0xFFFF
+BUCKET_SECONDS = 3600
+
+SAMPLE = struct.Struct('<HiiIHH')
+RECORD = struct.Struct('<QQIiiIHH')
+
+
+def pack_samples(bucket_ts, samples):
+    """Pack samples sorted by time that all fall in the bucket at ``bucket_ts``"""
+    return b''.join(
+        SAMPLE.pack(ts - bucket_ts, lat, lon, odometer, speed, heading)
+        for ts, lat, lon, odometer, speed, heading in samples
+    )
+
+
+def unpack_samples(bucket_ts, data):
+    """Yield the samples packed by ``pack_samples``"""
+    for offset, lat, lon, odometer, speed, heading in SAMPLE.iter_unpack(bytes(data)):
+        yield bucket_ts + offset, lat, lon, odometer, speed, heading
+
+
+def pack_records(records):
+    """Pack ``(vehicle_pk, trip_pk, *sample)`` tuples for the ingest buffer"""
+    return b''.join(
+        RECORD.pack(vehicle_pk, trip_pk or 0, *sample)
+        for vehicle_pk, trip_pk, sample in records
+    )
+
+
+def unpack_records(data):
+    """Yield the ``(vehicle_pk, trip_pk, sample)`` tuples packed by ``pack_records``"""
+    for vehicle_pk, trip_pk, *sample in RECORD.iter_unpack(data):
+        yield vehicle_pk, trip_pk or None, tuple(sample)
+
+
+def sample_to_dict(sample):
+    """Decode a sample into API units"""
+    ts, lat, lon, odometer, speed, heading = sample
+    return {
+        'recorded_at': datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+        'lat': lat / 1e6,
+        'lon': lon / 1e6,
+        'odometer_km': odometer / 1000,
+        'speed_kmh': None if speed == NO_VALUE else speed / 10,
+        'heading': None if heading == NO_VALUE else heading / 10,
+    }
@@ -0,0 +1,163 @@
+"""
+Telemetry ingestion: validate batched samples, link them to vehicles and
+active trips, then either write them straight away or append them to a
+Redis buffer that ``flush_telemetry`` drains into bulk inserts.
+
+Validation is done by hand rather than with a serializer; at thousands of
+samples per request the per-field overhead of DRF serializers dominates.
+"""
+from datetime import datetime
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from trips.models import Trip
+from vehicles.models import Vehicle
+from .encoding import NO_VALUE, pack_records, unpack_records
+from .store import write_chunks
+
+ACTIVE_TRIP_STATUSES = [Trip.Status.DISPATCHED, Trip.Status.IN_PROGRESS]
+REQUIRED_FIELDS = ['vehicle', 'recorded_at', 'lat', 'lon', 'odometer_km']
+
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.TELEMETRY_REDIS_URL)
+    return _client
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    recorded_at = datetime.fromisoformat(value)
+    if timezone.is_naive(recorded_at):
+        raise ValueError('recorded_at needs a timezone')
+    return int(recorded_at.timestamp())
+
+
+def _optional(value, scale, upper):
+    if value is None:
+        return NO_VALUE
+    value = float(value)
+    if not 0 <= value < upper:
+        raise ValueError
+    return round(value * scale)
+
+
+def parse_sample(item):
+    """Convert one sample dict into ``(vehicle_id, sample)`` or raise ``ValueError``"""
+    missing = [field for field in REQUIRED_FIELDS if item.get(field) is None]
+    if missing:
+        raise ValueError(f"{', '.join(missing)} required")
+    
+    vehicle_id = item['vehicle']
+    if isinstance(vehicle_id, bool) or not isinstance(vehicle_id, (str, int)):
+        raise ValueError('vehicle must be a vehicle ID')
+    vehicle_id = str(vehicle_id)
+    try:
+        ts = _timestamp(item['recorded_at'])
+    except (TypeError, ValueError):
+        raise ValueError('recorded_at must be epoch seconds or an ISO 8601 datetime with timezone')
+    try:
+        lat = float(item['lat'])
+        lon = float(item['lon'])
+        odometer_km = float(item['odometer_km'])
+    except (TypeError, ValueError):
+        raise ValueError('lat, lon and odometer_km must be numbers')
+    
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError('lat/lon out of range')
+    if not 0 <= odometer_km < 4_000_000:
+        raise ValueError('odometer_km out of range')
+    if not 0 < ts < 2 ** 32:
+        raise ValueError('recorded_at out of range')
+    try:
+        speed = _optional(item.get('speed_kmh'), 10, 6000)
+        heading = _optional(item.get('heading'), 10, 360)
+    except (TypeError, ValueError):
+        raise ValueError('speed_kmh must be 0-6000 and heading 0-360')
+    if heading != NO_VALUE:
+        # 359.95 and up round to a full turn, which is north again
+        heading %= 3600
+    
+    return vehicle_id, (
+        ts, round(lat * 1e6), round(lon * 1e6), round(odometer_km * 1000), speed, heading
+    )
+
+
+def ingest(items):
+    """Validate and store a batch of samples.
+    
+    Returns ``(accepted, rejected)`` where ``rejected`` lists the index and
+    reason for each sample that was dropped. Valid samples are stored even
+    when others in the batch are rejected.
+    """
+    parsed = []
+    rejected = []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('sample must be an object')
+            parsed.append((index, *parse_sample(item)))
+        except ValueError as exc:
+            rejected.append({'index': index, 'error': str(exc)})
+    
+    vehicle_ids = {vehicle_id for _, vehicle_id, _ in parsed}
+    vehicles = dict(
+        Vehicle.objects.filter(vehicle_id__in=vehicle_ids).values_list('vehicle_id', 'pk')
+    )
+    active_trips = dict(
+        Trip.objects.filter(
+            vehicle_id__in=vehicles.values(),
+            status__in=ACTIVE_TRIP_STATUSES
+        ).values_list('vehicle_id', 'pk')
+    )
+    
+    records = []
+    for index, vehicle_id, sample in parsed:
+        vehicle_pk = vehicles.get(vehicle_id)
+        if vehicle_pk is None:
+            rejected.append({'index': index, 'error': f'Unknown vehicle {vehicle_id}'})
+            continue
+        records.append((vehicle_pk, active_trips.get(vehicle_pk), sample))
+    
+    if records:
+        if settings.TELEMETRY_BUFFERED:
+            get_redis().rpush(settings.TELEMETRY_BUFFER_KEY, pack_records(records))
+        else:
+            write_chunks(records)
+    
+    rejected.sort(key=lambda rejection: rejection['index'])
+    return len(records), rejected
+
+
+def flush_buffer(max_batches=None):
+    """Move up to ``max_batches`` buffered ingest batches into chunks.
+    
+    The batches are taken off the list atomically; if the insert fails they
+    are pushed back so nothing is lost. Returns the number of samples
+    written.
+    """
+    max_batches = max_batches or settings.TELEMETRY_FLUSH_BATCHES
+    client = get_redis()
+    key = settings.TELEMETRY_BUFFER_KEY
+    
+    pipeline = client.pipeline()
+    pipeline.lrange(key, 0, max_batches - 1)
+    pipeline.ltrim(key, max_batches, -1)
+    batches, _ = pipeline.execute()
+    if not batches:
+        return 0
+    
+    records = [record for batch in batches for record in unpack_records(batch)]
+    try:
+        write_chunks(records)
+    except Exception:
+        client.rpush(key, *batches)
+        raise
+    return len(records)
+
@@ -0,0 +1,44 @@
+import time
+
+import redis
+from django.core.management.base import BaseCommand
+from telemetry.ingest import flush_buffer
+from telemetry.store import prune_chunks
+
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+class Command(BaseCommand):
+    help = 'Write buffered telemetry samples to the database in bulk'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the buffer once and exit')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the buffer is empty')
+        parser.add_argument('--batches', type=int, default=None, help='Buffered requests to write per insert')
+    
+    def handle(self, *args, **options):
+        if options['once']:
+            total = 0
+            while written := flush_buffer(options['batches']):
+                total += written
+            self.stdout.write(self.style.SUCCESS(f'Wrote {total} samples'))
+            return
+        
+        self.stdout.write('Flushing telemetry buffer, press Ctrl+C to stop')
+        last_prune = 0
+        while True:
+            if time.monotonic() - last_prune > PRUNE_INTERVAL_SECONDS:
+                pruned = prune_chunks()
+                if pruned:
+                    self.stdout.write(f'Pruned {pruned} telemetry chunks')
+                last_prune = time.monotonic()
+            
+            try:
+                written = flush_buffer(options['batches'])
+            except redis.RedisError as exc:
+                self.stderr.write(f'Redis unavailable, retrying: {exc}')
+                written = 0
+                time.sleep(1)
+            
+            if not written:
+                time.sleep(options['interval'])
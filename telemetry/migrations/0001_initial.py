@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('trips', '0003_trip_trips_updated_540a71_idx'),
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelemetryChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour the samples fall in')),
+                ('start_at', models.DateTimeField()),
+                ('end_at', models.DateTimeField()),
+                ('sample_count', models.PositiveIntegerField()),
+                ('end_latitude', models.FloatField()),
+                ('end_longitude', models.FloatField()),
+                ('end_odometer_km', models.FloatField()),
+                ('data', models.BinaryField()),
+                ('trip', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='telemetry_chunks', to='trips.trip')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='telemetry_chunks', to='vehicles.vehicle')),
+            ],
+            options={
+                'db_table': 'telemetry_chunks',
+                'ordering': ['vehicle', 'start_at'],
+                'indexes': [models.Index(fields=['vehicle', 'end_at'], name='telemetry_c_vehicle_0b6d62_idx'), models.Index(fields=['trip', 'start_at'], name='telemetry_c_trip_id_069a89_idx'), models.Index(fields=['bucket'], name='telemetry_c_bucket_cdeaa8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telemetry', '0001_initial'),
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehiclePosition',
+            fields=[
+                ('vehicle', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='position', serialize=False, to='vehicles.vehicle')),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('cell_lat', models.IntegerField()),
+                ('cell_lon', models.IntegerField()),
+                ('recorded_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'vehicle_positions',
+                'indexes': [models.Index(fields=['cell_lat', 'cell_lon'], name='vehicle_pos_cell_la_72e809_idx')],
+            },
+        ),
+    ]
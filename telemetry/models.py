@@ -0,0 +1,75 @@
+from django.db import models
+
+
+class TelemetryChunk(models.Model):
+    """GPS samples for one vehicle within one hour, packed into ``data``.
+    
+    Samples are fixed-width binary records (see ``telemetry.encoding``), so a
+    truck pinging every 10 seconds costs one row per flush instead of one row
+    per ping. ``bucket`` is the hour the samples fall in; retention drops
+    whole buckets. The ``end_*`` columns hold the newest sample so latest
+    positions can be read without decoding.
+    """
+    
+    vehicle = models.ForeignKey(
+        'vehicles.Vehicle',
+        on_delete=models.CASCADE,
+        related_name='telemetry_chunks'
+    )
+    trip = models.ForeignKey(
+        'trips.Trip',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='telemetry_chunks'
+    )
+    bucket = models.DateTimeField(help_text="Start of the hour the samples fall in")
+    start_at = models.DateTimeField()
+    end_at = models.DateTimeField()
+    sample_count = models.PositiveIntegerField()
+    end_latitude = models.FloatField()
+    end_longitude = models.FloatField()
+    end_odometer_km = models.FloatField()
+    data = models.BinaryField()
+    
+    class Meta:
+        db_table = 'telemetry_chunks'
+        ordering = ['vehicle', 'start_at']
+        indexes = [
+            models.Index(fields=['vehicle', 'end_at']),
+            models.Index(fields=['trip', 'start_at']),
+            models.Index(fields=['bucket']),
+        ]
+    
+    def __str__(self):
+        return f"{self.vehicle_id} @ {self.bucket:%Y-%m-%d %H:00} ({self.sample_count} samples)"
+
+
+class VehiclePosition(models.Model):
+    """Latest known position of a vehicle, bucketed into a lat/lon grid.
+    
+    Kept current by the telemetry writer. ``cell_lat`` and ``cell_lon`` index
+    the grid (see ``telemetry.spatial``) so nearest-vehicle searches only
+    scan the cells around a point.
+    """
+    
+    vehicle = models.OneToOneField(
+        'vehicles.Vehicle',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='position'
+    )
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    cell_lat = models.IntegerField()
+    cell_lon = models.IntegerField()
+    recorded_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'vehicle_positions'
+        indexes = [
+            models.Index(fields=['cell_lat', 'cell_lon']),
+        ]
+    
+    def __str__(self):
+        return f"{self.vehicle_id} at {self.latitude:.5f}, {self.longitude:.5f}"
@@ -0,0 +1,121 @@
+"""
+Grid index over the latest vehicle positions.
+
+Positions are bucketed into ``GRID_DEGREES`` cells. A nearest search first
+counts the candidates per cell inside the search radius, picks the smallest
+radius whose fully covered cells already hold ``k`` vehicles, and then loads
+only the cells within that radius. That is two index range reads per search
+however sparse the fleet is around the point.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count
+
+from core.geo import EARTH_RADIUS_KM, haversine_km
+from vehicles.models import Vehicle
+from .models import VehiclePosition
+
+GRID_DEGREES = 0.05
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def grid_cell(lat, lon):
+    """Grid cell containing a point"""
+    return math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES)
+
+
+def update_positions(latest):
+    """Upsert positions from ``{vehicle_pk: (timestamp, lat_e6, lon_e6)}``.
+    
+    Samples older than the stored position are ignored, so late or replayed
+    batches never move a vehicle backwards.
+    """
+    current = dict(
+        VehiclePosition.objects.filter(vehicle_id__in=latest).values_list('vehicle_id', 'recorded_at')
+    )
+    
+    positions = []
+    for vehicle_pk, (ts, lat_e6, lon_e6) in latest.items():
+        recorded_at = datetime.fromtimestamp(ts, dt_timezone.utc)
+        if vehicle_pk in current and current[vehicle_pk] >= recorded_at:
+            continue
+        lat, lon = lat_e6 / 1e6, lon_e6 / 1e6
+        cell_lat, cell_lon = grid_cell(lat, lon)
+        positions.append(VehiclePosition(
+            vehicle_id=vehicle_pk,
+            latitude=lat,
+            longitude=lon,
+            cell_lat=cell_lat,
+            cell_lon=cell_lon,
+            recorded_at=recorded_at
+        ))
+    
+    VehiclePosition.objects.bulk_create(
+        positions,
+        update_conflicts=True,
+        unique_fields=['vehicle'],
+        update_fields=['latitude', 'longitude', 'cell_lat', 'cell_lon', 'recorded_at']
+    )
+    return len(positions)
+
+
+def _cells_within(lat, lon, radius_km):
+    """Cell ranges of the bounding box ``radius_km`` around a point"""
+    dlat = radius_km / KM_PER_DEGREE
+    # Longitude degrees shrink towards the poles; size the box for the
+    # box edge nearest the pole
+    edge_lat = min(abs(lat) + dlat, 89.9)
+    dlon = min(radius_km / (KM_PER_DEGREE * math.cos(math.radians(edge_lat))), 180)
+    
+    min_cell = grid_cell(max(lat - dlat, -90), max(lon - dlon, -180))
+    max_cell = grid_cell(min(lat + dlat, 90), min(lon + dlon, 180))
+    return (min_cell[0], max_cell[0]), (min_cell[1], max_cell[1])
+
+
+def _farthest_corner_km(lat, lon, cell_lat, cell_lon):
+    """Distance from a point to the farthest corner of a grid cell"""
+    return max(
+        haversine_km(lat, lon, corner_lat * GRID_DEGREES, corner_lon * GRID_DEGREES)
+        for corner_lat in (cell_lat, cell_lat + 1)
+        for corner_lon in (cell_lon, cell_lon + 1)
+    )
+
+
+def nearest_vehicles(lat, lon, k=5, min_capacity_kg=None, max_radius_km=None):
+    """Up to ``k`` available vehicles closest to a point.
+    
+    Returns ``(distance_km, position)`` pairs sorted by distance, with the
+    position's vehicle loaded.
+    """
+    max_radius_km = max_radius_km or settings.NEAREST_VEHICLE_MAX_RADIUS_KM
+    candidates = VehiclePosition.objects.filter(
+        vehicle__status=Vehicle.Status.AVAILABLE
+    ).select_related('vehicle')
+    if min_capacity_kg is not None:
+        candidates = candidates.filter(vehicle__max_capacity_kg__gte=min_capacity_kg)
+    
+    # The farthest corner bounds how far any vehicle in a cell can be, so
+    # once the cells within ``radius`` hold k vehicles the k nearest are too
+    lat_cells, lon_cells = _cells_within(lat, lon, max_radius_km)
+    cell_counts = candidates.filter(
+        cell_lat__range=lat_cells, cell_lon__range=lon_cells
+    ).values_list('cell_lat', 'cell_lon').annotate(count=Count('pk')).order_by()
+    radius, covered = max_radius_km, 0
+    for cell_radius, count in sorted(
+        (_farthest_corner_km(lat, lon, cell_lat, cell_lon), count) for cell_lat, cell_lon, count in cell_counts
+    ):
+        covered += count
+        if covered >= k:
+            radius = min(cell_radius, max_radius_km)
+            break
+    
+    lat_cells, lon_cells = _cells_within(lat, lon, radius)
+    matches = []
+    for position in candidates.filter(cell_lat__range=lat_cells, cell_lon__range=lon_cells):
+        distance = haversine_km(lat, lon, position.latitude, position.longitude)
+        if distance <= radius:
+            matches.append((distance, position))
+    matches.sort(key=lambda match: match[0])
+    return matches[:k]
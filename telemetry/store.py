@@ -0,0 +1,100 @@
+"""
+Reads and writes of packed telemetry chunks.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .encoding import BUCKET_SECONDS, pack_samples, unpack_samples, sample_to_dict
+from .models import TelemetryChunk
+from .spatial import update_positions
+
+
+def _utc(ts):
+    return datetime.fromtimestamp(ts, dt_timezone.utc)
+
+
+def write_chunks(records, batch_size=1000):
+    """Group ``(vehicle_pk, trip_pk, sample)`` records into one chunk per
+    vehicle, trip and hour, insert them with ``bulk_create`` and move each
+    vehicle's latest position forward.
+    
+    Returns the number of chunks written.
+    """
+    groups = defaultdict(list)
+    for vehicle_pk, trip_pk, sample in records:
+        bucket_ts = sample[0] - sample[0] % BUCKET_SECONDS
+        groups[vehicle_pk, trip_pk, bucket_ts].append(sample)
+    
+    chunks = []
+    latest = {}
+    for (vehicle_pk, trip_pk, bucket_ts), samples in groups.items():
+        samples.sort()
+        last = samples[-1]
+        if vehicle_pk not in latest or latest[vehicle_pk][0] < last[0]:
+            latest[vehicle_pk] = last[:3]
+        chunks.append(TelemetryChunk(
+            vehicle_id=vehicle_pk,
+            trip_id=trip_pk,
+            bucket=_utc(bucket_ts),
+            start_at=_utc(samples[0][0]),
+            end_at=_utc(last[0]),
+            sample_count=len(samples),
+            end_latitude=last[1] / 1e6,
+            end_longitude=last[2] / 1e6,
+            end_odometer_km=last[3] / 1000,
+            data=pack_samples(bucket_ts, samples)
+        ))
+    
+    TelemetryChunk.objects.bulk_create(chunks, batch_size=batch_size)
+    update_positions(latest)
+    return len(chunks)
+
+
+def read_track(chunks, start=None, end=None):
+    """Decode the samples in ``chunks`` between ``start`` and ``end`` in time order"""
+    if start is not None:
+        chunks = chunks.filter(end_at__gte=start)
+    if end is not None:
+        chunks = chunks.filter(start_at__lte=end)
+    
+    start_ts = start.timestamp() if start is not None else float('-inf')
+    end_ts = end.timestamp() if end is not None else float('inf')
+    samples = []
+    for bucket, data in chunks.values_list('bucket', 'data'):
+        bucket_ts = int(bucket.timestamp())
+        samples.extend(
+            sample for sample in unpack_samples(bucket_ts, data)
+            if start_ts <= sample[0] <= end_ts
+        )
+    
+    samples.sort()
+    return [sample_to_dict(sample) for sample in samples]
+
+
+def latest_positions(vehicles):
+    """Newest known position for each vehicle in the ``vehicles`` queryset"""
+    newest = TelemetryChunk.objects.filter(
+        vehicle=OuterRef('pk')
+    ).order_by('-end_at').values('pk')[:1]
+    chunk_ids = vehicles.annotate(
+        latest_chunk=Subquery(newest)
+    ).exclude(latest_chunk=None).values_list('latest_chunk', flat=True)
+    
+    return TelemetryChunk.objects.filter(pk__in=list(chunk_ids)).select_related(
+        'vehicle', 'trip'
+    ).only(
+        'vehicle__vehicle_id', 'trip__trip_id', 'end_at',
+        'end_latitude', 'end_longitude', 'end_odometer_km'
+    ).order_by('vehicle__vehicle_id')
+
+
+def prune_chunks(retention_days=None):
+    """Delete chunks for hours older than the retention window"""
+    retention_days = retention_days or settings.TELEMETRY_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = TelemetryChunk.objects.filter(bucket__lt=cutoff).delete()
+    return deleted
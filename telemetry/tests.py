@@ -0,0 +1,123 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.factories import api_client, make_driver, make_trip, make_vehicle
+from trips.models import Trip
+from .encoding import NO_VALUE, pack_records, pack_samples, sample_to_dict, unpack_records, unpack_samples
+from .ingest import flush_buffer, ingest, parse_sample
+
+
+class EncodingTests(SimpleTestCase):
+    
+    samples = [
+        (1_772_000_000, 12_971_599, 77_594_566, 125_400_500, 655, 3599),
+        (1_772_000_030, -33_868_820, -151_209_290, 125_401_000, NO_VALUE, NO_VALUE),
+    ]
+    
+    def test_samples_round_trip_within_their_bucket(self):
+        bucket_ts = 1_772_000_000 - 1_772_000_000 % 3600
+        data = pack_samples(bucket_ts, self.samples)
+        
+        self.assertEqual(len(data), 18 * len(self.samples))
+        self.assertEqual(list(unpack_samples(bucket_ts, data)), self.samples)
+    
+    def test_records_round_trip_with_and_without_a_trip(self):
+        records = [(7, 42, self.samples[0]), (8, None, self.samples[1])]
+        self.assertEqual(list(unpack_records(pack_records(records))), records)
+    
+    def test_missing_speed_and_heading_decode_to_none(self):
+        decoded = sample_to_dict(self.samples[1])
+        self.assertIsNone(decoded['speed_kmh'])
+        self.assertIsNone(decoded['heading'])
+        self.assertEqual(sample_to_dict(self.samples[0])['heading'], 359.9)
+
+
+class ParseSampleTests(SimpleTestCase):
+    
+    def sample(self, **fields):
+        return {'vehicle': 'VEH-0001', 'recorded_at': 1_772_000_000, 'lat': 12.9, 'lon': 77.5, 'odometer_km': 100, **fields}
+    
+    def test_heading_just_under_a_full_turn_wraps_to_north(self):
+        _, sample = parse_sample(self.sample(heading=359.99))
+        self.assertEqual(sample[5], 0)
+    
+    def test_vehicle_must_be_an_id(self):
+        for vehicle in [['x'], {'id': 1}, True, 1.5]:
+            with self.assertRaises(ValueError):
+                parse_sample(self.sample(vehicle=vehicle))
+        self.assertEqual(parse_sample(self.sample(vehicle=12))[0], '12')
+
+
+class IngestTests(TestCase):
+    
+    def setUp(self):
+        self.vehicle = make_vehicle(1)
+        self.trip = make_trip(self.vehicle, make_driver(1), status=Trip.Status.DISPATCHED)
+        self.now = int(timezone.now().timestamp())
+    
+    def sample(self, **fields):
+        return {
+            'vehicle': self.vehicle.vehicle_id, 'recorded_at': self.now, 'lat': 12.9, 'lon': 77.5,
+            'odometer_km': 100, **fields
+        }
+    
+    @override_settings(TELEMETRY_BUFFERED=True)
+    def test_bad_samples_are_rejected_and_the_rest_buffered(self):
+        items = [
+            self.sample(),
+            'not a sample',
+            self.sample(vehicle=['x']),
+            self.sample(lat=None),
+            self.sample(vehicle='VEH-MISSING'),
+            self.sample(heading=400),
+            self.sample(recorded_at=self.now + 10, speed_kmh=42.5),
+        ]
+        with mock.patch('telemetry.ingest.get_redis') as get_redis:
+            accepted, rejected = ingest(items)
+        
+        self.assertEqual(accepted, 2)
+        self.assertEqual([rejection['index'] for rejection in rejected], [1, 2, 3, 4, 5])
+        self.assertEqual(rejected[3]['error'], 'Unknown vehicle VEH-MISSING')
+        (_, batch), _ = get_redis().rpush.call_args
+        records = list(unpack_records(batch))
+        self.assertEqual([(vehicle, trip) for vehicle, trip, _ in records], [(self.vehicle.pk, self.trip.pk)] * 2)
+        self.assertEqual(records[1][2][4], 425)
+    
+    @override_settings(TELEMETRY_BUFFER_KEY='test:telemetry')
+    def test_failed_flush_pushes_the_batches_back(self):
+        batch = pack_records([(self.vehicle.pk, None, (self.now, 12_900_000, 77_500_000, 100_000, NO_VALUE, NO_VALUE))])
+        client = mock.Mock()
+        client.pipeline().execute.return_value = [[batch], True]
+        
+        with mock.patch('telemetry.ingest.get_redis', return_value=client), \
+                mock.patch('telemetry.ingest.write_chunks', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                flush_buffer()
+        
+        client.rpush.assert_called_once_with('test:telemetry', batch)
+    
+    @override_settings(TELEMETRY_BUFFERED=False)
+    def test_direct_writes_come_back_on_the_track_endpoints(self):
+        client = api_client()
+        response = client.post('/api/telemetry/', {'samples': [
+            self.sample(recorded_at=self.now - 60, odometer_km=99.5),
+            self.sample(heading=90),
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        
+        track = client.get(f'/api/telemetry/track/?trip={self.trip.trip_id}').json()
+        self.assertEqual(track['count'], 2)
+        self.assertEqual([sample['odometer_km'] for sample in track['samples']], [99.5, 100.0])
+        self.assertEqual(track['samples'][1]['heading'], 90.0)
+        
+        [latest] = client.get('/api/telemetry/latest/').json()
+        self.assertEqual((latest['vehicle'], latest['trip'], latest['odometer_km']), (
+            self.vehicle.vehicle_id, self.trip.trip_id, 100.0
+        ))
+    
+    def test_unusable_vehicle_is_a_rejection_not_a_server_error(self):
+        response = api_client().post('/api/telemetry/', {'samples': [self.sample(vehicle=['x'])]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['rejected'], [{'index': 0, 'error': 'vehicle must be a vehicle ID'}])
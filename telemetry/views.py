@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.mixins import parse_since
+from trips.models import Trip
+from vehicles.models import Vehicle
+from .ingest import ingest
+from .models import TelemetryChunk
+from .store import read_track, latest_positions
+
+
+class TelemetryIngestView(APIView):
+    """Batched GPS position and odometer ingestion"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """Accept ``{"samples": [...]}`` from trucks or telematics gateways"""
+        samples = request.data.get('samples') if isinstance(request.data, dict) else None
+        if not isinstance(samples, list) or not samples:
+            return Response(
+                {'error': 'samples must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(samples) > settings.TELEMETRY_MAX_BATCH:
+            return Response(
+                {'error': f'At most {settings.TELEMETRY_MAX_BATCH} samples per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        accepted, rejected = ingest(samples)
+        if not accepted:
+            return Response(
+                {'error': 'No valid samples', 'rejected': rejected},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(
+            {'accepted': accepted, 'rejected': rejected},
+            status=status.HTTP_202_ACCEPTED if settings.TELEMETRY_BUFFERED else status.HTTP_201_CREATED
+        )
+
+
+class TelemetryTrackView(APIView):
+    """Recorded positions for a vehicle or trip"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get samples for ``?trip=`` or ``?vehicle=`` between ``start`` and ``end``"""
+        start = parse_since(request.query_params.get('start'))
+        end = parse_since(request.query_params.get('end'))
+        trip_id = request.query_params.get('trip')
+        vehicle_id = request.query_params.get('vehicle')
+        
+        if trip_id:
+            trip = Trip.objects.filter(trip_id=trip_id).first()
+            if trip is None:
+                return Response({'error': 'Trip not found'}, status=status.HTTP_404_NOT_FOUND)
+            chunks = TelemetryChunk.objects.filter(trip=trip)
+        elif vehicle_id:
+            vehicle = Vehicle.objects.filter(vehicle_id=vehicle_id).first()
+            if vehicle is None:
+                return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+            chunks = TelemetryChunk.objects.filter(vehicle=vehicle)
+            start = start or timezone.now() - timedelta(hours=24)
+        else:
+            return Response(
+                {'error': 'trip or vehicle parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        samples = read_track(chunks, start, end)
+        return Response({
+            'trip': trip_id,
+            'vehicle': vehicle_id,
+            'count': len(samples),
+            'samples': samples
+        })
+
+
+class LatestPositionsView(APIView):
+    """Most recent position reported by each vehicle"""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get the latest position per vehicle, optionally filtered by ``?status=``"""
+        vehicles = Vehicle.objects.all()
+        if request.query_params.get('status'):
+            vehicles = vehicles.filter(status=request.query_params['status'])
+        
+        return Response([
+            {
+                'vehicle': chunk.vehicle.vehicle_id,
+                'trip': chunk.trip.trip_id if chunk.trip else None,
+                'recorded_at': chunk.end_at,
+                'lat': chunk.end_latitude,
+                'lon': chunk.end_longitude,
+                'odometer_km': chunk.end_odometer_km,
+            }
+            for chunk in latest_positions(vehicles)
+        ])
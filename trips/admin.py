@@ -10,14 +10,14 @@ class TripAdmin(admin.ModelAdmin):
         'trip_id', 'vehicle', 'driver', 'pickup_location',
         'dropoff_location', 'status', 'scheduled_pickup_time', 'created_at'
     ]
-    list_filter = ['status', 'scheduled_pickup_time', 'created_at']
+    list_filter = ['status', 'is_delayed', 'scheduled_pickup_time', 'created_at']
     search_fields = [
         'trip_id', 'pickup_location', 'dropoff_location',
         'vehicle__vehicle_id', 'driver__driver_id'
     ]
     readonly_fields = [
         'created_at', 'updated_at', 'duration_hours',
-        'is_delayed', 'calculated_distance_km'
+        'is_delayed', 'next_deadline', 'calculated_distance_km'
     ]
     
     fieldsets = (
@@ -36,7 +36,8 @@ class TripAdmin(admin.ModelAdmin):
         ('Schedule', {
             'fields': (
                 'scheduled_pickup_time', 'scheduled_delivery_time',
-                'actual_pickup_time', 'actual_delivery_time', 'duration_hours', 'is_delayed'
+                'actual_pickup_time', 'actual_delivery_time', 'duration_hours',
+                'is_delayed', 'next_deadline'
             )
         }),
         ('Metrics', {
@@ -0,0 +1,257 @@
+"""
+Min-cost assignment of draft trips to vehicles and drivers.
+
+Pairing trips with vehicle and driver at once is a three-way assignment, so
+it is solved as two linear assignments with
+``scipy.optimize.linear_sum_assignment`` (a Jonker-Volgenant form of the
+Hungarian algorithm) over numpy cost matrices:
+
+1. trips to available vehicles, costed by the distance from the vehicle's
+   last known position to the pickup and by unused capacity;
+2. the matched trips to available drivers, costed by the driver's recent
+   workload and by safety score weighted towards heavier loads. That cost
+   matrix is rank-one plus a column term, which the Hungarian solver handles
+   badly, so this stage uses an exact sorted dynamic programme instead.
+
+Pairs that break a hard rule (cargo over capacity, or a vehicle already
+booked during the trip's window) are never proposed; assignments whose driver
+turns out to be booked are reported as unassigned.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from scipy.optimize import linear_sum_assignment
+
+from core.geo import haversine_matrix
+from drivers.hours import driving_hours, limits_reached
+from drivers.models import Driver
+from vehicles.models import Vehicle
+from .models import Trip
+from .schedule import BLOCKING_STATUSES, ScheduleIndex, check_bookings
+
+INFEASIBLE = 1e9
+DISTANCE_SCALE_KM = 100
+UNKNOWN_DISTANCE_KM = 250
+
+
+def _float_array(values):
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=float)
+
+
+def _vehicle_costs(trips, vehicles, weights):
+    """Trip x vehicle cost, distance and slack matrices"""
+    cargo = _float_array(trip.cargo_weight_kg for trip in trips)
+    capacity = _float_array(vehicle[2] for vehicle in vehicles)
+    
+    distance = haversine_matrix(
+        _float_array(trip.pickup_latitude for trip in trips),
+        _float_array(trip.pickup_longitude for trip in trips),
+        _float_array(vehicle[3] for vehicle in vehicles),
+        _float_array(vehicle[4] for vehicle in vehicles)
+    )
+    known_distance = ~np.isnan(distance)
+    distance = np.where(known_distance, distance, UNKNOWN_DISTANCE_KM)
+    
+    slack = capacity[None, :] - cargo[:, None]
+    # A zero-capacity vehicle only fits empty trips, at no slack cost
+    slack_share = np.divide(
+        slack, capacity[None, :], out=np.zeros_like(slack), where=capacity[None, :] > 0
+    )
+    cost = (
+        weights['distance'] * distance / DISTANCE_SCALE_KM
+        + weights['slack'] * slack_share
+    )
+    cost[slack < 0] = INFEASIBLE
+    return cost, np.where(known_distance, distance, np.nan), slack
+
+
+def _rule_out_booked_vehicles(cost, trips, vehicles):
+    """Make vehicles with another blocking trip in a trip's window infeasible"""
+    column = {vehicle[0]: col for col, vehicle in enumerate(vehicles)}
+    starts = np.array([trip.scheduled_pickup_time.timestamp() for trip in trips])
+    ends = np.array([trip.scheduled_delivery_time.timestamp() for trip in trips])
+    
+    bookings = list(
+        Trip.objects.filter(
+            vehicle_id__in=list(column),
+            status__in=BLOCKING_STATUSES,
+            scheduled_delivery_time__gt=min(trip.scheduled_pickup_time for trip in trips)
+        ).exclude(pk__in=[trip.pk for trip in trips]).values_list(
+            'vehicle_id', 'scheduled_pickup_time', 'scheduled_delivery_time'
+        )
+    )
+    if not bookings:
+        return
+    
+    booked_cols = np.array([column[vehicle_id] for vehicle_id, _, _ in bookings])
+    booked_starts = np.array([start.timestamp() for _, start, _ in bookings])
+    booked_ends = np.array([end.timestamp() for _, _, end in bookings])
+    rows, hits = np.nonzero(
+        (starts[:, None] < booked_ends[None, :]) & (ends[:, None] > booked_starts[None, :])
+    )
+    cost[rows, booked_cols[hits]] = INFEASIBLE
+
+
+def _pair_drivers(trips, drivers, weights):
+    """Cheapest trip -> driver pairing as ``[(trip_index, driver_index)]``.
+    
+    Pairing trip i with driver j costs ``workload_j + load_i * risk_j``. For
+    any chosen set of drivers the cheapest pairing gives the heaviest loads to
+    the safest drivers, so with both sides sorted a dynamic programme over
+    (trips placed, drivers considered) picks the optimal set exactly.
+    """
+    recent_trips = np.array([driver[3] for driver in drivers], dtype=float)
+    workload = recent_trips / max(recent_trips.max(initial=0), 1)
+    risk = 1 - np.array([driver[2] for driver in drivers], dtype=float) / 100
+    cargo = _float_array(trip.cargo_weight_kg for trip in trips)
+    load_share = cargo / max(cargo.max(initial=0), 1)
+    
+    trip_order = np.argsort(-load_share, kind='stable')
+    driver_order = np.argsort(risk, kind='stable')
+    load = weights['safety'] * load_share[trip_order]
+    column = weights['workload'] * workload[driver_order]
+    risk = risk[driver_order]
+    
+    # best[i, j]: cheapest cost of placing the i heaviest trips on drivers
+    # drawn from the j safest
+    placed, considered = len(load), len(column)
+    best = np.full((placed + 1, considered + 1), np.inf)
+    best[0, :] = 0
+    for i in range(1, placed + 1):
+        best[i, 1:] = np.minimum.accumulate(best[i - 1, :-1] + column + load[i - 1] * risk)
+    
+    pairs = []
+    j = considered
+    for i in range(placed, 0, -1):
+        while best[i, j] == best[i, j - 1]:
+            j -= 1
+        pairs.append((trip_order[i - 1], driver_order[j - 1]))
+        j -= 1
+    return pairs
+
+
+def propose_assignments(trips, weights=None):
+    """Propose a vehicle and driver for each draft trip in ``trips``.
+    
+    Returns ``(assignments, unassigned)``; each assignment names the trip,
+    vehicle and driver with the figures that went into its cost.
+    """
+    weights = {**settings.AUTO_ASSIGN_WEIGHTS, **(weights or {})}
+    trips = list(trips)
+    
+    vehicles = list(
+        Vehicle.objects.filter(status=Vehicle.Status.AVAILABLE).order_by('pk').values_list(
+            'pk', 'vehicle_id', 'max_capacity_kg', 'position__latitude', 'position__longitude'
+        )
+    )
+    since = timezone.now() - timedelta(days=settings.AUTO_ASSIGN_WORKLOAD_DAYS)
+    drivers = list(
+        Driver.objects.filter(
+            status__in=[Driver.Status.ON_DUTY, Driver.Status.OFF_DUTY]
+        ).order_by('pk').annotate(
+            recent_trips=Count('trips', filter=Q(
+                trips__status=Trip.Status.COMPLETED,
+                trips__actual_delivery_time__gte=since
+            ))
+        ).values_list('pk', 'driver_id', 'safety_score', 'recent_trips')
+    )
+    hours = driving_hours(driver[0] for driver in drivers)
+    drivers = [driver for driver in drivers if not limits_reached(hours[driver[0]])]
+    
+    if not trips or not vehicles:
+        return [], [{'trip_id': trip.trip_id, 'reason': 'No available vehicle'} for trip in trips]
+    
+    # Stage 1: trips to vehicles
+    cost, distance, slack = _vehicle_costs(trips, vehicles, weights)
+    _rule_out_booked_vehicles(cost, trips, vehicles)
+    rows, cols = linear_sum_assignment(cost)
+    feasible = cost[rows, cols] < INFEASIBLE
+    matched = {row: col for row, col in zip(rows[feasible], cols[feasible])}
+    
+    # Stage 2: matched trips to drivers, earliest pickups first when
+    # drivers run short
+    matched_rows = sorted(matched)[:len(drivers)]
+    drivers_for = {}
+    if matched_rows:
+        for row, col in _pair_drivers([trips[row] for row in matched_rows], drivers, weights):
+            drivers_for[matched_rows[row]] = col
+    
+    driver_schedule = ScheduleIndex.load(
+        drivers=[drivers[col][0] for col in drivers_for.values()],
+        since=min(trip.scheduled_pickup_time for trip in trips),
+        exclude=[trip.pk for trip in trips]
+    )
+    
+    assignments = []
+    unassigned = []
+    fits_any = (slack >= 0).any(axis=1)
+    free_any = (cost < INFEASIBLE).any(axis=1)
+    for row, trip in enumerate(trips):
+        if row not in matched:
+            if not fits_any[row]:
+                reason = 'No available vehicle with enough capacity'
+            elif not free_any[row]:
+                reason = 'Every vehicle that fits is booked in this window'
+            else:
+                reason = 'No available vehicle left'
+            unassigned.append({'trip_id': trip.trip_id, 'reason': reason})
+            continue
+        if row not in drivers_for:
+            unassigned.append({'trip_id': trip.trip_id, 'reason': 'No available driver left'})
+            continue
+        
+        col = matched[row]
+        vehicle = vehicles[col]
+        driver = drivers[drivers_for[row]]
+        if driver_schedule.conflicts(
+            None, driver[0], trip.scheduled_pickup_time, trip.scheduled_delivery_time
+        ):
+            unassigned.append({'trip_id': trip.trip_id, 'reason': f'Driver {driver[1]} is booked in this window'})
+            continue
+        assignments.append({
+            'trip_id': trip.trip_id,
+            'trip': trip.pk,
+            'vehicle_id': vehicle[1],
+            'vehicle': vehicle[0],
+            'driver_id': driver[1],
+            'driver': driver[0],
+            'distance_km': None if np.isnan(distance[row, col]) else round(float(distance[row, col]), 2),
+            'capacity_slack_kg': round(float(slack[row, col]), 2),
+            'driver_recent_trips': driver[3],
+        })
+    
+    return assignments, unassigned
+
+
+def apply_assignments(assignments):
+    """Write proposed vehicles and drivers to trips that are still drafts.
+    
+    Runs inside the caller's transaction; assignments that would double-book
+    a vehicle or driver by now are skipped.
+    """
+    by_trip = {assignment['trip']: assignment for assignment in assignments}
+    trips = list(
+        Trip.objects.select_for_update().filter(pk__in=by_trip, status=Trip.Status.DRAFT)
+    )
+    if not trips:
+        return 0
+    
+    conflicts = check_bookings(
+        [
+            (trip.trip_id, by_trip[trip.pk]['vehicle'], by_trip[trip.pk]['driver'],
+             trip.scheduled_pickup_time, trip.scheduled_delivery_time)
+            for trip in trips
+        ],
+        exclude=list(by_trip)
+    )
+    trips = [trip for trip, clash in zip(trips, conflicts) if not clash]
+    now = timezone.now()
+    for trip in trips:
+        trip.vehicle_id = by_trip[trip.pk]['vehicle']
+        trip.driver_id = by_trip[trip.pk]['driver']
+        trip.updated_at = now
+    Trip.objects.bulk_update(trips, ['vehicle', 'driver', 'updated_at'])
+    return len(trips)
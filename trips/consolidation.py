@@ -0,0 +1,189 @@
+"""
+Load consolidation planning for draft trips.
+
+Drafts on the same lane (pickup and dropoff location) whose pickups fall
+within a window of each other are grouped, and each group's cargo is
+bin-packed into available vehicles with first-fit decreasing: heaviest trip
+first, into the first open load it fits, opening the largest free vehicle
+when none does. Each load is then moved to the smallest free vehicle that
+still carries it, which keeps large vehicles for the groups that need them.
+
+A vehicle planned for a group is booked for the group's span, so it can
+carry another group's load only when the two spans do not overlap. Vehicles
+already booked by other trips during a group's span are skipped. The plan is
+advisory and is not written back.
+"""
+import bisect
+from collections import defaultdict
+from datetime import timedelta
+
+from vehicles.models import Vehicle
+from .schedule import ScheduleIndex
+
+
+class _VehiclePool:
+    """Free vehicles ordered by capacity.
+    
+    Vehicles handed out while a group is packed stay taken until the group
+    is done; ``book`` then records the group's span in the schedule and
+    frees the vehicle for groups that do not overlap it.
+    """
+    
+    def __init__(self, vehicles, schedule):
+        vehicles = sorted(vehicles, key=lambda vehicle: (vehicle[2], vehicle[0]))
+        self.capacities = [float(vehicle[2]) for vehicle in vehicles]
+        self.vehicles = vehicles
+        self.schedule = schedule
+        self.taken = set()
+    
+    def _is_free(self, position, span):
+        vehicle_pk = self.vehicles[position][0]
+        return vehicle_pk not in self.taken and not self.schedule.conflicts(vehicle_pk, None, *span)
+    
+    def take_largest(self, span):
+        for position in range(len(self.vehicles) - 1, -1, -1):
+            if self._is_free(position, span):
+                return self._take(position)
+        return None
+    
+    def take_smallest(self, load, span):
+        position = bisect.bisect_left(self.capacities, load)
+        for position in range(position, len(self.vehicles)):
+            if self._is_free(position, span):
+                return self._take(position)
+        return None
+    
+    def give_back(self, vehicle):
+        self.taken.discard(vehicle[0])
+    
+    def book(self, vehicle, span, trip_id):
+        """Hold ``vehicle`` for ``span`` under ``trip_id`` and return it to the pool"""
+        self.schedule.trees['vehicle', vehicle[0]].insert(*span, trip_id)
+        self.taken.discard(vehicle[0])
+    
+    def _take(self, position):
+        vehicle = self.vehicles[position]
+        self.taken.add(vehicle[0])
+        return vehicle
+
+
+def _lane(trip):
+    return trip[1].strip().casefold(), trip[2].strip().casefold()
+
+
+def _group(trips, window):
+    """Split drafts into lane groups whose pickups lie within ``window`` of the first"""
+    by_lane = defaultdict(list)
+    for trip in trips:
+        by_lane[_lane(trip)].append(trip)
+    
+    groups = []
+    for lane_trips in by_lane.values():
+        lane_trips.sort(key=lambda trip: trip[4])
+        group = [lane_trips[0]]
+        for trip in lane_trips[1:]:
+            if trip[4] - group[0][4] > window:
+                groups.append(group)
+                group = []
+            group.append(trip)
+        groups.append(group)
+    groups.sort(key=lambda group: group[0][4])
+    return groups
+
+
+def _pack(group, pool):
+    """First-fit decreasing into vehicles from ``pool``; returns ``(loads, unplaced)``"""
+    span = (min(trip[4] for trip in group), max(trip[5] for trip in group))
+    loads = []
+    unplaced = []
+    for trip in sorted(group, key=lambda trip: -trip[3]):
+        weight = float(trip[3])
+        for load in loads:
+            if load['free_kg'] >= weight:
+                break
+        else:
+            vehicle = pool.take_largest(span)
+            if vehicle is None or float(vehicle[2]) < weight:
+                if vehicle is not None:
+                    pool.give_back(vehicle)
+                reason = 'No free vehicle left' if vehicle is None else 'Heavier than any free vehicle'
+                unplaced.append({'trip_id': trip[0], 'reason': reason})
+                continue
+            load = {'vehicle': vehicle, 'free_kg': float(vehicle[2]), 'load_kg': 0.0, 'trips': []}
+            loads.append(load)
+        load['free_kg'] -= weight
+        load['load_kg'] += weight
+        load['trips'].append(trip[0])
+    
+    for load in sorted(loads, key=lambda load: -load['load_kg']):
+        pool.give_back(load['vehicle'])
+        load['vehicle'] = pool.take_smallest(load['load_kg'], span)
+    for load in loads:
+        pool.book(load['vehicle'], span, load['trips'][0])
+    return span, loads, unplaced
+
+
+def plan_consolidation(trips, window_hours):
+    """Plan consolidated loads for the draft ``trips`` queryset"""
+    trips = list(
+        trips.order_by().values_list(
+            'trip_id', 'pickup_location', 'dropoff_location', 'cargo_weight_kg',
+            'scheduled_pickup_time', 'scheduled_delivery_time', 'pk'
+        )
+    )
+    if not trips:
+        return {'groups': [], 'unplaced': [], 'summary': _summary(0, [])}
+    
+    # A vehicle with no capacity would only ever take empty trips
+    vehicles = list(
+        Vehicle.objects.filter(status=Vehicle.Status.AVAILABLE, max_capacity_kg__gt=0).values_list(
+            'pk', 'vehicle_id', 'max_capacity_kg'
+        )
+    )
+    schedule = ScheduleIndex.load(
+        vehicles=[vehicle[0] for vehicle in vehicles],
+        since=min(trip[4] for trip in trips),
+        exclude=[trip[6] for trip in trips]
+    )
+    pool = _VehiclePool(vehicles, schedule)
+    
+    groups = []
+    unplaced = []
+    for group in _group(trips, timedelta(hours=window_hours)):
+        span, loads, group_unplaced = _pack(group, pool)
+        unplaced.extend(group_unplaced)
+        if not loads:
+            continue
+        groups.append({
+            'pickup_location': group[0][1],
+            'dropoff_location': group[0][2],
+            'window_start': span[0],
+            'window_end': span[1],
+            'loads': [
+                {
+                    'vehicle_id': load['vehicle'][1],
+                    'vehicle': load['vehicle'][0],
+                    'capacity_kg': float(load['vehicle'][2]),
+                    'load_kg': round(load['load_kg'], 2),
+                    'utilization': round(load['load_kg'] / float(load['vehicle'][2]), 4),
+                    'trips': load['trips'],
+                }
+                for load in loads
+            ],
+        })
+    
+    return {
+        'groups': groups,
+        'unplaced': unplaced,
+        'summary': _summary(len(trips) - len(unplaced), [load for group in groups for load in group['loads']]),
+    }
+
+
+def _summary(placed, loads):
+    capacity = sum(load['capacity_kg'] for load in loads)
+    return {
+        'trips_placed': placed,
+        'vehicles_used': len(loads),
+        'vehicles_saved': placed - len(loads),
+        'utilization': round(sum(load['load_kg'] for load in loads) / capacity, 4) if capacity else 0,
+    }
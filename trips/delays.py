@@ -0,0 +1,104 @@
+"""
+Delay tracking for active trips.
+
+Each active trip stores the deadline it has to meet next in
+``next_deadline`` (see ``Trip.refresh_delay``). ``DelayTracker`` keeps the
+upcoming deadlines in a heap and sleeps until the earliest one instead of
+re-evaluating every trip, and ``mark_overdue`` flags the trips whose deadline
+has passed and records a ``trip.delayed`` event for each.
+"""
+import heapq
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.stats import bump_data_version
+from events.bus import record_events
+from events.domain import TripDelayed
+from .models import Trip
+
+
+def mark_overdue(now=None, trip_ids=None):
+    """Flag trips whose ``next_deadline`` has passed, optionally limited to
+    ``trip_ids``. Returns the number of trips marked delayed.
+    """
+    now = now or timezone.now()
+    
+    with transaction.atomic():
+        overdue = Trip.objects.select_for_update(skip_locked=True).filter(
+            is_delayed=False,
+            next_deadline__lte=now
+        )
+        if trip_ids is not None:
+            overdue = overdue.filter(pk__in=trip_ids)
+        trips = list(overdue.only('trip_id', 'status', 'actual_pickup_time', 'next_deadline'))
+        if not trips:
+            return 0
+        
+        Trip.objects.filter(pk__in=[trip.pk for trip in trips]).update(
+            is_delayed=True,
+            next_deadline=None,
+            updated_at=now
+        )
+        record_events(
+            TripDelayed(
+                id=trip.pk,
+                natural_id=trip.trip_id,
+                status=trip.status,
+                deadline='pickup' if trip.actual_pickup_time is None else 'delivery',
+                deadline_at=trip.next_deadline.isoformat()
+            )
+            for trip in trips
+        )
+    
+    bump_data_version(Trip)
+    return len(trips)
+
+
+class DelayTracker:
+    """Heap of upcoming trip deadlines, reloaded from the partial
+    ``next_deadline`` index every ``refresh_seconds``.
+    
+    Entries can go stale when a trip is completed, cancelled or rescheduled
+    between reloads; ``mark_overdue`` re-checks each trip, so stale entries
+    are simply dropped.
+    """
+    
+    def __init__(self, refresh_seconds=30):
+        self.refresh_seconds = refresh_seconds
+        self._heap = []
+        self._loaded_until = None
+    
+    def reload(self, now):
+        """Sweep anything already overdue and load the deadlines due before the next reload"""
+        marked = mark_overdue(now)
+        self._loaded_until = now + timedelta(seconds=self.refresh_seconds)
+        self._heap = list(
+            Trip.objects.filter(
+                is_delayed=False,
+                next_deadline__gt=now,
+                next_deadline__lte=self._loaded_until
+            ).values_list('next_deadline', 'pk')
+        )
+        heapq.heapify(self._heap)
+        return marked
+    
+    def tick(self, now=None):
+        """Mark trips whose deadlines have passed.
+        
+        Returns ``(marked, seconds_to_sleep)``.
+        """
+        now = now or timezone.now()
+        if self._loaded_until is None or now >= self._loaded_until:
+            marked = self.reload(now)
+        else:
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+            marked = mark_overdue(now, due) if due else 0
+        
+        wake_at = self._loaded_until
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+        return marked, max((wake_at - now).total_seconds(), 0)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from trips.delays import DelayTracker, mark_overdue
+
+
+class Command(BaseCommand):
+    help = 'Mark active trips delayed as their pickup and delivery deadlines pass'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Mark overdue trips once and exit')
+        parser.add_argument('--refresh', type=float, default=30, help='Seconds between reloads of upcoming deadlines')
+    
+    def handle(self, *args, **options):
+        if options['once']:
+            marked = mark_overdue()
+            self.stdout.write(self.style.SUCCESS(f'Marked {marked} trips delayed'))
+            return
+        
+        self.stdout.write('Tracking trip deadlines, press Ctrl+C to stop')
+        tracker = DelayTracker(options['refresh'])
+        while True:
+            marked, sleep_seconds = tracker.tick()
+            if marked:
+                self.stdout.write(f'Marked {marked} trips delayed')
+            time.sleep(sleep_seconds)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0003_driver_drivers_updated_05c11f_idx'),
+        ('trips', '0002_alter_trip_trip_id'),
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['updated_at'], name='trips_updated_540a71_idx'),
+        ),
+    ]
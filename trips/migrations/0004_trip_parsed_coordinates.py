@@ -0,0 +1,45 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:17
+
+from django.db import migrations, models
+
+from core.geo import parse_coordinates
+
+
+def parse_existing_coordinates(apps, schema_editor):
+    Trip = apps.get_model('trips', 'Trip')
+    trips = Trip.objects.exclude(pickup_coordinates='', dropoff_coordinates='')
+    for trip in trips.iterator():
+        trip.pickup_latitude, trip.pickup_longitude = parse_coordinates(trip.pickup_coordinates) or (None, None)
+        trip.dropoff_latitude, trip.dropoff_longitude = parse_coordinates(trip.dropoff_coordinates) or (None, None)
+        trip.save(update_fields=['pickup_latitude', 'pickup_longitude', 'dropoff_latitude', 'dropoff_longitude'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_trip_trips_updated_540a71_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='dropoff_latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='dropoff_longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='pickup_latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='pickup_longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(parse_existing_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Q
+from django.utils import timezone
+
+ACTIVE = ['DISPATCHED', 'IN_PROGRESS']
+
+
+def backfill_delays(apps, schema_editor):
+    """Mirror Trip.refresh_delay for existing rows"""
+    Trip = apps.get_model('trips', 'Trip')
+    now = timezone.now()
+    
+    Trip.objects.filter(
+        status='COMPLETED',
+        actual_delivery_time__gt=F('scheduled_delivery_time')
+    ).update(is_delayed=True)
+    Trip.objects.filter(status__in=ACTIVE, actual_pickup_time__isnull=True).update(
+        next_deadline=F('scheduled_pickup_time')
+    )
+    Trip.objects.filter(status__in=ACTIVE, actual_pickup_time__isnull=False).update(
+        next_deadline=F('scheduled_delivery_time')
+    )
+    Trip.objects.filter(status__in=ACTIVE).filter(
+        Q(actual_pickup_time__gt=F('scheduled_pickup_time')) | Q(next_deadline__lte=now)
+    ).update(is_delayed=True, next_deadline=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0003_driver_drivers_updated_05c11f_idx'),
+        ('trips', '0004_trip_parsed_coordinates'),
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='is_delayed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='next_deadline',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Pickup or delivery deadline the delay tracker is waiting on', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(condition=models.Q(('is_delayed', False), ('next_deadline__isnull', False)), fields=['next_deadline'], name='trips_pending_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(condition=models.Q(('is_delayed', True)), fields=['status', 'scheduled_delivery_time'], name='trips_delayed_idx'),
+        ),
+        migrations.RunPython(backfill_delays, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,15 @@
 from django.db import models
+from django.db.models import Q
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from core.geo import parse_coordinates
+
+
+def _aware(value):
+    # Trips built in scripts may carry naive datetimes; compare them as local time
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
 
 
 class Trip(models.Model):
@@ -34,10 +41,14 @@ class Trip(models.Model):
     pickup_location = models.CharField(max_length=255)
     pickup_address = models.TextField()
     pickup_coordinates = models.CharField(max_length=100, blank=True)
+    pickup_latitude = models.FloatField(null=True, blank=True, editable=False)
+    pickup_longitude = models.FloatField(null=True, blank=True, editable=False)
     
     dropoff_location = models.CharField(max_length=255)
     dropoff_address = models.TextField()
     dropoff_coordinates = models.CharField(max_length=100, blank=True)
+    dropoff_latitude = models.FloatField(null=True, blank=True, editable=False)
+    dropoff_longitude = models.FloatField(null=True, blank=True, editable=False)
     
     # Cargo Details
     cargo_description = models.TextField()
@@ -101,6 +112,15 @@ class Trip(models.Model):
         db_index=True
     )
     
+    # Delay tracking (kept current by save() and the delay tracker)
+    is_delayed = models.BooleanField(default=False, editable=False)
+    next_deadline = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Pickup or delivery deadline the delay tracker is waiting on"
+    )
+    
     # Additional Information
     notes = models.TextField(blank=True)
     cancellation_reason = models.TextField(blank=True)
@@ -123,6 +143,17 @@ class Trip(models.Model):
             models.Index(fields=['vehicle', 'status']),
             models.Index(fields=['driver', 'status']),
             models.Index(fields=['scheduled_pickup_time']),
+            models.Index(fields=['updated_at']),
+            models.Index(
+                fields=['next_deadline'],
+                name='trips_pending_deadline_idx',
+                condition=Q(is_delayed=False, next_deadline__isnull=False)
+            ),
+            models.Index(
+                fields=['status', 'scheduled_delivery_time'],
+                name='trips_delayed_idx',
+                condition=Q(is_delayed=True)
+            ),
         ]
     
     def __str__(self):
@@ -167,6 +198,9 @@ class Trip(models.Model):
             else:
                 new_number = 1
             self.trip_id = f'TRP-{new_number:06d}'
+        self.pickup_latitude, self.pickup_longitude = parse_coordinates(self.pickup_coordinates) or (None, None)
+        self.dropoff_latitude, self.dropoff_longitude = parse_coordinates(self.dropoff_coordinates) or (None, None)
+        self.refresh_delay()
         self.full_clean()
         super().save(*args, **kwargs)
     
@@ -179,13 +213,41 @@ class Trip(models.Model):
         return None
     
     @property
-    def is_delayed(self):
-        """Check if trip is delayed"""
-        if self.status == self.Status.COMPLETED and self.actual_delivery_time:
-            return self.actual_delivery_time > self.scheduled_delivery_time
-        elif self.status == self.Status.DISPATCHED:
-            return timezone.now() > self.scheduled_pickup_time
-        return False
+    def pending_deadline(self):
+        """Name and time of the deadline an active trip has to meet next"""
+        if self.status not in [self.Status.DISPATCHED, self.Status.IN_PROGRESS]:
+            return None, None
+        if self.actual_pickup_time is None:
+            return 'pickup', self.scheduled_pickup_time
+        return 'delivery', self.scheduled_delivery_time
+    
+    def refresh_delay(self, now=None):
+        """Recompute ``is_delayed`` and ``next_deadline``.
+        
+        Active trips are delayed once picked up late or past their pending
+        deadline; completed trips when delivered late. Deadlines that pass
+        later are picked up by the delay tracker through ``next_deadline``.
+        """
+        now = _aware(now or timezone.now())
+        self.next_deadline = None
+        
+        if self.status == self.Status.COMPLETED:
+            self.is_delayed = bool(
+                self.actual_delivery_time
+                and _aware(self.actual_delivery_time) > _aware(self.scheduled_delivery_time)
+            )
+        elif self.status in [self.Status.DISPATCHED, self.Status.IN_PROGRESS]:
+            _, deadline = self.pending_deadline
+            deadline = _aware(deadline)
+            picked_up_late = bool(
+                self.actual_pickup_time
+                and _aware(self.actual_pickup_time) > _aware(self.scheduled_pickup_time)
+            )
+            self.is_delayed = picked_up_late or deadline <= now
+            if not self.is_delayed:
+                self.next_deadline = deadline
+        else:
+            self.is_delayed = False
     
     @property
     def calculated_distance_km(self):
@@ -1,8 +1,43 @@
+from decimal import Decimal
 from rest_framework import serializers
 from django.utils import timezone
+from django.db import transaction
 from .models import Trip
+from .schedule import check_bookings, conflict_errors
 from vehicles.serializers import VehicleSummarySerializer
 from drivers.serializers import DriverSummarySerializer
+from drivers.hours import driving_hours, limit_error
+from core.geo import parse_coordinates
+from core.distance import lane_distances
+
+
+def validate_coordinates(value):
+    """Reject coordinates that are not 'latitude, longitude'"""
+    if value and parse_coordinates(value) is None:
+        raise serializers.ValidationError("Coordinates must be 'latitude, longitude' in decimal degrees")
+
+
+COORDINATE_KWARGS = {
+    'pickup_coordinates': {'validators': [validate_coordinates]},
+    'dropoff_coordinates': {'validators': [validate_coordinates]},
+}
+
+
+def fill_estimated_distances(rows):
+    """Set a missing ``estimated_distance_km`` from the trip's coordinates"""
+    pending = []
+    for row in rows:
+        if row.get('estimated_distance_km') is not None:
+            continue
+        pickup = parse_coordinates(row.get('pickup_coordinates'))
+        dropoff = parse_coordinates(row.get('dropoff_coordinates'))
+        if pickup and dropoff:
+            pending.append((row, (pickup, dropoff)))
+    
+    if pending:
+        distances = lane_distances([lane for _, lane in pending])
+        for (row, _), distance in zip(pending, distances):
+            row['estimated_distance_km'] = Decimal(f'{distance:.2f}')
 
 
 class TripSerializer(serializers.ModelSerializer):
@@ -11,7 +46,6 @@ class TripSerializer(serializers.ModelSerializer):
     vehicle_details = VehicleSummarySerializer(source='vehicle', read_only=True)
     driver_details = DriverSummarySerializer(source='driver', read_only=True)
     duration_hours = serializers.ReadOnlyField()
-    is_delayed = serializers.ReadOnlyField()
     calculated_distance_km = serializers.ReadOnlyField()
     created_by_name = serializers.CharField(
         source='created_by.get_full_name',
@@ -23,13 +57,15 @@ class TripSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'trip_id', 'vehicle', 'vehicle_details', 'driver', 'driver_details',
             'pickup_location', 'pickup_address', 'pickup_coordinates',
+            'pickup_latitude', 'pickup_longitude',
             'dropoff_location', 'dropoff_address', 'dropoff_coordinates',
+            'dropoff_latitude', 'dropoff_longitude',
             'cargo_description', 'cargo_weight_kg', 'cargo_value',
             'scheduled_pickup_time', 'scheduled_delivery_time',
             'actual_pickup_time', 'actual_delivery_time',
             'estimated_distance_km', 'actual_distance_km', 'calculated_distance_km',
             'start_odometer_km', 'end_odometer_km',
-            'status', 'duration_hours', 'is_delayed', 'notes',
+            'status', 'duration_hours', 'is_delayed', 'next_deadline', 'notes',
             'cancellation_reason', 'created_by', 'created_by_name',
             'created_at', 'updated_at'
         ]
@@ -50,6 +86,7 @@ class TripCreateSerializer(serializers.ModelSerializer):
             'estimated_distance_km', 'notes'
         ]
         read_only_fields = ['trip_id']
+        extra_kwargs = COORDINATE_KWARGS
     
     def validate(self, data):
         """Validate trip creation business rules"""
@@ -79,6 +116,11 @@ class TripCreateSerializer(serializers.ModelSerializer):
                 'driver': f'Driver {driver.driver_id} is not available (Status: {driver.get_status_display()})'
             })
         
+        # Validate driver hours of service
+        hours_error = limit_error(driver, self._driving_hours(driver))
+        if hours_error:
+            raise serializers.ValidationError({'driver': hours_error})
+        
         # Validate schedule times
         scheduled_pickup = data.get('scheduled_pickup_time')
         scheduled_delivery = data.get('scheduled_delivery_time')
@@ -94,6 +136,34 @@ class TripCreateSerializer(serializers.ModelSerializer):
             })
         
         return data
+    
+    def _driving_hours(self, driver):
+        # Bulk creation shares the context, so each driver is read once per batch
+        cache = self.context.setdefault('driving_hours', {})
+        if driver.pk not in cache:
+            cache.update(driving_hours([driver.pk]))
+        return cache[driver.pk]
+    
+    def create(self, validated_data):
+        """Create the trip unless it double-books its vehicle or driver.
+        
+        Callers that set ``schedule_checked`` in the context (bulk creation)
+        have already checked the whole batch inside their transaction.
+        A missing estimated distance is filled in from the coordinates.
+        """
+        fill_estimated_distances([validated_data])
+        with transaction.atomic():
+            if not self.context.get('schedule_checked'):
+                conflicts = check_bookings([(
+                    'new trip',
+                    validated_data['vehicle'].pk,
+                    validated_data['driver'].pk,
+                    validated_data['scheduled_pickup_time'],
+                    validated_data['scheduled_delivery_time']
+                )])[0]
+                if conflicts:
+                    raise serializers.ValidationError(conflict_errors(conflicts))
+            return super().create(validated_data)
 
 
 class TripUpdateSerializer(serializers.ModelSerializer):
@@ -108,6 +178,7 @@ class TripUpdateSerializer(serializers.ModelSerializer):
             'scheduled_pickup_time', 'scheduled_delivery_time',
             'estimated_distance_km', 'notes'
         ]
+        extra_kwargs = COORDINATE_KWARGS
     
     def validate(self, data):
         """Only allow updates for draft trips"""
@@ -116,6 +187,35 @@ class TripUpdateSerializer(serializers.ModelSerializer):
                 "Can only update trips in DRAFT status"
             )
         return data
+    
+    def update(self, instance, validated_data):
+        """Reject rescheduling that double-books the vehicle or driver and
+        re-estimate the distance when the coordinates change
+        """
+        if (
+            {'pickup_coordinates', 'dropoff_coordinates'} & validated_data.keys()
+            and 'estimated_distance_km' not in validated_data
+        ):
+            lane = {
+                field: validated_data.get(field, getattr(instance, field))
+                for field in ('pickup_coordinates', 'dropoff_coordinates')
+            }
+            fill_estimated_distances([lane])
+            if 'estimated_distance_km' in lane:
+                validated_data['estimated_distance_km'] = lane['estimated_distance_km']
+        
+        start = validated_data.get('scheduled_pickup_time', instance.scheduled_pickup_time)
+        end = validated_data.get('scheduled_delivery_time', instance.scheduled_delivery_time)
+        
+        with transaction.atomic():
+            if (start, end) != (instance.scheduled_pickup_time, instance.scheduled_delivery_time):
+                conflicts = check_bookings(
+                    [(instance.trip_id, instance.vehicle_id, instance.driver_id, start, end)],
+                    exclude=[instance.pk]
+                )[0]
+                if conflicts:
+                    raise serializers.ValidationError(conflict_errors(conflicts))
+            return super().update(instance, validated_data)
 
 
 class TripDispatchSerializer(serializers.Serializer):
@@ -0,0 +1,175 @@
+import random
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.factories import api_client, make_driver, make_trip, make_vehicle
+from .assignment import propose_assignments
+from .consolidation import plan_consolidation
+from .models import Trip
+from .schedule import IntervalTree, check_bookings
+
+
+class LegacyCoordinatesTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+    
+    def test_trip_with_free_text_coordinates_can_be_dispatched(self):
+        trip = make_trip(make_vehicle(1), make_driver(1))
+        Trip.objects.filter(pk=trip.pk).update(pickup_coordinates='Gate 4, north yard, dock B')
+        
+        response = self.client.post(f'/api/trips/{trip.pk}/dispatch/', {'start_odometer_km': 100}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        trip.refresh_from_db()
+        self.assertEqual(trip.status, Trip.Status.DISPATCHED)
+        self.assertIsNone(trip.pickup_latitude)
+    
+    def test_api_still_rejects_malformed_coordinates(self):
+        vehicle, driver = make_vehicle(1), make_driver(1)
+        start = timezone.now() + timedelta(days=1)
+        response = self.client.post('/api/trips/', {
+            'vehicle': vehicle.pk, 'driver': driver.pk, 'pickup_location': 'A', 'pickup_address': 'a',
+            'pickup_coordinates': 'north yard', 'dropoff_location': 'B', 'dropoff_address': 'b',
+            'cargo_description': 'Parcels', 'cargo_weight_kg': 100,
+            'scheduled_pickup_time': start, 'scheduled_delivery_time': start + timedelta(hours=2),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pickup_coordinates', response.json())
+
+
+class RefreshDelayTests(TestCase):
+    
+    def test_naive_schedule_is_compared_as_local_time(self):
+        start = datetime.now() - timedelta(hours=5)
+        trip = make_trip(
+            make_vehicle(1), make_driver(1), start=start, hours=6,
+            status=Trip.Status.DISPATCHED
+        )
+        self.assertTrue(trip.is_delayed)
+        
+        trip.scheduled_pickup_time = datetime.now() + timedelta(hours=1)
+        trip.scheduled_delivery_time = datetime.now() + timedelta(hours=3)
+        trip.actual_pickup_time = None
+        trip.save()
+        self.assertFalse(trip.is_delayed)
+        self.assertIsNotNone(trip.next_deadline)
+
+
+class AutoAssignTests(TestCase):
+    
+    def setUp(self):
+        self.empty_van = make_vehicle(1, capacity=0)
+        self.truck = make_vehicle(2, capacity=5000)
+        self.drivers = [make_driver(1), make_driver(2)]
+        start = timezone.now() + timedelta(days=1)
+        self.empty_run = make_trip(self.truck, self.drivers[0], start=start, weight=0)
+        self.loaded_run = make_trip(self.truck, self.drivers[1], start=start, weight=1000)
+    
+    def test_zero_capacity_vehicle_does_not_break_the_solver(self):
+        assignments, unassigned = propose_assignments([self.empty_run, self.loaded_run])
+        
+        self.assertEqual(unassigned, [])
+        vehicle_for = {assignment['trip']: assignment['vehicle'] for assignment in assignments}
+        self.assertEqual(vehicle_for, {self.empty_run.pk: self.empty_van.pk, self.loaded_run.pk: self.truck.pk})
+    
+    def test_boolean_weights_are_rejected(self):
+        response = api_client().post('/api/trips/auto-assign/', {'weights': {'distance': True}}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class IntervalTreeTests(SimpleTestCase):
+    
+    def test_overlaps_match_brute_force(self):
+        rng = random.Random(40)
+        tree = IntervalTree()
+        intervals = []
+        for key in range(500):
+            start = rng.randrange(0, 10000)
+            end = start + rng.randrange(1, 300)
+            tree.insert(start, end, key)
+            intervals.append((start, end, key))
+        
+        for _ in range(300):
+            start = rng.randrange(-100, 10100)
+            end = start + rng.randrange(1, 500)
+            expected = sorted(key for s, e, key in intervals if s < end and e > start)
+            self.assertEqual(sorted(tree.overlaps(start, end)), expected)
+    
+    def test_back_to_back_windows_do_not_overlap(self):
+        tree = IntervalTree()
+        tree.insert(10, 20, 'a')
+        self.assertEqual(tree.overlaps(20, 30), [])
+        self.assertEqual(tree.overlaps(0, 10), [])
+        self.assertEqual(tree.overlaps(19, 21), ['a'])
+
+
+class CheckBookingsTests(TestCase):
+    
+    def test_conflicts_with_stored_and_earlier_bookings(self):
+        vehicle, other_vehicle = make_vehicle(1), make_vehicle(2)
+        driver, other_driver = make_driver(1), make_driver(2)
+        start = timezone.now() + timedelta(days=1)
+        booked = make_trip(vehicle, driver, start=start, hours=4)
+        
+        results = check_bookings([
+            ('overlaps stored', vehicle.pk, other_driver.pk, start + timedelta(hours=2), start + timedelta(hours=6)),
+            ('back to back', vehicle.pk, other_driver.pk, start + timedelta(hours=4), start + timedelta(hours=6)),
+            ('overlaps earlier', other_vehicle.pk, other_driver.pk, start + timedelta(hours=5), start + timedelta(hours=7)),
+        ])
+        
+        self.assertEqual(results[0], {'vehicle': [booked.trip_id]})
+        self.assertEqual(results[1], {})
+        self.assertEqual(results[2], {'driver': ['back to back']})
+
+
+class ConsolidationTests(TestCase):
+    
+    def setUp(self):
+        self.drivers = [make_driver(number) for number in range(4)]
+        self.start = timezone.now() + timedelta(days=1)
+    
+    def plan(self):
+        return plan_consolidation(Trip.objects.filter(status=Trip.Status.DRAFT), window_hours=4)
+    
+    def test_first_fit_decreasing_into_the_smallest_vehicle_that_fits(self):
+        large, small = make_vehicle(1, capacity=5000), make_vehicle(2, capacity=1000)
+        for driver, weight in zip(self.drivers, [600, 300, 100]):
+            make_trip(large, driver, start=self.start, weight=weight)
+        
+        plan = self.plan()
+        
+        [group] = plan['groups']
+        [load] = group['loads']
+        self.assertEqual(load['vehicle'], small.pk)
+        self.assertEqual(load['load_kg'], 1000)
+        self.assertEqual(plan['summary']['vehicles_saved'], 2)
+    
+    def test_zero_capacity_vehicles_are_not_packed(self):
+        truck = make_vehicle(1, capacity=5000)
+        make_vehicle(2, capacity=0)
+        make_trip(truck, self.drivers[0], start=self.start, weight=1000)
+        # Another lane, so it needs a vehicle of its own once the truck is taken
+        make_trip(truck, self.drivers[1], start=self.start + timedelta(minutes=5), weight=0, dropoff_location='C')
+        
+        plan = self.plan()
+        
+        self.assertEqual([load['vehicle'] for group in plan['groups'] for load in group['loads']], [truck.pk])
+        self.assertEqual([trip['reason'] for trip in plan['unplaced']], ['No free vehicle left'])
+    
+    def test_vehicles_are_reused_by_groups_that_do_not_overlap(self):
+        truck = make_vehicle(1, capacity=5000)
+        morning = make_trip(truck, self.drivers[0], start=self.start, hours=3)
+        afternoon = make_trip(truck, self.drivers[1], start=self.start + timedelta(hours=6), hours=3)
+        # Starts inside the morning run, so it cannot share the truck
+        overlapping = make_trip(truck, self.drivers[2], start=self.start + timedelta(hours=1), dropoff_location='C')
+        
+        plan = self.plan()
+        
+        self.assertEqual(
+            [(load['vehicle'], load['trips']) for group in plan['groups'] for load in group['loads']],
+            [(truck.pk, [morning.trip_id]), (truck.pk, [afternoon.trip_id])]
+        )
+        self.assertEqual(plan['unplaced'], [{'trip_id': overlapping.trip_id, 'reason': 'No free vehicle left'}])
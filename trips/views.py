@@ -1,3 +1,6 @@
+import math
+import time
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,6 +8,8 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Q
+from django.conf import settings
 from .models import Trip
 from .serializers import (
     TripSerializer,
@@ -12,13 +17,29 @@ from .serializers import (
     TripUpdateSerializer,
     TripDispatchSerializer,
     TripCompleteSerializer,
-    TripCancelSerializer
+    TripCancelSerializer,
+    fill_estimated_distances
 )
 from vehicles.models import Vehicle
 from drivers.models import Driver
+from drivers.hours import driving_hours, limit_error, record_driving
+from core.mixins import ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, parse_since
+from events.bus import record_status_change
+from events.domain import (
+    TripDispatched,
+    TripCompleted,
+    TripCancelled,
+    VehicleStatusChanged,
+    DriverStatusChanged
+)
+from core.stats import breakdown, total, cached_stats, bump_data_version
+from .assignment import propose_assignments, apply_assignments
+from .consolidation import plan_consolidation
+from .schedule import check_bookings, conflict_errors, find_conflicts
+from archive.query import add_archived_breakdown
 
 
-class TripViewSet(viewsets.ModelViewSet):
+class TripViewSet(ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, viewsets.ModelViewSet):
     """ViewSet for Trip CRUD and dispatch operations"""
     
     queryset = Trip.objects.select_related(
@@ -26,8 +47,9 @@ class TripViewSet(viewsets.ModelViewSet):
     ).all()
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['status', 'vehicle', 'driver']
+    filterset_fields = ['status', 'vehicle', 'driver', 'is_delayed']
     search_fields = ['trip_id', 'pickup_location', 'dropoff_location']
+    natural_id_field = 'trip_id'
     ordering_fields = ['trip_id', 'created_at', 'scheduled_pickup_time']
     
     def get_serializer_class(self):
@@ -35,7 +57,7 @@ class TripViewSet(viewsets.ModelViewSet):
             return TripCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return TripUpdateSerializer
-        elif self.action == 'dispatch':
+        elif self.action == 'dispatch_trip':
             return TripDispatchSerializer
         elif self.action == 'complete':
             return TripCompleteSerializer
@@ -47,7 +69,54 @@ class TripViewSet(viewsets.ModelViewSet):
         """Set created_by to current user"""
         serializer.save(created_by=self.request.user)
     
-    @action(detail=True, methods=['post'])
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create several trips at once; nothing is created if any is invalid"""
+        items = request.data.get('trips')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'trips must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.TRIP_BULK_MAX_TRIPS:
+            return Response(
+                {'error': f'At most {settings.TRIP_BULK_MAX_TRIPS} trips can be created at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = TripCreateSerializer(
+            data=items, many=True, context={**self.get_serializer_context(), 'schedule_checked': True}
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            bookings = [
+                (f'trips[{position}]', row['vehicle'].pk, row['driver'].pk,
+                 row['scheduled_pickup_time'], row['scheduled_delivery_time'])
+                for position, row in enumerate(serializer.validated_data)
+            ]
+            errors = [conflict_errors(conflicts) for conflicts in check_bookings(bookings)]
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            fill_estimated_distances(serializer.validated_data)
+            trips = serializer.save(created_by=request.user)
+        
+        return Response(TripSerializer(trips, many=True).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['get'])
+    def conflicts(self, request):
+        """Get overlapping trips on the same vehicle or driver (upcoming by default)"""
+        since = parse_since(request.query_params.get('start')) or timezone.now()
+        until = parse_since(request.query_params.get('end'))
+        conflicts = find_conflicts(
+            since, until,
+            vehicles=request.query_params.getlist('vehicle'),
+            drivers=request.query_params.getlist('driver')
+        )
+        return Response({'count': len(conflicts), 'conflicts': conflicts})
+    
+    @action(detail=True, methods=['post'], url_path='dispatch')
     @transaction.atomic
     def dispatch_trip(self, request, pk=None):
         """Dispatch a trip (change status from DRAFT to DISPATCHED)"""
@@ -59,6 +128,10 @@ class TripViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        error = limit_error(trip.driver, driving_hours([trip.driver_id])[trip.driver_id])
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             # Update trip
@@ -66,13 +139,23 @@ class TripViewSet(viewsets.ModelViewSet):
             trip.start_odometer_km = serializer.validated_data['start_odometer_km']
             trip.actual_pickup_time = timezone.now()
             trip.save()
+            record_status_change(
+                TripDispatched, trip, Trip.Status.DRAFT,
+                vehicle_id=trip.vehicle_id,
+                driver_id=trip.driver_id,
+                start_odometer_km=trip.start_odometer_km
+            )
             
             # Update vehicle and driver status
+            old_vehicle_status = trip.vehicle.status
             trip.vehicle.status = Vehicle.Status.ON_TRIP
             trip.vehicle.save()
+            record_status_change(VehicleStatusChanged, trip.vehicle, old_vehicle_status)
             
+            old_driver_status = trip.driver.status
             trip.driver.status = Driver.Status.ON_TRIP
             trip.driver.save()
+            record_status_change(DriverStatusChanged, trip.driver, old_driver_status)
             
             return Response(TripSerializer(trip).data)
         
@@ -93,6 +176,7 @@ class TripViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             # Update trip
+            old_status = trip.status
             trip.status = Trip.Status.COMPLETED
             trip.end_odometer_km = serializer.validated_data['end_odometer_km']
             trip.actual_delivery_time = timezone.now()
@@ -107,17 +191,29 @@ class TripViewSet(viewsets.ModelViewSet):
                 trip.notes = serializer.validated_data['notes']
             
             trip.save()
+            record_status_change(
+                TripCompleted, trip, old_status,
+                vehicle_id=trip.vehicle_id,
+                driver_id=trip.driver_id,
+                end_odometer_km=trip.end_odometer_km,
+                actual_distance_km=trip.actual_distance_km
+            )
             
             # Update vehicle status and odometer
+            old_vehicle_status = trip.vehicle.status
             trip.vehicle.status = Vehicle.Status.AVAILABLE
             trip.vehicle.current_odometer_km = trip.end_odometer_km
             trip.vehicle.save()
+            record_status_change(VehicleStatusChanged, trip.vehicle, old_vehicle_status)
             
             # Update driver status and metrics
+            old_driver_status = trip.driver.status
             trip.driver.status = Driver.Status.OFF_DUTY
             trip.driver.total_trips_completed += 1
             trip.driver.total_distance_km += trip.actual_distance_km
             trip.driver.save()
+            record_status_change(DriverStatusChanged, trip.driver, old_driver_status)
+            record_driving(trip.driver_id, trip.actual_pickup_time, trip.actual_delivery_time)
             
             return Response(TripSerializer(trip).data)
         
@@ -148,14 +244,25 @@ class TripViewSet(viewsets.ModelViewSet):
             trip.status = Trip.Status.CANCELLED
             trip.cancellation_reason = serializer.validated_data['cancellation_reason']
             trip.save()
+            record_status_change(
+                TripCancelled, trip, old_status,
+                vehicle_id=trip.vehicle_id,
+                driver_id=trip.driver_id,
+                reason=trip.cancellation_reason
+            )
             
             # Restore vehicle and driver status if they were dispatched
             if old_status in [Trip.Status.DISPATCHED, Trip.Status.IN_PROGRESS]:
+                old_vehicle_status = trip.vehicle.status
                 trip.vehicle.status = Vehicle.Status.AVAILABLE
                 trip.vehicle.save()
+                record_status_change(VehicleStatusChanged, trip.vehicle, old_vehicle_status)
                 
+                old_driver_status = trip.driver.status
                 trip.driver.status = Driver.Status.OFF_DUTY
                 trip.driver.save()
+                record_status_change(DriverStatusChanged, trip.driver, old_driver_status)
+                record_driving(trip.driver_id, trip.actual_pickup_time, timezone.now())
             
             return Response(TripSerializer(trip).data)
         
@@ -164,19 +271,27 @@ class TripViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get trip statistics"""
-        stats = {
-            'total': self.queryset.count(),
-            'draft': self.queryset.filter(status=Trip.Status.DRAFT).count(),
-            'dispatched': self.queryset.filter(status=Trip.Status.DISPATCHED).count(),
-            'in_progress': self.queryset.filter(status=Trip.Status.IN_PROGRESS).count(),
-            'completed': self.queryset.filter(status=Trip.Status.COMPLETED).count(),
-            'cancelled': self.queryset.filter(status=Trip.Status.CANCELLED).count(),
-            'delayed': self.queryset.filter(
-                status=Trip.Status.DISPATCHED,
-                scheduled_pickup_time__lt=timezone.now()
-            ).count(),
+        return Response(cached_stats('trips', [Trip], self._build_stats))
+    
+    def _build_stats(self):
+        by_status = breakdown(
+            self.queryset, 'status', Trip.Status.choices,
+            delayed=Count('id', filter=Q(is_delayed=True))
+        )
+        add_archived_breakdown(by_status, Trip, 'status')
+        
+        return {
+            'total': total(by_status),
+            'draft': by_status[Trip.Status.DRAFT]['count'],
+            'dispatched': by_status[Trip.Status.DISPATCHED]['count'],
+            'in_progress': by_status[Trip.Status.IN_PROGRESS]['count'],
+            'completed': by_status[Trip.Status.COMPLETED]['count'],
+            'cancelled': by_status[Trip.Status.CANCELLED]['count'],
+            'delayed': (
+                by_status[Trip.Status.DISPATCHED]['delayed']
+                + by_status[Trip.Status.IN_PROGRESS]['delayed']
+            ),
         }
-        return Response(stats)
     
     @action(detail=False, methods=['get'])
     def active(self, request):
@@ -186,3 +301,80 @@ class TripViewSet(viewsets.ModelViewSet):
         )
         serializer = self.get_serializer(trips, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def delayed(self, request):
+        """Get active trips that missed their pickup or delivery deadline"""
+        trips = self.queryset.filter(
+            is_delayed=True,
+            status__in=[Trip.Status.DISPATCHED, Trip.Status.IN_PROGRESS]
+        ).order_by('scheduled_delivery_time')
+        serializer = self.get_serializer(trips, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], url_path='auto-assign')
+    def auto_assign(self, request):
+        """Propose (and optionally apply) the cheapest vehicle and driver for draft trips"""
+        trip_ids = request.data.get('trips')
+        weights = request.data.get('weights') or {}
+        
+        if trip_ids is not None and not isinstance(trip_ids, list):
+            return Response(
+                {'error': 'trips must be a list of trip IDs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(weights, dict) or any(
+            key not in settings.AUTO_ASSIGN_WEIGHTS
+            or isinstance(value, bool) or not isinstance(value, (int, float))
+            or not math.isfinite(value) or value < 0
+            for key, value in weights.items()
+        ):
+            return Response(
+                {'error': f"weights must map {', '.join(settings.AUTO_ASSIGN_WEIGHTS)} to non-negative numbers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        drafts = Trip.objects.filter(status=Trip.Status.DRAFT).order_by('scheduled_pickup_time', 'pk')
+        if trip_ids is not None:
+            drafts = drafts.filter(trip_id__in=trip_ids)
+        drafts = list(drafts[:settings.AUTO_ASSIGN_MAX_TRIPS + 1])
+        if len(drafts) > settings.AUTO_ASSIGN_MAX_TRIPS:
+            return Response(
+                {'error': f'At most {settings.AUTO_ASSIGN_MAX_TRIPS} trips can be assigned at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        started = time.perf_counter()
+        assignments, unassigned = propose_assignments(drafts, weights)
+        solve_ms = round((time.perf_counter() - started) * 1000, 1)
+        
+        applied = 0
+        if request.data.get('apply') and assignments:
+            with transaction.atomic():
+                applied = apply_assignments(assignments)
+            bump_data_version(Trip)
+        
+        return Response({
+            'assignments': assignments,
+            'unassigned': unassigned,
+            'applied': applied,
+            'solve_ms': solve_ms,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def consolidation(self, request):
+        """Plan how draft trips on the same lane and window could share vehicles"""
+        try:
+            window_hours = float(request.query_params.get('window_hours', settings.CONSOLIDATION_WINDOW_HOURS))
+        except ValueError:
+            window_hours = -1
+        if not 0 <= window_hours <= 168:
+            return Response(
+                {'error': 'window_hours must be a number between 0 and 168'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        started = time.perf_counter()
+        plan = plan_consolidation(Trip.objects.filter(status=Trip.Status.DRAFT), window_hours)
+        plan['solve_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return Response(plan)
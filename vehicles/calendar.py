@@ -0,0 +1,172 @@
+"""
+Fleet capacity calendar.
+
+Each vehicle that is not retired gets a row of hourly slots from the current
+hour over ``CAPACITY_CALENDAR_DAYS``, held as a boolean numpy matrix (one
+bitset per vehicle). A slot is busy when a draft, dispatched or in-progress
+trip's scheduled window or a scheduled maintenance day touches it, so
+"which vehicles of type X with at least Y kg are free over window Z" is one
+vectorised ``any`` over a column slice for the whole fleet.
+"""
+import math
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.stats import data_version
+from maintenance.models import MaintenanceRecord
+from trips.models import Trip
+from trips.schedule import BLOCKING_STATUSES
+from .models import Vehicle
+
+SLOT = timedelta(hours=1)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class CapacityCalendar:
+    """Hourly busy slots for every active vehicle over a horizon"""
+    
+    def __init__(self, start, vehicles, busy):
+        self.start = start
+        self.vehicles = vehicles
+        self.busy = busy
+        self.capacity = np.array([float(vehicle[4]) for vehicle in vehicles])
+        self.types = np.array([vehicle[3] for vehicle in vehicles], dtype=object)
+    
+    @property
+    def end(self):
+        return self.start + self.busy.shape[1] * SLOT
+    
+    @classmethod
+    def build(cls, start=None, days=None):
+        days = days or settings.CAPACITY_CALENDAR_DAYS
+        start = (start or timezone.now()).replace(minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=days)
+        
+        vehicles = list(
+            Vehicle.objects.exclude(status=Vehicle.Status.RETIRED).order_by('pk').values_list(
+                'pk', 'vehicle_id', 'name', 'vehicle_type', 'max_capacity_kg'
+            )
+        )
+        calendar = cls(start, vehicles, np.zeros((len(vehicles), days * 24), dtype=bool))
+        rows = {vehicle[0]: row for row, vehicle in enumerate(vehicles)}
+        
+        # Active trips keep their vehicle past a missed delivery time
+        active = [Trip.Status.DISPATCHED, Trip.Status.IN_PROGRESS]
+        trips = Trip.objects.filter(
+            Q(scheduled_delivery_time__gt=start) | Q(status__in=active),
+            status__in=BLOCKING_STATUSES,
+            scheduled_pickup_time__lt=end
+        ).values_list('vehicle_id', 'status', 'scheduled_pickup_time', 'scheduled_delivery_time')
+        for vehicle_id, status, pickup, delivery in trips.iterator(chunk_size=2000):
+            if status in active:
+                delivery = max(delivery, start + SLOT)
+            calendar._mark(rows.get(vehicle_id), pickup, delivery)
+        
+        # Scheduled maintenance takes the whole day; work in progress runs
+        # until at least the end of today
+        today = timezone.localdate()
+        records = MaintenanceRecord.objects.filter(
+            Q(status=MaintenanceRecord.Status.SCHEDULED, scheduled_date__gte=timezone.localtime(start).date())
+            | Q(status=MaintenanceRecord.Status.IN_PROGRESS),
+            scheduled_date__lt=timezone.localtime(end).date() + timedelta(days=1)
+        ).values_list('vehicle_id', 'status', 'scheduled_date')
+        for vehicle_id, status, scheduled_date in records.iterator(chunk_size=2000):
+            if status == MaintenanceRecord.Status.IN_PROGRESS:
+                calendar._mark(rows.get(vehicle_id), start, _day_start(max(scheduled_date, today) + timedelta(days=1)))
+            else:
+                calendar._mark(rows.get(vehicle_id), _day_start(scheduled_date), _day_start(scheduled_date + timedelta(days=1)))
+        
+        return calendar
+    
+    def slots(self, start, end):
+        """Slot range ``[first, last)`` covering ``[start, end)``, clipped to the horizon"""
+        first = math.floor((start - self.start) / SLOT)
+        last = math.ceil((end - self.start) / SLOT)
+        return max(first, 0), min(last, self.busy.shape[1])
+    
+    def _mark(self, row, start, end):
+        if row is None:
+            return
+        first, last = self.slots(start, end)
+        if first < last:
+            self.busy[row, first:last] = True
+    
+    def _matching(self, vehicle_type=None, min_capacity_kg=None):
+        mask = np.ones(len(self.vehicles), dtype=bool)
+        if vehicle_type:
+            mask &= self.types == vehicle_type
+        if min_capacity_kg:
+            mask &= self.capacity >= float(min_capacity_kg)
+        return mask
+    
+    def free_vehicles(self, start, end, vehicle_type=None, min_capacity_kg=None):
+        """Vehicles with every slot of ``[start, end)`` free, largest first"""
+        first, last = self.slots(start, end)
+        free = self._matching(vehicle_type, min_capacity_kg) & ~self.busy[:, first:last].any(axis=1)
+        rows = np.flatnonzero(free)
+        rows = rows[np.argsort(-self.capacity[rows], kind='stable')]
+        return [
+            {
+                'id': self.vehicles[row][0],
+                'vehicle_id': self.vehicles[row][1],
+                'name': self.vehicles[row][2],
+                'vehicle_type': self.vehicles[row][3],
+                'max_capacity_kg': float(self.capacity[row]),
+            }
+            for row in rows
+        ]
+    
+    def daily_forecast(self, vehicle_type=None, min_capacity_kg=None):
+        """Per local date: vehicles free for the rest of the day, their
+        capacity and the share of busy hours
+        """
+        mask = self._matching(vehicle_type, min_capacity_kg)
+        busy = self.busy[mask]
+        capacity = self.capacity[mask]
+        
+        forecast = []
+        day = timezone.localtime(self.start).date()
+        while _day_start(day) < self.end:
+            first, last = self.slots(_day_start(day), _day_start(day + timedelta(days=1)))
+            hours = busy[:, first:last]
+            free_all_day = ~hours.any(axis=1)
+            forecast.append({
+                'date': day,
+                'hours': last - first,
+                'vehicles': int(mask.sum()),
+                'free_all_day': int(free_all_day.sum()),
+                'free_capacity_kg': float(capacity[free_all_day].sum()),
+                'utilization': round(float(hours.mean()), 4) if hours.size else 0,
+            })
+            day += timedelta(days=1)
+        return forecast
+
+
+_cached = {}
+
+
+def capacity_calendar():
+    """Calendar from the current hour.
+    
+    With ``STATS_CACHE_TIMEOUT`` on, the built calendar is kept in this
+    process until the hour turns or trips, vehicles or maintenance change.
+    """
+    if not settings.STATS_CACHE_TIMEOUT:
+        return CapacityCalendar.build()
+    
+    key = (
+        timezone.now().replace(minute=0, second=0, microsecond=0),
+        settings.CAPACITY_CALENDAR_DAYS,
+        *(data_version(model) for model in (Trip, Vehicle, MaintenanceRecord)),
+    )
+    if _cached.get('key') != key:
+        _cached['calendar'] = CapacityCalendar.build()
+        _cached['key'] = key
+    return _cached['calendar']
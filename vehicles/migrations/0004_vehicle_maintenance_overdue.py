@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0003_vehicle_vehicles_updated_a8b1b7_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='maintenance_overdue',
+            field=models.BooleanField(default=False, editable=False, help_text='Has scheduled maintenance past its date (set by the compliance sweep)'),
+        ),
+    ]
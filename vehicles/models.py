@@ -58,6 +58,11 @@ class Vehicle(models.Model):
         default=Status.AVAILABLE,
         db_index=True
     )
+    maintenance_overdue = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Has scheduled maintenance past its date (set by the compliance sweep)"
+    )
     
     # Financial
     acquisition_cost = models.DecimalField(
@@ -86,6 +91,7 @@ class Vehicle(models.Model):
         indexes = [
             models.Index(fields=['status', 'vehicle_type']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -98,7 +104,12 @@ class Vehicle(models.Model):
     
     @property
     def total_maintenance_cost(self):
-        """Calculate total maintenance cost from related maintenance records"""
+        """Calculate total maintenance cost from related maintenance records.
+        
+        Uses the ``maintenance_cost_total`` annotation when the queryset has it.
+        """
+        if 'maintenance_cost_total' in self.__dict__:
+            return self.maintenance_cost_total or 0
         from django.db.models import F
         return self.maintenance_records.aggregate(
             total=models.Sum(F('labor_cost') + F('parts_cost'))
@@ -106,9 +117,18 @@ class Vehicle(models.Model):
     
     @property
     def total_fuel_cost(self):
-        """Calculate total fuel cost from related expense records"""
-        return self.fuel_expenses.aggregate(
-            total=models.Sum('total_cost')
+        """Calculate total fuel cost from related expense records, archived
+        ones included.
+        
+        Uses the ``fuel_cost_total`` and ``archived_fuel_cost_total``
+        annotations when the queryset has them.
+        """
+        if 'fuel_cost_total' in self.__dict__:
+            return (self.fuel_cost_total or 0) + (self.__dict__.get('archived_fuel_cost_total') or 0)
+        from archive.query import aggregate_with_archive
+        from expenses.models import FuelExpense
+        return aggregate_with_archive(
+            FuelExpense, None, models.Q(vehicle=self), total=models.Sum('total_cost')
         )['total'] or 0
     
     def save(self, *args, **kwargs):
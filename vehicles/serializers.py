@@ -18,8 +18,8 @@ class VehicleSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'vehicle_id', 'name', 'vehicle_type', 'make', 'model', 'year',
             'license_plate', 'vin', 'max_capacity_kg', 'fuel_capacity_liters',
-            'current_odometer_km', 'status', 'acquisition_cost', 'acquisition_date',
-            'notes', 'is_available_for_trip', 'total_maintenance_cost', 
+            'current_odometer_km', 'status', 'maintenance_overdue', 'acquisition_cost',
+            'acquisition_date', 'notes', 'is_available_for_trip', 'total_maintenance_cost',
             'total_fuel_cost', 'created_by', 'created_by_name', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
@@ -67,4 +67,4 @@ class VehicleSummarySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Vehicle
-        fields = ['id', 'vehicle_id', 'name', 'vehicle_type', 'status', 'max_capacity_kg']
+        fields = ['id', 'vehicle_id', 'name', 'vehicle_type', 'status', 'max_capacity_kg', 'maintenance_overdue']
@@ -0,0 +1,87 @@
+from datetime import datetime, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.factories import api_client, make_driver, make_trip, make_vehicle
+from maintenance.models import MaintenanceRecord
+from telemetry.spatial import nearest_vehicles, update_positions
+from .calendar import CapacityCalendar
+from .models import Vehicle
+
+
+class NearestVehicleParameterTests(TestCase):
+    
+    def setUp(self):
+        self.client = api_client()
+    
+    def test_out_of_range_or_non_finite_points_are_rejected(self):
+        for lat, lon in [('nan', '77.5'), ('inf', '77.5'), ('1e308', '77.5'), ('12.9', '-181')]:
+            response = self.client.get(f'/api/vehicles/nearest/?lat={lat}&lon={lon}')
+            self.assertEqual(response.status_code, 400, (lat, lon))
+    
+    def test_k_must_be_positive(self):
+        response = self.client.get('/api/vehicles/nearest/?lat=12.9&lon=77.5&k=-3')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_valid_point_returns_list(self):
+        response = self.client.get('/api/vehicles/nearest/?lat=12.9&lon=77.5&k=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
+class NearestVehicleSearchTests(TestCase):
+    
+    def place(self, number, lat, lon, **fields):
+        vehicle = make_vehicle(number, **fields)
+        update_positions({vehicle.pk: (int(timezone.now().timestamp()), int(lat * 1e6), int(lon * 1e6))})
+        return vehicle
+    
+    def test_two_queries_however_far_the_matches_are(self):
+        near = self.place(1, 12.91, 77.51)
+        self.place(2, 12.9, 77.5, status=Vehicle.Status.IN_SHOP)
+        small = self.place(3, 12.95, 77.55, capacity=500)
+        middle = self.place(4, 13.5, 77.5)
+        far = self.place(5, 16.0, 77.5)
+        self.place(6, 25.0, 77.5)
+        
+        for k, expected in [(1, [near]), (2, [near, small]), (4, [near, small, middle, far])]:
+            with self.assertNumQueries(2):
+                matches = nearest_vehicles(12.9, 77.5, k=k)
+            self.assertEqual([position.vehicle for _, position in matches], expected)
+        
+        with self.assertNumQueries(2):
+            matches = nearest_vehicles(12.9, 77.5, k=2, min_capacity_kg=1000)
+        self.assertEqual([position.vehicle for _, position in matches], [near, middle])
+        self.assertAlmostEqual(matches[1][0], 66.7, places=1)
+
+
+class FreeVehicleTests(TestCase):
+    
+    def test_trips_and_maintenance_book_their_vehicles(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        noon = timezone.make_aware(datetime.combine(tomorrow, time(12)))
+        booked, in_shop = make_vehicle(1), make_vehicle(2)
+        free, small = make_vehicle(3, capacity=20000), make_vehicle(4, capacity=500)
+        make_vehicle(5, status=Vehicle.Status.RETIRED)
+        make_trip(booked, make_driver(1), start=noon - timedelta(hours=2), hours=3)
+        MaintenanceRecord.objects.create(
+            vehicle=in_shop, maintenance_type='INSPECTION', description='Annual', service_provider='Garage',
+            scheduled_date=tomorrow, odometer_reading_km=1000
+        )
+        
+        calendar = CapacityCalendar.build()
+        
+        def free_ids(start, end, **filters):
+            return [vehicle['id'] for vehicle in calendar.free_vehicles(start, end, **filters)]
+        
+        self.assertEqual(free_ids(noon, noon + timedelta(hours=1)), [free.pk, small.pk])
+        self.assertEqual(free_ids(noon, noon + timedelta(hours=1), min_capacity_kg=1000), [free.pk])
+        # The trip ends at 13:00 and the maintenance day at midnight
+        self.assertEqual(
+            free_ids(noon + timedelta(hours=1), noon + timedelta(hours=2)), [free.pk, booked.pk, small.pk]
+        )
+        self.assertEqual(
+            free_ids(noon + timedelta(hours=12), noon + timedelta(hours=13)),
+            [free.pk, booked.pk, in_shop.pk, small.pk]
+        )
@@ -1,17 +1,40 @@
+import math
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
 from .models import Vehicle
 from .serializers import (
     VehicleSerializer, 
     VehicleCreateUpdateSerializer,
     VehicleSummarySerializer
 )
+from core.mixins import ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, parse_since
+from events.bus import record_status_change
+from events.domain import VehicleStatusChanged
+from core.stats import breakdown, counts, total, cached_stats
+from .calendar import capacity_calendar
+from telemetry.spatial import nearest_vehicles
+from trips.models import Trip
+from expenses.models import FuelExpense
+from maintenance.models import MaintenanceRecord
+from archive.models import ArchivedFuelExpense
+from archive.query import needs_archive
+
+
+def _vehicle_sum(manager, aggregate):
+    return Subquery(
+        manager.filter(vehicle=OuterRef('pk')).order_by().values('vehicle').annotate(
+            total=aggregate
+        ).values('total')
+    )
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(ReplicaReadMixin, DeltaSyncMixin, BatchLookupMixin, viewsets.ModelViewSet):
     """ViewSet for Vehicle CRUD operations"""
     
     queryset = Vehicle.objects.select_related('created_by').all()
@@ -19,6 +42,8 @@ class VehicleViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'vehicle_type']
     search_fields = ['vehicle_id', 'name', 'license_plate', 'make', 'model']
+    natural_id_field = 'vehicle_id'
+    query_budget = {'list': 5, 'retrieve': 5, 'changes': 6, 'batch': 5}
     ordering_fields = ['vehicle_id', 'created_at', 'current_odometer_km']
     
     def get_serializer_class(self):
@@ -28,10 +53,34 @@ class VehicleViewSet(viewsets.ModelViewSet):
             return VehicleCreateUpdateSerializer
         return VehicleSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve', 'changes', 'batch']:
+            # Summed in the same query instead of once per vehicle for the cost
+            # properties; subqueries so the two sums don't multiply each other
+            queryset = queryset.annotate(
+                fuel_cost_total=_vehicle_sum(FuelExpense.objects, Sum('total_cost')),
+                maintenance_cost_total=_vehicle_sum(
+                    MaintenanceRecord.objects, Sum(F('labor_cost') + F('parts_cost'))
+                )
+            )
+            if needs_archive(FuelExpense, None):
+                queryset = queryset.annotate(
+                    archived_fuel_cost_total=_vehicle_sum(ArchivedFuelExpense.objects, Sum('total_cost'))
+                )
+        return queryset
+    
     def perform_create(self, serializer):
         """Set created_by to current user"""
         serializer.save(created_by=self.request.user)
     
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Record status changes made through a plain update"""
+        old_status = serializer.instance.status
+        vehicle = serializer.save()
+        record_status_change(VehicleStatusChanged, vehicle, old_status)
+    
     @action(detail=False, methods=['get'])
     def available(self, request):
         """Get all available vehicles for trip assignment"""
@@ -39,27 +88,146 @@ class VehicleViewSet(viewsets.ModelViewSet):
         serializer = VehicleSummarySerializer(vehicles, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """Get the closest available vehicles to ``?lat=&lon=`` or a trip's pickup"""
+        params = request.query_params
+        min_capacity_kg = params.get('min_capacity_kg')
+        
+        if params.get('trip'):
+            trip = Trip.objects.filter(trip_id=params['trip']).first()
+            if trip is None:
+                return Response({'error': 'Trip not found'}, status=status.HTTP_404_NOT_FOUND)
+            if trip.pickup_latitude is None:
+                return Response(
+                    {'error': f'Trip {trip.trip_id} has no pickup coordinates'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            lat, lon = trip.pickup_latitude, trip.pickup_longitude
+            min_capacity_kg = min_capacity_kg or trip.cargo_weight_kg
+        else:
+            try:
+                lat, lon = float(params['lat']), float(params['lon'])
+            except (KeyError, ValueError):
+                return Response(
+                    {'error': 'lat and lon (or trip) parameters are required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # NaN fails both comparisons, infinities the range
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                return Response(
+                    {'error': 'lat must be within ±90 and lon within ±180 degrees'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        try:
+            k = min(int(params.get('k', 5)), 50)
+            max_radius_km = float(params['max_radius_km']) if params.get('max_radius_km') else None
+            min_capacity_kg = float(min_capacity_kg) if min_capacity_kg else None
+        except ValueError:
+            return Response(
+                {'error': 'k, max_radius_km and min_capacity_kg must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if k < 1:
+            return Response({'error': 'k must be at least 1'}, status=status.HTTP_400_BAD_REQUEST)
+        if max_radius_km is not None and not 0 < max_radius_km < math.inf:
+            return Response(
+                {'error': 'max_radius_km must be a positive number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if min_capacity_kg is not None and not math.isfinite(min_capacity_kg):
+            return Response(
+                {'error': 'min_capacity_kg must be a finite number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        matches = nearest_vehicles(lat, lon, k, min_capacity_kg, max_radius_km)
+        return Response([
+            {
+                **VehicleSummarySerializer(position.vehicle).data,
+                'distance_km': round(distance, 3),
+                'latitude': position.latitude,
+                'longitude': position.longitude,
+                'position_recorded_at': position.recorded_at,
+            }
+            for distance, position in matches
+        ])
+    
+    def _calendar_filters(self, params):
+        """Parse ``vehicle_type`` and ``min_capacity_kg``; ``None`` if invalid"""
+        vehicle_type = params.get('vehicle_type') or None
+        if vehicle_type and vehicle_type not in Vehicle.VehicleType.values:
+            return None
+        try:
+            min_capacity_kg = float(params['min_capacity_kg']) if params.get('min_capacity_kg') else None
+        except ValueError:
+            return None
+        return vehicle_type, min_capacity_kg
+    
+    @action(detail=False, methods=['get'])
+    def free(self, request):
+        """Get vehicles with no trip or maintenance scheduled between ``start`` and ``end``"""
+        calendar = capacity_calendar()
+        start = parse_since(request.query_params.get('start'))
+        end = parse_since(request.query_params.get('end'))
+        filters = self._calendar_filters(request.query_params)
+        
+        if start is None or end is None or end <= start:
+            return Response(
+                {'error': 'start and end are required and end must be after start'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end <= calendar.start or end > calendar.end:
+            return Response(
+                {'error': f'The window must end within the calendar ({calendar.start} to {calendar.end})'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if filters is None:
+            return Response(
+                {'error': 'vehicle_type must be a vehicle type and min_capacity_kg a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(calendar.free_vehicles(max(start, calendar.start), end, *filters))
+    
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Get the daily availability forecast over the calendar horizon"""
+        filters = self._calendar_filters(request.query_params)
+        if filters is None:
+            return Response(
+                {'error': 'vehicle_type must be a vehicle type and min_capacity_kg a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        calendar = capacity_calendar()
+        return Response({
+            'start': calendar.start,
+            'end': calendar.end,
+            'days': calendar.daily_forecast(*filters),
+        })
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get vehicle statistics"""
-        stats = {
-            'total': self.queryset.count(),
-            'available': self.queryset.filter(status=Vehicle.Status.AVAILABLE).count(),
-            'on_trip': self.queryset.filter(status=Vehicle.Status.ON_TRIP).count(),
-            'in_shop': self.queryset.filter(status=Vehicle.Status.IN_SHOP).count(),
-            'retired': self.queryset.filter(status=Vehicle.Status.RETIRED).count(),
-            'by_type': {}
-        }
-        
-        # Count by vehicle type
-        for vtype in Vehicle.VehicleType.choices:
-            stats['by_type'][vtype[0]] = self.queryset.filter(
-                vehicle_type=vtype[0]
-            ).count()
+        return Response(cached_stats('vehicles', [Vehicle], self._build_stats))
+    
+    def _build_stats(self):
+        by_status = breakdown(self.queryset, 'status', Vehicle.Status.choices)
+        by_type = breakdown(self.queryset, 'vehicle_type', Vehicle.VehicleType.choices)
         
-        return Response(stats)
+        return {
+            'total': total(by_status),
+            'available': by_status[Vehicle.Status.AVAILABLE]['count'],
+            'on_trip': by_status[Vehicle.Status.ON_TRIP]['count'],
+            'in_shop': by_status[Vehicle.Status.IN_SHOP]['count'],
+            'retired': by_status[Vehicle.Status.RETIRED]['count'],
+            'by_type': counts(by_type)
+        }
     
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def retire(self, request, pk=None):
         """Retire a vehicle"""
         vehicle = self.get_object()
@@ -70,13 +238,16 @@ class VehicleViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        old_status = vehicle.status
         vehicle.status = Vehicle.Status.RETIRED
         vehicle.save()
+        record_status_change(VehicleStatusChanged, vehicle, old_status)
         
         serializer = self.get_serializer(vehicle)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def activate(self, request, pk=None):
         """Activate a retired vehicle"""
         vehicle = self.get_object()
@@ -84,6 +255,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
         if vehicle.status == Vehicle.Status.RETIRED:
             vehicle.status = Vehicle.Status.AVAILABLE
             vehicle.save()
+            record_status_change(VehicleStatusChanged, vehicle, Vehicle.Status.RETIRED)
         
         serializer = self.get_serializer(vehicle)
         return Response(serializer.data)